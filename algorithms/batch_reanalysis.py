@@ -0,0 +1,247 @@
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from algorithms import data_analysis
+from algorithms.data_analysis import analyze_curve
+from algorithms.thermal_receipt import render_receipt
+from storage.run_file import RunFile, RUN_EXTENSION, CSV_COLUMNS
+from storage.profile_store import PROFILES_FOLDER
+
+# إعادة تحليل التشغيلات المسجلة دون واجهة، على كل أنوية المعالج:
+#   python -m algorithms.batch_reanalysis results/                  (مجلد، بحث متكرر)
+#   python -m algorithms.batch_reanalysis "results/2025-01-*/*.run" --workers 8
+# الملفات التي لم تتغير (ولا معاملات التحليل) منذ آخر تشغيل تُتخطى؛ --force لإعادة الكل.
+MANIFEST_NAME = "manifest.json"
+SUMMARY_NAME = "summary.csv"
+MANIFEST_SAVE_EVERY = 50
+HASH_CHUNK = 1 << 20
+SUMMARY_FIELDS = ("file", "status", "sample_count", "duration", "cooling_slope", "inflection_time",
+                  "inflection_temperature", "inflection_slope", "temper_index", "plateaus", "report", "error")
+# ✅ تغيير أي ثابت من ثوابت التحليل (مثل بعد تعديل الوصفة) يبطل كل النتائج السابقة
+ANALYSIS_PARAMETERS = ("BIN_SECONDS", "SMOOTHING_SECONDS", "SLOPE_SECONDS", "PLATEAU_SLOPE", "PLATEAU_EXIT_SLOPE",
+                       "PLATEAU_GAP_SECONDS", "MIN_PLATEAU_SECONDS", "BUMP_PROMINENCE", "LATENT_PROMINENCE",
+                       "NOISE_FACTOR", "TEMPER_INDEX_GAIN")
+
+
+def analysis_fingerprint(render):
+    """بصمة معاملات التحليل؛ النتائج المحفوظة ببصمة مختلفة تُعاد"""
+    parameters = {name: getattr(data_analysis, name) for name in ANALYSIS_PARAMETERS}
+    parameters["render"] = render and render_receipt.__module__
+    return hashlib.sha1(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_run_csv(path):
+    """ملفات CSV المصدرة من التشغيلات فقط (أول عمود هو الزمن)"""
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        return handle.readline().startswith(CSV_COLUMNS[0])
+
+
+def static_root(pattern):
+    """الجزء الثابت من المسار قبل أول رمز glob (المجلد الذي تُحسب منه المسارات النسبية)"""
+    if os.path.isdir(pattern):
+        return os.path.abspath(pattern)
+    parts = []
+    for part in os.path.dirname(os.path.normpath(pattern)).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.path.abspath(os.sep.join(parts) or ".")
+
+
+def find_runs(patterns, exclude=None):
+    """كل ملفات التشغيلات (.run و CSV) من مجلدات أو أنماط glob، بترتيب ثابت وبلا تكرار
+
+    مجلد الملفات المرجعية (profiles) يُتجاهل: منحنياتها نسخ من تشغيلات موجودة وليست تشغيلات جديدة.
+    """
+    found = set()
+    for pattern in patterns:
+        root = static_root(pattern)
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in matches:
+            path = os.path.abspath(path)
+            if exclude and path.startswith(exclude + os.sep):
+                continue
+            if PROFILES_FOLDER in os.path.relpath(os.path.dirname(path), root).split(os.sep):
+                continue
+            if path.endswith(RUN_EXTENSION) or (path.lower().endswith(".csv") and is_run_csv(path)):
+                found.add(path)
+    return sorted(found)
+
+
+def load_run(path):
+    """الزمن والحرارة من ملف .run (ربط بالذاكرة) أو CSV (بدون pandas)"""
+    if path.endswith(RUN_EXTENSION):
+        run = RunFile(path)
+        return np.asarray(run.times, dtype=np.float64), np.asarray(run.temperatures, dtype=np.float64)
+    table = np.loadtxt(path, delimiter=",", skiprows=1, usecols=(0, 1), ndmin=2)
+    return table[:, 0], table[:, 1]
+
+
+def reanalyze(path, report_base, render):
+    """تُنفذ في عملية عاملة: تحليل تشغيلة واحدة وكتابة نتيجتها (JSON) وتقريرها (PNG)
+
+    بصمة المحتوى تُحسب هنا أيضًا، حتى لا تقرأ العملية الرئيسية كل ملف مرة ثانية بالتسلسل.
+    """
+    sha256 = content_hash(path)
+    times, temperatures = load_run(path)
+    analysis = analyze_curve(times, temperatures)
+    os.makedirs(os.path.dirname(report_base), exist_ok=True)
+    with open(report_base + ".json", "w", encoding="utf-8") as handle:
+        json.dump(analysis.to_dict(), handle, indent=2)
+    report = None
+    if render:
+        report = render_receipt(report_base + ".png", times, temperatures, analysis.temper_index)
+    return analysis.to_dict(), report, sha256
+
+
+def summary_row(relative, status, analysis=None, report=None, error=""):
+    row = {"file": relative, "status": status, "report": report or "", "error": error}
+    if analysis is not None:
+        row.update({name: analysis[name] for name in SUMMARY_FIELDS if name in analysis and name != "plateaus"})
+        row["plateaus"] = len(analysis["plateaus"])
+    return row
+
+
+class BatchReanalysis:
+    """توزيع التشغيلات على مجموعة عمليات، مع تخطي ما لم يتغير وكتابة جدول ملخص"""
+
+    def __init__(self, root, output_folder, workers=None, render=True, force=False):
+        self.root = root
+        self.output_folder = output_folder
+        self.workers = workers or os.cpu_count()
+        self.render = render
+        self.force = force
+        self.fingerprint = analysis_fingerprint(render)
+        self.manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self):
+        """كتابة ذرية حتى لا يفسد الإيقاف المفاجئ ما سُجل من تقدم"""
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.manifest, handle)
+        os.replace(temp_path, self.manifest_path)
+
+    def relative(self, path):
+        return os.path.relpath(path, self.root)
+
+    def report_base(self, path):
+        return os.path.join(self.output_folder, os.path.splitext(self.relative(path))[0])
+
+    def up_to_date(self, path, stat):
+        """مقارنة سريعة بالحجم ووقت التعديل، ثم بمحتوى الملف إن تغير الوقت فقط (نسخ، مزامنة)"""
+        entry = self.manifest.get(self.relative(path))
+        if self.force or entry is None or entry.get("fingerprint") != self.fingerprint:
+            return False
+        if not os.path.exists(self.report_base(path) + ".json"):
+            return False
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if entry["size"] == stat.st_size and entry["sha256"] == content_hash(path):
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def run(self, paths, progress=print):
+        os.makedirs(self.output_folder, exist_ok=True)
+        rows, pending = [], {}
+        for path in paths:
+            stat = os.stat(path)
+            if self.up_to_date(path, stat):
+                entry = self.manifest[self.relative(path)]
+                rows.append(summary_row(self.relative(path), "skipped", entry["analysis"], entry.get("report")))
+            else:
+                pending[path] = stat
+        progress(f"🔍 {len(paths)} runs found: {len(pending)} to analyze, {len(rows)} up to date "
+                 f"({self.workers} workers)")
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(reanalyze, path, self.report_base(path), self.render): path for path in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                relative = self.relative(path)
+                try:
+                    analysis, report, sha256 = future.result()
+                except Exception as e:  # ✅ تشغيلة تالفة أو قصيرة لا توقف بقية الدفعة
+                    rows.append(summary_row(relative, "failed", error=str(e)))
+                    progress(f"[{done}/{len(pending)}] ❌ {relative}: {e}")
+                    continue
+                stat = pending[path]
+                self.manifest[relative] = {
+                    "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256,
+                    "fingerprint": self.fingerprint, "analysis": analysis,
+                    "report": report and os.path.relpath(report, self.output_folder),
+                }
+                rows.append(summary_row(relative, "analyzed", analysis, self.manifest[relative]["report"]))
+                progress(f"[{done}/{len(pending)}] ✅ {relative}: temper index {analysis['temper_index']}")
+                if done % MANIFEST_SAVE_EVERY == 0:
+                    self.save_manifest()
+        self.save_manifest()
+
+        elapsed = time.perf_counter() - started
+        if pending:
+            progress(f"⏱ Analyzed {len(pending)} runs in {elapsed:.1f} s ({len(pending) / elapsed:.1f} runs/s)")
+        return sorted(rows, key=lambda row: row["file"])
+
+    def write_summary(self, rows, path=None):
+        path = path or os.path.join(self.output_folder, SUMMARY_NAME)
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run tempering analysis and reports over recorded runs.")
+    parser.add_argument("inputs", nargs="+", help="results folders or glob patterns of .run/.csv files")
+    parser.add_argument("--output", help="output folder (default: <inputs root>/reanalysis)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--no-render", action="store_true", help="only write analysis JSON, skip PNG reports")
+    parser.add_argument("--force", action="store_true", help="re-analyze even up-to-date runs")
+    parser.add_argument("--summary", help="summary CSV path (default: <output>/summary.csv)")
+    args = parser.parse_args(argv)
+
+    root = os.path.commonpath([static_root(pattern) for pattern in args.inputs])
+    output_folder = os.path.abspath(args.output or os.path.join(root, "reanalysis"))
+    paths = find_runs(args.inputs, exclude=output_folder)
+    if not paths:
+        print("⚠ No runs found.")
+        return 1
+
+    batch = BatchReanalysis(root, output_folder, workers=args.workers, render=not args.no_render, force=args.force)
+    rows = batch.run(paths)
+    summary = batch.write_summary(rows, args.summary)
+    failed = sum(row["status"] == "failed" for row in rows)
+    print(f"📁 Summary written to: {summary} ({len(rows) - failed} ok, {failed} failed)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,232 @@
 import os
+import typing
+import logging
 import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
+from dataclasses import dataclass, field, asdict
+import numpy as np
+from algorithms.report_rendering import unique_path
+from algorithms.thermal_receipt import render_receipt
+from storage.run_file import RunFile, RUN_EXTENSION, CSV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+BIN_SECONDS = 0.5            # دقة التحليل الزمنية بعد التجميع
+SMOOTHING_SECONDS = 10.0     # طول نافذة التنعيم
+SLOPE_SECONDS = 30.0         # نافذة حساب الميل: أطول من التنعيم حتى لا يقطع ضجيج الحساس الهضاب
+PLATEAU_SLOPE = 0.15         # °C/min: ميل أبطأ من هذا يبدأ هضبة (حرارة كامنة)
+PLATEAU_EXIT_SLOPE = 0.4     # °C/min: الهضبة لا تنتهي إلا بميل أسرع من هذا (تخلف ضد الضجيج)
+PLATEAU_GAP_SECONDS = 5.0    # فجوات أقصر من هذا بين هضبتين تُدمج
+MIN_PLATEAU_SECONDS = 10.0
+BUMP_PROMINENCE = 0.05       # °C: أقل ارتفاع لقمة الحرارة الكامنة
+LATENT_PROMINENCE = 0.5      # °C/min: أقل تباطؤ في التبريد يُعد حرارة كامنة (قمة في منحنى الميل)
+NOISE_FACTOR = 5.0           # قمة الميل يجب أن تتجاوز ضجيج الميل المقدر بهذا المعامل أيضًا
+TEMPER_INDEX_GAIN = 2.0      # نقاط المؤشر لكل 1 °C/min من الميل عند نقطة الانعطاف
+
+
+@dataclass(frozen=True)
+class Plateau:
+    start_time: float
+    end_time: float
+    duration: float
+    temperature: float   # متوسط الحرارة على الهضبة
+    height: float        # ارتفاع الحرارة الكامنة فوق بداية الهضبة
+
+
+@dataclass(frozen=True)
+class TemperingAnalysis:
+    sample_count: int
+    duration: float
+    min_temperature: float
+    max_temperature: float
+    mean_temperature: float
+    cooling_slope: float           # °C/min من أعلى حرارة حتى نقطة الانعطاف
+    inflection_time: typing.Optional[float]         # بداية منطقة الحرارة الكامنة؛ None إن لم يظهر تبلور
+    inflection_temperature: typing.Optional[float]
+    inflection_slope: typing.Optional[float]        # °C/min: الميل الوسيط داخل منطقة الحرارة الكامنة
+    temper_index: float            # 5 = مُقسّى جيدًا، أقل = ناقص التقسية (0 = لا تبلور)، أعلى = زائد التقسية
+    plateaus: tuple = field(default_factory=tuple)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["plateaus"] = tuple(Plateau(**plateau) for plateau in data.get("plateaus", ()))
+        return cls(**data)
+
+
+def bin_samples(times, temperatures, bin_seconds=BIN_SECONDS):
+    """تجميع العينات في فترات زمنية ثابتة (متوسط كل فترة) بعمليات متجهة"""
+    bins = ((times - times[0]) / bin_seconds).astype(np.int64)
+    counts = np.bincount(bins)
+    sums = np.bincount(bins, weights=temperatures)
+    filled = np.flatnonzero(counts)
+    return times[0] + (filled + 0.5) * bin_seconds, sums[filled] / counts[filled]
+
+
+def flat_regions(slopes, start, end):
+    """فترات التبريد البطيء بين start و end مع تخلف: تبدأ تحت PLATEAU_SLOPE ولا تنتهي إلا فوق PLATEAU_EXIT_SLOPE"""
+    magnitudes = np.abs(slopes[start:end])
+    enter = np.flatnonzero(magnitudes <= PLATEAU_SLOPE)
+    regions = []
+    position = 0
+    while position < len(magnitudes):
+        entries = enter[np.searchsorted(enter, position):]
+        if not len(entries):
+            break
+        first = int(entries[0])
+        exits = np.flatnonzero(magnitudes[first:] > PLATEAU_EXIT_SLOPE)
+        last = first + int(exits[0]) - 1 if len(exits) else len(magnitudes) - 1
+        regions.append((start + first, start + last))
+        position = last + 1
+    return regions
+
+
+def merge_regions(regions, times, gap_seconds=0.0):
+    """دمج الفترات المتداخلة أو التي تفصلها فجوة أقصر من gap_seconds"""
+    merged = []
+    for first, last in sorted(regions):
+        if merged and times[first] - times[merged[-1][1]] <= gap_seconds:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+def find_plateaus(times, smoothed, slopes, start, end=None, latent=None):
+    """هضاب الحرارة الكامنة بين start و end: تباطؤ حقيقي في التبريد، لا ذيل المنحنى ولا ضجيج الحساس
+
+    الفترة تُقبل إذا كان لها ارتفاع (قمة تبلور) أو إذا عاد التبريد بعدها أسرع (تغير في الانحناء)؛
+    ذيل التبريد الأسي يقترب من الصفر تدريجيًا ولا يعود التبريد بعده، فلا يُعد هضبة.
+    latent منطقة الحرارة الكامنة من find_latent_heat إن وُجدت، وتُدمج مع ما حولها.
+    """
+    end = len(slopes) if end is None else end
+    regions = flat_regions(slopes, start, end)
+    if latent is not None:
+        regions.append(latent)
+
+    # ✅ القمم (ارتفاع مؤقت بسبب التبلور) تحدها نقطتا نصف البروز
+    from scipy.signal import find_peaks  # ✅ SciPy يُحمّل عند أول تحليل، لا عند بدء التطبيق
+    peaks, properties = find_peaks(smoothed[start:end], prominence=BUMP_PROMINENCE, width=1, rel_height=0.5)
+    for left, right in zip(properties["left_ips"], properties["right_ips"]):
+        regions.append((start + int(left), min(end - 1, start + int(np.ceil(right)))))
+
+    result = []
+    for first, last in merge_regions(regions, times, PLATEAU_GAP_SECONDS):
+        duration = times[last] - times[first]
+        if duration < MIN_PLATEAU_SECONDS:
+            continue
+        segment = smoothed[first:last + 1]
+        height = float(segment.max() - segment[0])  # ✅ الارتفاع فوق بداية الفترة، لا الانخفاض عبرها
+        resumed = last + 1 < end and slopes[last + 1:end].min() < np.median(slopes[first:last + 1]) - PLATEAU_EXIT_SLOPE
+        if height < BUMP_PROMINENCE and not resumed:
+            continue
+        result.append(Plateau(
+            start_time=float(times[first]),
+            end_time=float(times[last]),
+            duration=float(duration),
+            temperature=float(segment.mean()),
+            height=height,
+        ))
+    return tuple(result)
+
+
+def slope_noise(binned, window):
+    """الانحراف المعياري لضجيج الميل (°C/min) المتوقع من ضجيج العينات المجمعة ومعاملات مرشح الاشتقاق"""
+    from scipy.signal import savgol_coeffs
+    # ✅ الفرق الثاني يزيل الاتجاه البطيء؛ MAD يتجاهل النتوءات
+    second = np.diff(binned, 2)
+    sigma = np.median(np.abs(second - np.median(second))) / 0.6745 / np.sqrt(6)
+    return float(sigma * np.linalg.norm(savgol_coeffs(window, 2, deriv=1, delta=BIN_SECONDS)) * 60)
+
+
+def find_latent_heat(slopes, start, end, noise=0.0):
+    """منطقة الحرارة الكامنة: أبرز قمة في منحنى الميل (يتباطأ التبريد ثم يعود)، أو None
+
+    حدود المنطقة عند نصف بروز القمة؛ بدايتها هي نقطة الانعطاف (المشتقة الثانية تبدأ تغيير إشارتها).
+    منحنى تبريد بلا تبلور يتباطأ باستمرار حتى النهاية فلا قمة داخلية له.
+    """
+    if end - start < 3:
+        return None
+    from scipy.signal import find_peaks
+    prominence = max(LATENT_PROMINENCE, NOISE_FACTOR * noise)
+    peaks, properties = find_peaks(slopes[start:end], prominence=prominence, width=1, rel_height=0.5)
+    if not len(peaks):
+        return None
+    best = int(np.argmax(properties["prominences"]))
+    first = start + int(np.floor(properties["left_ips"][best]))
+    last = start + int(np.ceil(properties["right_ips"][best]))
+    return first, last
+
+
+def analyze_curve(times, temperatures):
+    """تحليل منحنى التقسية كاملًا: ميل التبريد، نقطة الانعطاف، هضاب الحرارة الكامنة ومؤشر التقسية"""
+    times = np.asarray(times, dtype=np.float64)
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    if len(temperatures) < 3:
+        raise ValueError("Not enough samples to analyze")
+
+    bin_times, binned = bin_samples(times, temperatures)
+    if len(binned) < 3:
+        raise ValueError("Run is too short to analyze")
+    window = min(int(SMOOTHING_SECONDS / BIN_SECONDS) | 1, (len(binned) - 1) | 1)
+    from scipy.signal import savgol_filter
+    smoothed = savgol_filter(binned, window, 2) if window > 2 else binned
+    slope_window = min(int(SLOPE_SECONDS / BIN_SECONDS) | 1, (len(binned) - 1) | 1)
+    if slope_window > 2:
+        slopes = savgol_filter(binned, slope_window, 2, deriv=1, delta=BIN_SECONDS) * 60  # °C/min
+    else:
+        slopes = np.gradient(smoothed, bin_times) * 60
+
+    # ✅ أطراف الاشتقاق (نصف نافذة في كل جهة) لا تُعتمد: ميلها تقديري ويصنع قممًا وهمية عند نهاية التشغيلة
+    peak = int(np.argmax(smoothed))
+    start, end = max(peak, slope_window // 2), len(slopes) - slope_window // 2
+    noise = slope_noise(binned, slope_window) if slope_window > 2 else 0.0
+    latent = find_latent_heat(slopes, start, end, noise)
+    if latent is not None:
+        first, last = latent
+        inflection_slope = float(np.median(slopes[first:last + 1]))
+        inflection_time = float(bin_times[first] - times[0])
+        inflection_temperature = float(smoothed[first])
+        temper_index = round(float(np.clip(5 + TEMPER_INDEX_GAIN * inflection_slope, 0, 10)), 1)
+        cooling_end = first
+    else:
+        # لا تبلور خلال التشغيلة: غير مُقسّى مهما كان طولها
+        inflection_slope = inflection_time = inflection_temperature = None
+        temper_index = 0.0
+        cooling_end = end - 1
+    if cooling_end - peak >= 2:
+        cooling_slope = np.polyfit(bin_times[peak:cooling_end + 1], smoothed[peak:cooling_end + 1], 1)[0] * 60
+    else:
+        cooling_slope = slopes[peak]
+
+    return TemperingAnalysis(
+        sample_count=len(temperatures),
+        duration=float(times[-1] - times[0]),
+        min_temperature=float(temperatures.min()),
+        max_temperature=float(temperatures.max()),
+        mean_temperature=float(temperatures.mean()),
+        cooling_slope=float(cooling_slope),
+        inflection_time=inflection_time,
+        inflection_temperature=inflection_temperature,
+        inflection_slope=inflection_slope,
+        temper_index=temper_index,
+        plateaus=find_plateaus(bin_times - times[0], smoothed, slopes, start, end, latent),
+    )
+
 
 class DataAnalysis:
-    def __init__(self, results_folder):
+    def __init__(self, results_folder, renderer=None):
         self.results_folder = results_folder
+        self.renderer = renderer  # ✅ ResultRenderer اختياري للرسم في الخلفية
 
     def ensure_directory(self):
         """إنشاء مجلد اليوم إذا لم يكن موجودًا"""
         today_folder = self.get_today_folder()
         if not os.path.exists(today_folder):
             os.makedirs(today_folder)
-            print(f"[INFO] Created directory: {today_folder}")
+            logger.info("📂 Created directory: %s", today_folder)
         return today_folder
 
     def get_today_folder(self):
@@ -20,53 +234,74 @@ class DataAnalysis:
         today = datetime.date.today().strftime("%Y-%m-%d")
         return os.path.join(self.results_folder, today)
 
+    def load_data(self, data_file):
+        """تحميل بيانات التشغيلة من ملف .run (بدون تحليل نصي) أو من CSV"""
+        import pandas as pd  # ✅ pandas يُحمّل عند الحاجة فقط
+        if data_file.endswith(RUN_EXTENSION):
+            run = RunFile(data_file)
+            return pd.DataFrame({CSV_COLUMNS[0]: run.times, CSV_COLUMNS[1]: run.temperatures})
+        return pd.read_csv(data_file)
+
+    def saved_analysis(self, data_file):
+        """نتيجة التحليل المحفوظة داخل ملف .run إن وجدت (بدون إعادة حساب)"""
+        if not data_file.endswith(RUN_EXTENSION):
+            return None
+        analysis = RunFile(data_file).metadata.get("analysis")
+        return None if analysis is None else TemperingAnalysis.from_dict(analysis)
+
     def analyze_and_save(self, csv_file):
         """تحليل البيانات وتصدير النتائج كصورة PNG"""
         try:
             # التحقق من وجود الملف
             if not os.path.exists(csv_file):
-                print(f"[ERROR] File {csv_file} not found.")
+                logger.error("❌ File %s not found.", csv_file)
                 return
 
-            df = pd.read_csv(csv_file)
+            df = self.load_data(csv_file)
 
             # التحقق من وجود الأعمدة المطلوبة
             if 'Time (s)' not in df.columns or 'Temperature (°C)' not in df.columns:
-                print("[ERROR] CSV file does not contain required columns: 'Time (s)', 'Temperature (°C)'")
+                logger.error("❌ CSV file does not contain required columns: 'Time (s)', 'Temperature (°C)'")
                 return
 
             if df.empty:
-                print("[ERROR] CSV file is empty.")
+                logger.error("❌ CSV file is empty.")
                 return
 
-            plt.figure(figsize=(2.28, 4), dpi=300)  # مقاس 58 ملم (2.28 انش)
+            # ✅ تحليل المنحنى كاملًا ومؤشر التقسية من الميل عند نقطة الانعطاف
+            analysis = self.saved_analysis(csv_file)
+            if analysis is None:
+                analysis = analyze_curve(df['Time (s)'].to_numpy(), df['Temperature (°C)'].to_numpy())
+            temper_index = analysis.temper_index
 
-            # رسم العنوان
-            plt.text(0.5, 1.05, "Choco-Master", fontsize=14, ha='center', transform=plt.gca().transAxes)
+            # حفظ الصورة بصيغة PNG
+            save_path = os.path.join(self.ensure_directory(), f"result_{datetime.datetime.now().strftime('%H-%M-%S')}.png")
+            save_path = unique_path(save_path)
+            times = df['Time (s)'].to_numpy()
+            temperatures = df['Temperature (°C)'].to_numpy()
 
-            # رسم الشارت
-            plt.plot(df['Time (s)'], df['Temperature (°C)'], label='Temperature', color='blue')
-            plt.xlabel('Time (s)')
-            plt.ylabel('Temperature (°C)')
-            plt.title('Temperature Analysis')
-            plt.legend()
-            plt.grid()
+            if self.renderer is not None:
+                # ✅ الرسم في الخلفية؛ المستدعي يحصل على Future
+                return self.renderer.submit(render_receipt, save_path, times, temperatures, temper_index,
+                                            callback=self.report_result)
 
-            # حساب مؤشر التمبراندكس
-            temper_index = round(df['Temperature (°C)'].mean(), 2)
-            plt.text(0.5, -0.15, f"Temper Index: {temper_index}", fontsize=12, ha='center', transform=plt.gca().transAxes)
+            render_receipt(save_path, times, temperatures, temper_index)
+            logger.info("📷 Analysis saved as PNG at: %s", save_path)
+            return save_path
 
-            # حفظ الصورة بصيغة PNG
-            save_path = os.path.join(self.ensure_directory(), f"result_{datetime.datetime.now().strftime('%H-%M-%S')}.png")
-            plt.savefig(save_path, bbox_inches='tight', dpi=300)
-            plt.close()
-            print(f"[SUCCESS] Analysis saved as PNG at: {save_path}")
+        except Exception:
+            logger.exception("❌ An error occurred during analysis")
 
-        except Exception as e:
-            print(f"[ERROR] An error occurred during analysis: {e}")
+    def report_result(self, future):
+        """تسجيل نتيجة الرسم في الخلفية"""
+        try:
+            logger.info("📷 Analysis saved as PNG at: %s", future.result())
+        except Exception:
+            logger.exception("❌ An error occurred during rendering")
 
-# مثال على الاستخدام
+# إعادة تحليل تشغيلة أو مجلد نتائج كامل من سطر الأوامر (انظر algorithms.batch_reanalysis):
+#   python -m algorithms.data_analysis results/2025-01-27/exported_data.csv
 if __name__ == "__main__":
-    csv_path = "C:\\Users\\32465\\Documents\\arkak project\\choco-master\\results\\2025-01-27\\exported_data.csv"
-    analysis = DataAnalysis("C:\\Users\\32465\\Documents\\arkak project\\choco-master\\results")
-    analysis.analyze_and_save(csv_path)
+    import sys
+    from algorithms.batch_reanalysis import main
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import queue
+from collections import deque
+from dataclasses import dataclass
+
+PLATEAU_START = "plateau_start"
+PLATEAU_END = "plateau_end"
+
+
+@dataclass(frozen=True)
+class PlateauEvent:
+    kind: str              # PLATEAU_START أو PLATEAU_END
+    timestamp: float       # الزمن الرتيب للعينة التي تحققت عندها الحالة
+    temperature: float     # الحرارة المنعمة عند الحدث
+    slope: float           # °C/min
+    duration: float = 0.0  # مدة الهضبة (لحدث النهاية فقط)
+
+
+class PlateauDetector:
+    """كاشف هضاب الحرارة الكامنة أثناء القراءة: O(1) لكل عينة مع تخلف (hysteresis) يراعي الضجيج"""
+
+    def __init__(self, window_seconds=5.0, history_size=16384, enter_slope=0.15, exit_slope=0.4,
+                 noise_factor=3.0, hold_seconds=2.0, smoothing=0.05):
+        self.window_seconds = window_seconds
+        self.enter_slope = enter_slope    # °C/min: تبريد أبطأ من هذا يعني بداية هضبة
+        self.exit_slope = exit_slope      # °C/min: عودة التبريد أسرع من هذا تعني نهاية الهضبة
+        self.noise_factor = noise_factor
+        self.hold_seconds = hold_seconds  # مدة ثبات الحالة قبل إصدار الحدث
+        self.smoothing = smoothing
+        # انحراف القيمة المنعمة المعياري نسبةً إلى ضجيج العينة (مرشح EMA)
+        self.smoothed_noise_ratio = (smoothing / (2 - smoothing)) ** 0.5
+        self.history = deque(maxlen=history_size)  # (الزمن، القيمة المنعمة)
+        self.events = queue.SimpleQueue()  # ✅ غير محدود: لا يضيع أي حدث مهما تأخرت الواجهة
+        self.reset()
+
+    def reset(self):
+        self.history.clear()
+        self.smoothed = None
+        self.previous_value = None
+        self.noise = 0.0
+        self.slope = 0.0
+        self.cooling = False
+        self.in_plateau = False
+        self.candidate_since = None
+        self.plateau_start = None
+
+    def update_batch(self, timestamps, values):
+        """معالجة دفعة من العينات بالترتيب (من خيط القراءة)"""
+        for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+            self.update(timestamp, value)
+
+    def update(self, timestamp, value):
+        """معالجة عينة واحدة في زمن ثابت"""
+        if self.smoothed is None:
+            self.smoothed = self.previous_value = value
+        self.smoothed += self.smoothing * (value - self.smoothed)
+        # ✅ الضجيج من الفرق بين عينتين متتاليتين: الاتجاه العام لا يؤثر فيه تقريبًا
+        step = abs(value - self.previous_value) * 0.886  # 0.886 = √π/2: يحول متوسط |Δ| إلى σ
+        self.noise += self.smoothing * (step - self.noise)
+        self.previous_value = value
+
+        history = self.history
+        history.append((timestamp, self.smoothed))
+        while len(history) > 2 and timestamp - history[1][0] >= self.window_seconds:
+            history.popleft()
+        span = timestamp - history[0][0]
+        if span < self.window_seconds / 2:
+            return
+        self.slope = (self.smoothed - history[0][1]) / span * 60
+
+        # ✅ عتبة تتكيف مع الضجيج: الميل الذي قد ينتج عن الضجيج وحده على طول النافذة
+        noise_slope = self.noise_factor * 1.414 * self.noise * self.smoothed_noise_ratio / span * 60
+        enter = max(self.enter_slope, noise_slope)
+        exit_ = max(self.exit_slope, 2 * enter)
+
+        if not self.in_plateau:
+            if self.slope <= -exit_:
+                self.cooling = True
+                self.candidate_since = None
+            elif self.cooling and self.slope >= -enter:
+                self.confirm(timestamp, PLATEAU_START)
+            else:
+                self.candidate_since = None
+        else:
+            # الارتفاع (قمة الحرارة الكامنة) يبقى جزءًا من الهضبة؛ فقط عودة التبريد تنهيها
+            if self.slope <= -exit_:
+                self.confirm(timestamp, PLATEAU_END)
+            else:
+                self.candidate_since = None
+
+    def confirm(self, timestamp, kind):
+        """إصدار الحدث بعد بقاء الحالة الجديدة مدة hold_seconds"""
+        if self.candidate_since is None:
+            self.candidate_since = (timestamp, self.smoothed)
+            return
+        since, temperature = self.candidate_since
+        if timestamp - since < self.hold_seconds:
+            return
+        self.candidate_since = None
+        if kind == PLATEAU_START:
+            self.in_plateau = True
+            self.plateau_start = since
+            self.events.put(PlateauEvent(kind, since, temperature, self.slope))
+        else:
+            self.in_plateau = False
+            self.cooling = True
+            self.events.put(PlateauEvent(kind, since, temperature, self.slope, since - self.plateau_start))
+
+    def drain_events(self):
+        """كل الأحداث المتراكمة منذ آخر استدعاء"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+import numpy as np
+from algorithms.data_analysis import bin_samples
+
+DEVIATION_START = "deviation_start"
+DEVIATION_END = "deviation_end"
+PROFILE_STEP = 0.5           # ثوانٍ لكل نقطة مقارنة (مثل دقة التحليل BIN_SECONDS)
+PROFILE_WINDOW_SECONDS = 60  # أقصى تقدم أو تأخر مسموح بين التشغيلة والملف المرجعي
+DEFAULT_TOLERANCE = 1.0      # °C
+RETURN_FRACTION = 0.8        # العودة داخل 80% من السماحية تنهي التنبيه (تخلف ضد الضجيج)
+
+
+@dataclass(frozen=True)
+class GoldenProfile:
+    """منحنى تقسية مرجعي لوصفة: الأزمنة بالثواني من بداية التشغيلة"""
+    recipe: str
+    times: np.ndarray
+    temperatures: np.ndarray
+    tolerance: float = DEFAULT_TOLERANCE
+
+    def resample(self, step=PROFILE_STEP):
+        """متوسط الحرارة في فترات ثابتة طولها step (مراكزها عند (j + 0.5) × step)"""
+        times = np.asarray(self.times, dtype=np.float64)
+        temperatures = np.asarray(self.temperatures, dtype=np.float64)
+        bin_times, binned = bin_samples(times, temperatures, step)
+        centers = (np.arange(int((times[-1] - times[0]) / step) + 1) + 0.5) * step
+        return np.interp(centers, bin_times - times[0], binned)
+
+
+@dataclass(frozen=True)
+class DeviationEvent:
+    kind: str           # DEVIATION_START أو DEVIATION_END
+    timestamp: float    # الزمن الرتيب للعينة التي تجاوزت السماحية أو عادت إليها
+    temperature: float
+    expected: float     # حرارة الملف المرجعي عند الموضع المحاذى
+    deviation: float    # temperature - expected
+    lag: float          # ثوانٍ: موجب = التشغيلة متأخرة عن الملف المرجعي
+
+
+class StreamingProfileMatcher:
+    """محاذاة التشغيلة الجارية مع ملف مرجعي بـ DTW تدريجي محدود النافذة، وتنبيه عند الخروج عن السماحية
+
+    العينات تُجمع في فترات طولها step؛ كل فترة مكتملة تضيف صفًا واحدًا لمصفوفة DTW داخل نافذة
+    عرضها 2 × window فقط (خطوات مسموحة: (i-1, j)، (i-1, j-1)، (i-1, j-2)). التكلفة ثابتة لكل عينة
+    مهما طالت التشغيلة، والانحراف يُحسب لكل عينة فور وصولها من آخر محاذاة معروفة.
+    """
+
+    def __init__(self, profile, step=PROFILE_STEP, window_seconds=PROFILE_WINDOW_SECONDS, tolerance=None):
+        self.profile = profile
+        self.step = step
+        self.reference = profile.resample(step)
+        self.window = max(1, int(round(window_seconds / step)))
+        self.tolerance = profile.tolerance if tolerance is None else tolerance
+        self.listeners = []
+        self.reset(0.0)
+
+    def add_listener(self, callback):
+        """callback(event) تُستدعى من خيط القراءة فور تغير حالة التنبيه"""
+        self.listeners.append(callback)
+
+    def reset(self, start_time):
+        self.start_time = start_time
+        self.bin_index = -1          # آخر فترة مكتملة أُضيفت إلى DTW
+        self.bin_sum = 0.0
+        self.bin_count = 0
+        self.current_bin = 0
+        self.costs = None            # صف DTW الأخير داخل النافذة فقط
+        self.band_start = 0
+        self.position = 0            # موضع الملف المرجعي المحاذى لآخر فترة مكتملة
+        self.lag = 0.0
+        self.expected = float(self.reference[0])
+        self.deviation = 0.0
+        self.alerting = False
+
+    def update_batch(self, timestamps, values):
+        """معالجة دفعة من خيط القراءة (مستقبل دفعات للقناة)"""
+        keep = timestamps >= self.start_time
+        timestamps, values = timestamps[keep], np.asarray(values, dtype=np.float64)[keep]
+        if not len(values):
+            return
+        bins = ((timestamps - self.start_time) / self.step).astype(np.int64)
+        splits = np.flatnonzero(np.diff(bins)) + 1
+        for group_times, group_values, group_bins in zip(np.split(timestamps, splits), np.split(values, splits),
+                                                        np.split(bins, splits)):
+            if group_bins[0] != self.current_bin:
+                self.close_bins(int(group_bins[0]))
+            self.check_samples(group_times, group_values)
+            self.bin_sum += float(group_values.sum())
+            self.bin_count += len(group_values)
+
+    def close_bins(self, next_bin):
+        """إكمال الفترة الجارية (والفترات الفارغة بعدها إن انقطعت القراءة) وإضافتها إلى DTW"""
+        value = self.bin_sum / self.bin_count if self.bin_count else None
+        # ✅ قبل أول فترة مكتملة: الفترات الفارغة منذ reset تُملأ بمتوسط أول فترة فيها عينات،
+        # حتى يبقى bin_index مطابقًا للزمن المنقضي ولا ينحرف lag طوال التشغيلة
+        first = 0 if self.bin_index < 0 else self.current_bin
+        for _ in range(first, next_bin):
+            if value is not None:
+                self.dtw_step(value)
+        self.current_bin = next_bin
+        self.bin_sum, self.bin_count = 0.0, 0
+
+    def dtw_step(self, value):
+        """صف DTW جديد داخل النافذة [i - window, i + window] وأفضل نهاية مفتوحة له"""
+        self.bin_index += 1
+        i, last = self.bin_index, len(self.reference) - 1
+        low, high = min(max(0, i - self.window), last), min(last, i + self.window)
+        distances = np.abs(value - self.reference[low:high + 1])
+        if self.costs is None:
+            costs = np.full(high - low + 1, np.inf)
+            costs[0] = distances[0]  # المحاذاة تبدأ من بداية الملف المرجعي
+        else:
+            # الصف السابق مع حشو يمثل المواضع [band_start - 2, band_end + 1]
+            padded = np.concatenate(((np.inf, np.inf), self.costs, (np.inf,)))
+            columns = np.arange(low, high + 1) - self.band_start + 2
+            costs = distances + np.minimum(np.minimum(padded[columns], padded[columns - 1]), padded[columns - 2])
+        self.costs, self.band_start = costs, low
+        self.position = low + int(np.argmin(costs))
+        self.lag = (i - self.position) * self.step
+
+    def check_samples(self, timestamps, values):
+        """الانحراف عن الموضع المحاذى لكل عينة، وأحداث بداية/نهاية التنبيه"""
+        progress = (timestamps - self.start_time) / self.step - 0.5
+        if self.bin_index >= 0:
+            progress = self.position + progress - self.bin_index
+        expected = np.interp(progress, np.arange(len(self.reference)), self.reference)
+        deviations = values - expected
+        self.expected, self.deviation = float(expected[-1]), float(deviations[-1])
+
+        magnitudes = np.abs(deviations)
+        index = 0
+        while index < len(values):
+            if self.alerting:
+                changes = np.flatnonzero(magnitudes[index:] <= self.tolerance * RETURN_FRACTION)
+            else:
+                changes = np.flatnonzero(magnitudes[index:] > self.tolerance)
+            if not len(changes):
+                break
+            index += int(changes[0])
+            self.alerting = not self.alerting
+            event = DeviationEvent(DEVIATION_START if self.alerting else DEVIATION_END, float(timestamps[index]),
+                                   float(values[index]), float(expected[index]), float(deviations[index]), self.lag)
+            for callback in self.listeners:
+                callback(event)
+            index += 1
@@ -0,0 +1,61 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def unique_path(path):
+    """حجز اسم ملف غير مستخدم، مع لاحقة رقمية إذا كان موجودًا (تشغيلتان تنتهيان في نفس الثانية)
+
+    الاسم يُحجز بإنشاء ملف فارغ (O_EXCL) لأن الكتابة الفعلية تتم لاحقًا في خيط الرسم:
+    فحص الوجود وحده يعطي حفظين متتاليين نفس الاسم فيكتب الثاني فوق الأول.
+    """
+    base, extension = os.path.splitext(path)
+    candidate, counter = path, 1
+    while True:
+        try:
+            os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return candidate
+        except FileExistsError:
+            candidate = f"{base}_{counter}{extension}"
+            counter += 1
+
+
+def new_figure(figsize):
+    """شكل matplotlib جديد بدقة 300dpi؛ matplotlib يُستورد عند أول رسم فقط (بدء أسرع للتطبيق)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    figure = Figure(figsize=figsize, dpi=300)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def render_temperature_curve(image_path, times, temperatures):
+    """رسم منحنى التشغيلة وحفظه PNG بدقة 300dpi دون استخدام حالة pyplot العامة"""
+    figure = new_figure((6, 4))
+    axes = figure.add_subplot()
+    axes.plot(times, temperatures, label="Temperature Curve", color="black", linewidth=1.5)
+    axes.set_xlabel("Time (s)")
+    axes.set_ylabel("Temperature (°C)")
+    axes.set_title("Temperature Curve")
+    axes.grid(True, linestyle="--", linewidth=0.5)
+    axes.legend()
+    figure.savefig(image_path, bbox_inches='tight')
+    return image_path
+
+
+class ResultRenderer:
+    """تنفيذ رسم النتائج في خيوط خلفية حتى لا تتجمد الواجهة"""
+
+    def __init__(self, max_workers=2):
+        # كل مهمة تنشئ Figure خاصًا بها، لذلك يمكن تنفيذ عدة مهام في نفس الوقت بأمان
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="result-render")
+
+    def submit(self, function, *args, callback=None):
+        """جدولة مهمة رسم؛ callback(future) تُستدعى من خيط العامل عند الانتهاء"""
+        future = self.executor.submit(function, *args)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def shutdown(self, wait=True):
+        """انتظار انتهاء المهام الجارية وإغلاق الخيوط"""
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,56 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def savgol_coeffs(window_length, polyorder, pos):
+    """معاملات سافيتسكي-غولاي لتقدير القيمة عند الموضع pos من النافذة (ترتيب الضرب النقطي)
+
+    مطابقة لـ scipy.signal.savgol_coeffs(..., use='dot') دون تحميل SciPy عند بدء التطبيق.
+    """
+    offsets = np.arange(window_length) - pos
+    vandermonde = offsets[:, None] ** np.arange(polyorder + 1)
+    return np.linalg.pinv(vandermonde)[0]
+
+
+class StreamingSavgol:
+    """تنعيم سافيتسكي-غولاي تدريجي يطابق savgol_filter(x, window, order) بالنمط الافتراضي interp"""
+
+    def __init__(self, window_length=11, polyorder=3, capacity=2 ** 20):
+        self.window_length = window_length
+        self.half = window_length // 2
+        # ✅ معاملات محسوبة مسبقًا: المركز للنقاط الداخلية، وكل موضع في النافذة للأطراف
+        self.center_coeffs = savgol_coeffs(window_length, polyorder, self.half)
+        self.edge_coeffs = np.array([savgol_coeffs(window_length, polyorder, pos) for pos in range(window_length)])
+        self.output = np.empty(capacity)
+        self.count = 0
+
+    def reset(self):
+        """بدء سلسلة جديدة"""
+        self.count = 0
+
+    def update(self, values):
+        """تنعيم العينات الجديدة فقط؛ values هي كل عينات السلسلة حتى الآن"""
+        size = len(values)
+        if size < self.count:
+            self.count = 0
+        if size > len(self.output):
+            self.output = np.resize(self.output, max(size, 2 * len(self.output)))
+
+        window, half = self.window_length, self.half
+        if size < window:
+            # ✅ مثل السلوك السابق: لا تنعيم قبل اكتمال أول نافذة
+            self.output[:size] = values
+        else:
+            # النقاط التي تتأثر بالعينات الجديدة: آخر نصف نافذة محسوبة سابقًا وما بعدها
+            start = 0 if self.count < window else self.count - half
+            low = max(start, half)
+            high = size - half
+            if high > low:
+                windows = sliding_window_view(values[low - half:high + half], window)
+                np.dot(windows, self.center_coeffs, out=self.output[low:high])
+            if start < half:
+                np.dot(self.edge_coeffs[:half], values[:window], out=self.output[:half])
+            np.dot(self.edge_coeffs[window - half:], values[size - window:size], out=self.output[size - half:size])
+
+        self.count = size
+        return self.output[:size]
@@ -0,0 +1,153 @@
+import struct
+import numpy as np
+
+# تقرير الطابعة الحرارية 58 ملم يُرسم مباشرة كصورة أحادية البت بعرض رأس الطباعة (384 نقطة عند 203dpi)،
+# ثم يُرسل كأوامر ESC/POS نقطية (GS v 0) دون matplotlib. النقطة السوداء = True.
+PRINTER_DOTS = 384
+MARGIN = 8
+PLOT_HEIGHT = 260
+AXIS_WIDTH = 44         # مساحة أرقام محور الحرارة يسار الرسم
+CURVE_THICKNESS = 2
+BAND_ROWS = 256         # أسطر كل أمر GS v 0 (حدود ذاكرة الطابعات الرخيصة)
+FEED_LINES = 4
+
+ESC_INIT = b"\x1b\x40"
+ESC_FEED = b"\x1b\x64"
+GS_RASTER = b"\x1d\x76\x30\x00"   # GS v 0، الوضع العادي
+GS_CUT = b"\x1d\x56\x42\x00"      # قص جزئي بعد التغذية
+
+FONTS = {}
+
+
+def font(size):
+    """خط Pillow الافتراضي بحجم معين (يُحمّل مرة واحدة لكل حجم)"""
+    if size not in FONTS:
+        from PIL import ImageFont  # ✅ Pillow يُحمّل عند أول تقرير، لا عند بدء التطبيق
+        try:
+            FONTS[size] = ImageFont.load_default(size=size)
+        except TypeError:  # Pillow < 10.1: خط نقطي بحجم ثابت
+            FONTS[size] = ImageFont.load_default()
+    return FONTS[size]
+
+
+def text_block(lines, width=PRINTER_DOTS):
+    """أسطر نص متوسطة: [(النص، الحجم)] → مصفوفة نقاط"""
+    from PIL import Image, ImageDraw
+    heights = [size + 6 for _, size in lines]
+    image = Image.new("1", (width, sum(heights)), 1)
+    draw = ImageDraw.Draw(image)
+    top = 0
+    for (text, size), height in zip(lines, heights):
+        draw.text((width // 2, top + height // 2), text, font=font(size), fill=0, anchor="mm")
+        top += height
+    return ~np.asarray(image)
+
+
+def curve_columns(times, temperatures, width, height, low, high):
+    """أعلى وأدنى صف لكل عمود بكسل (غلاف المنحنى) بعمليات متجهة، متصل بين الأعمدة"""
+    span = max(times[-1] - times[0], 1e-9)
+    columns = ((times - times[0]) / span * (width - 1)).astype(np.int64)
+    rows = (high - temperatures) / max(high - low, 1e-9) * (height - 1)
+    starts = np.flatnonzero(np.diff(columns, prepend=-1))
+    present = columns[starts]
+    tops = np.interp(np.arange(width), present, np.minimum.reduceat(rows, starts))
+    bottoms = np.interp(np.arange(width), present, np.maximum.reduceat(rows, starts))
+    # ✅ وصل كل عمود بالعمود السابق حتى لا تظهر فجوات في المنحدرات الحادة
+    previous_tops, previous_bottoms = np.roll(tops, 1), np.roll(bottoms, 1)
+    previous_tops[0], previous_bottoms[0] = tops[0], bottoms[0]
+    tops = np.minimum(tops, previous_bottoms)
+    bottoms = np.maximum(bottoms, previous_tops)
+    return np.round(tops).astype(np.int64), np.round(bottoms).astype(np.int64)
+
+
+def plot_block(times, temperatures, width=PRINTER_DOTS, height=PLOT_HEIGHT):
+    """رسم المنحنى مع المحاور وخطوط شبكة منقطة → مصفوفة نقاط"""
+    low, high = float(np.min(temperatures)), float(np.max(temperatures))
+    padding = max((high - low) * 0.05, 0.5)
+    low, high = low - padding, high + padding
+    left, right, top, bottom = MARGIN + AXIS_WIDTH, width - MARGIN, 8, height - 22
+    plot_width, plot_height = right - left, bottom - top
+
+    from PIL import Image, ImageDraw
+    image = Image.new("1", (width, height), 1)
+    draw = ImageDraw.Draw(image)
+    small = font(14)
+    for fraction in (0.0, 0.5, 1.0):
+        row = top + round((1 - fraction) * (plot_height - 1))
+        label = f"{low + fraction * (high - low):.1f}"
+        draw.text((left - 4, row), label, font=small, fill=0, anchor="rm")
+        if 0 < fraction < 1:
+            for x in range(left, right, 6):
+                draw.point((x, row), fill=0)
+    draw.line((left, top, left, bottom, right - 1, bottom), fill=0)
+    duration = float(times[-1] - times[0])
+    draw.text((left, height - 2), "0 s", font=small, fill=0, anchor="ld")
+    draw.text((right - 1, height - 2), f"{duration:.0f} s", font=small, fill=0, anchor="rd")
+    dots = ~np.asarray(image)
+
+    tops, bottoms = curve_columns(times, temperatures, plot_width, plot_height, low, high)
+    rows = np.arange(plot_height)[:, None]
+    curve = (rows >= tops - CURVE_THICKNESS // 2) & (rows <= bottoms + CURVE_THICKNESS // 2)
+    curve[:, 1:] |= curve[:, :-1]  # سماكة أفقية
+    dots[top:bottom, left:right] |= curve
+    return dots
+
+
+def render_receipt_bitmap(times, temperatures, temper_index, subtitle=None, width=PRINTER_DOTS):
+    """تقرير التشغيلة كاملًا كمصفوفة نقاط (الارتفاع، 384) جاهزة للطباعة"""
+    times = np.asarray(times, dtype=np.float64)
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    if len(times) < 2:
+        raise ValueError("Not enough samples to render")
+    header = [("Choco-Master", 32), ("Temperature Analysis", 18)]
+    if subtitle:
+        header.append((subtitle, 16))
+    separator = np.zeros((9, width), dtype=bool)
+    separator[4, MARGIN:width - MARGIN] = True
+    return np.vstack((
+        text_block(header, width),
+        separator,
+        plot_block(times, temperatures, width),
+        separator,
+        text_block([(f"Temper Index: {temper_index}", 28)], width),
+    ))
+
+
+def bitmap_image(dots):
+    """مصفوفة النقاط كصورة Pillow أحادية البت (للحفظ والمعاينة)"""
+    from PIL import Image
+    return Image.fromarray(~dots)
+
+
+def render_receipt(image_path, times, temperatures, temper_index, subtitle=None):
+    """رسم التقرير وحفظه PNG أحادي البت بحجم الطباعة الفعلي"""
+    bitmap_image(render_receipt_bitmap(times, temperatures, temper_index, subtitle)).save(image_path, optimize=False)
+    return image_path
+
+
+def escpos_raster(dots, feed_lines=FEED_LINES, cut=True):
+    """أوامر ESC/POS لطباعة مصفوفة النقاط على شرائح GS v 0، ثم التغذية والقص"""
+    packed = np.packbits(dots, axis=1)  # كل 8 نقاط في بايت، البت الأعلى = النقطة اليسرى
+    width_bytes = packed.shape[1]
+    commands = [ESC_INIT]
+    for start in range(0, len(packed), BAND_ROWS):
+        band = packed[start:start + BAND_ROWS]
+        commands.append(GS_RASTER + struct.pack("<HH", width_bytes, len(band)) + band.tobytes())
+    commands.append(ESC_FEED + bytes([feed_lines]))
+    if cut:
+        commands.append(GS_CUT)
+    return b"".join(commands)
+
+
+class FilePrinter:
+    """طابعة تكتب الأوامر الخام إلى ملف: جهاز الطابعة (/dev/usb/lp0، \\\\localhost\\receipt) أو ملف عادي للاختبار"""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+
+    def print_raster(self, dots, **options):
+        data = escpos_raster(dots, **options)
+        with open(self.path, "ab" if self.append else "wb") as handle:
+            handle.write(data)
+        return len(data)
@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from sensors.arduino_receiver import ArduinoReader, BINARY_PROTOCOL
+from sensors.isolated_acquisition import ProcessReader
+from sensors.async_core import AsyncAcquisitionCore
+from sensors.simulator import PtyBridge, SyntheticCurve
+from sensors.connection import CONNECTED
+
+# هل تفقد القراءة عينات حين تتوقف الواجهة؟ جهاز وهمي يرسل إطارات ثنائية إلى pty بمعدل ثابت ويتخلص
+# مما لا يتسع له مخزن المنفذ (مثل فيض UART الحقيقي)، بينما يحجز الخيط الرئيسي قفل GIL دوريًا:
+#   python -m benchmarks.gui_stall_stress --rate 10000 --stall-ms 1500 --duration 10
+# الوضع "thread" هو القراءة المعتادة داخل عملية الواجهة، و"process" هو ProcessReader (POSIX فقط).
+MODES = ("thread", "process")
+CONNECT_TIMEOUT = 10.0
+DRAIN_SECONDS = 1.0
+WRITE_INTERVAL = 0.002
+
+
+def feed_device(master, rate, duration, results):
+    """عملية الجهاز: إرسال العينات في وقتها دون انتظار القارئ؛ ما لا يتسع له مخزن المنفذ يضيع"""
+    os.set_blocking(master, False)
+    source = SyntheticCurve(rate=rate, protocol=BINARY_PROTOCOL, seed=1)
+    pending = b""  # بقية إطار كُتب جزء منه
+    started = time.monotonic()
+    while time.monotonic() - started < duration:
+        time.sleep(WRITE_INTERVAL)
+        count = int((time.monotonic() - started) * rate) - source.position
+        if count <= 0:
+            continue
+        data = source.encode(count)
+        frame_size = len(data) // count
+        try:
+            written = os.write(master, pending + data)
+        except BlockingIOError:
+            written = 0
+        # ✅ الإطارات التي لم تُكتب تضيع كما في فيض UART؛ الإطار المقطوع فقط يُكمل حتى يبقى التدفق متزامنًا
+        if written < len(pending):
+            pending = pending[written:]
+        else:
+            offset = written - len(pending)
+            remainder = offset % frame_size
+            pending = data[offset:offset + frame_size - remainder] if remainder else b""
+    results.send(source.position)
+
+
+def stall(seconds, loops_per_second):
+    """حجز قفل GIL دون تحرير (مثل رسم أو حفظ ثقيل داخل مكتبة C)"""
+    sum(range(int(seconds * loops_per_second)))
+
+
+def calibrate():
+    started = time.perf_counter()
+    sum(range(2_000_000))
+    return 2_000_000 / (time.perf_counter() - started)
+
+
+def run_mode(mode, rate, duration, stall_seconds, period, loops_per_second):
+    bridge = PtyBridge(SyntheticCurve(rate=rate))
+    reader_class = ProcessReader if mode == "process" else ArduinoReader
+    reader = reader_class(port=bridge.port, protocol=BINARY_PROTOCOL)
+    core = AsyncAcquisitionCore([reader])
+    core.start()
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while reader.state != CONNECTED and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if reader.state != CONNECTED:
+        core.stop()
+        raise RuntimeError(f"{mode}: could not connect to {bridge.port}")
+    start_index = reader.buffer.write_index
+
+    receiver, sender = multiprocessing.get_context("fork").Pipe(duplex=False)
+    device = multiprocessing.get_context("fork").Process(target=feed_device,
+                                                         args=(bridge.master, rate, duration, sender))
+    device.start()
+    stalls = 0
+    started = time.monotonic()
+    while time.monotonic() - started < duration:
+        time.sleep(period)
+        stall(stall_seconds, loops_per_second)
+        stalls += 1
+    generated = receiver.recv()
+    device.join()
+    time.sleep(DRAIN_SECONDS)
+    received = reader.buffer.write_index - start_index
+    core.stop()
+    os.close(bridge.master)
+    os.close(bridge.slave)
+    return {"mode": mode, "generated": generated, "received": received, "lost": generated - received,
+            "stalls": stalls}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count samples lost while the UI thread holds the GIL.")
+    parser.add_argument("--rate", type=float, default=10000, help="device samples per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of streaming per mode")
+    parser.add_argument("--stall-ms", type=float, default=1500, help="length of each UI stall")
+    parser.add_argument("--period-ms", type=float, default=1000, help="pause between stalls")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if process mode loses samples")
+    args = parser.parse_args(argv)
+    if os.name == "nt":
+        print("⚠ The stall stress test needs a POSIX pty.")
+        return 1
+
+    loops_per_second = calibrate()
+    results = []
+    for mode in args.modes:
+        result = run_mode(mode, args.rate, args.duration, args.stall_ms / 1000, args.period_ms / 1000,
+                          loops_per_second)
+        results.append(result)
+        share = 100 * result["lost"] / result["generated"] if result["generated"] else 0
+        print(f"{'✅' if result['lost'] <= 0 else '❌'} {mode:8s} generated {result['generated']:>8d}  "
+              f"received {result['received']:>8d}  lost {result['lost']:>8d} ({share:.2f}%)  "
+              f"{result['stalls']} stalls of {args.stall_ms:.0f} ms")
+    failed = any(result["mode"] == "process" and result["lost"] > 0 for result in results)
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+# قياس زمن بدء التطبيق حتى ظهور أول إطار، وأثقل الوحدات المستوردة عند البدء:
+#   python -m benchmarks.startup_report
+#   python -m benchmarks.startup_report --check --target 1.5   (يفشل إن تجاوز الهدف)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGET = 1.5
+FIRST_FRAME_MARKER = "FIRST_FRAME"
+
+# يعمل في عملية مستقلة: نفس مسار التشغيل الفعلي ثم الخروج بعد أول إطار
+CHILD_SCRIPT = f"""
+import sys, time, os
+import ui.interface as interface
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+app = QApplication(sys.argv)
+window = interface.ChocoMasterUI()
+window.show()
+def first_frame():
+    print("{FIRST_FRAME_MARKER}", time.monotonic() - interface.START_TIME, flush=True)
+    window.acquisition.stop()
+    os._exit(0)
+QTimer.singleShot(0, first_frame)
+app.exec()
+"""
+
+
+def child_environment():
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def import_profile(top=15):
+    """أثقل الوحدات تراكميًا عند استيراد الواجهة (من python -X importtime)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import ui.interface"],
+                            cwd=ROOT, env=child_environment(), capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def first_frame_time(timeout=60):
+    """تشغيل التطبيق بحساس محاكى في مجلد مؤقت؛ يُرجع (زمن أول إطار داخل التطبيق، الزمن الكلي للعملية)"""
+    with tempfile.TemporaryDirectory() as folder:
+        with open(os.path.join(folder, "config.json"), "w", encoding="utf-8") as handle:
+            json.dump({"start_temperature": 30, "duration": 5, "results_root": os.path.join(folder, "results"),
+                       "sensors": [{"port": "sim:rate=50", "channels": 1}]}, handle)
+        started = time.monotonic()
+        result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], cwd=folder, env=child_environment(),
+                                capture_output=True, text=True, timeout=timeout)
+        total = time.monotonic() - started
+    for line in result.stdout.splitlines():
+        if line.startswith(FIRST_FRAME_MARKER):
+            return float(line.split()[1]), total
+    raise RuntimeError(f"Application did not reach the first frame:\n{result.stderr[-2000:]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-start time to the first frame and the heaviest imports.")
+    parser.add_argument("--runs", type=int, default=3, help="number of cold starts to measure")
+    parser.add_argument("--top", type=int, default=15, help="number of modules to list")
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET, help="first-frame target in seconds")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if the target is missed")
+    args = parser.parse_args(argv)
+
+    print("📦 Heaviest imports (cumulative):")
+    for seconds, name in import_profile(args.top):
+        print(f"   {seconds * 1000:8.1f} ms  {name}")
+
+    timings = [first_frame_time() for _ in range(args.runs)]
+    best_frame = min(frame for frame, _ in timings)
+    best_total = min(total for _, total in timings)
+    print(f"🚀 First frame: {best_frame:.2f} s after import start, {best_total:.2f} s including interpreter start "
+          f"(best of {args.runs}, target {args.target:.2f} s)")
+
+    if args.check and best_total > args.target:
+        print(f"❌ Startup exceeds target by {best_total - args.target:.2f} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
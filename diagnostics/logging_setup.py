@@ -0,0 +1,16 @@
+import os
+import logging
+from logging.handlers import RotatingFileHandler
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s"
+
+
+def setup_logging(level=None, log_file=None):
+    """إعداد السجل مرة واحدة عند تشغيل التطبيق؛ المستوى من CHOCO_LOG_LEVEL (الافتراضي INFO)"""
+    level = level or os.environ.get("CHOCO_LOG_LEVEL", "INFO")
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        handlers.append(RotatingFileHandler(log_file, maxBytes=2 * 1024 * 1024, backupCount=3, encoding="utf-8"))
+    logging.basicConfig(level=level.upper() if isinstance(level, str) else level, format=LOG_FORMAT,
+                        handlers=handlers, force=True)
@@ -0,0 +1,135 @@
+import json
+import time
+import bisect
+import datetime
+from threading import Lock
+
+# حدود فئات المدرج التكراري (ميلي ثانية أو أي وحدة): تقريبًا ×2 في كل فئة
+DEFAULT_BOUNDS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Counter:
+    """عداد تراكمي؛ الزيادة عملية واحدة بلا أقفال (تكفي للمراقبة)"""
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """قيمة لحظية: تُضبط مباشرة أو تُقرأ من دالة عند الطلب فقط"""
+
+    def __init__(self, function=None):
+        self.function = function
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        return self.function() if self.function is not None else self.value
+
+
+class Histogram:
+    """مدرج تكراري بفئات ثابتة: الإضافة O(log فئات) والنسب المئوية تقريبية من الفئات"""
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def observe(self, value):
+        with self.lock:
+            self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+
+    def percentile(self, fraction):
+        """الحد الأعلى للفئة التي تقع فيها النسبة المطلوبة"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[index], self.maximum) if index < len(self.bounds) else self.maximum
+        return self.maximum
+
+    def snapshot(self):
+        with self.lock:
+            if not self.count:
+                return {"count": 0}
+            return {
+                "count": self.count,
+                "mean": self.total / self.count,
+                "min": self.minimum,
+                "max": self.maximum,
+                "p50": self.percentile(0.50),
+                "p95": self.percentile(0.95),
+                "p99": self.percentile(0.99),
+            }
+
+
+class MetricsRegistry:
+    """سجل كل المقاييس بالاسم؛ تُنشأ عند أول استخدام"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = Lock()
+        self.started = time.monotonic()
+
+    def get(self, name, factory):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.setdefault(name, factory())
+        return metric
+
+    def counter(self, name):
+        return self.get(name, Counter)
+
+    def gauge(self, name, function=None):
+        gauge = self.get(name, Gauge)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name, bounds=DEFAULT_BOUNDS):
+        return self.get(name, lambda: Histogram(bounds))
+
+    def snapshot(self):
+        """كل القيم الحالية مرتبة بالاسم"""
+        with self.lock:
+            metrics = sorted(self.metrics.items())
+        return {name: metric.snapshot() for name, metric in metrics}
+
+    def dump(self, path):
+        """حفظ لقطة من كل المقاييس في ملف JSON"""
+        report = {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "metrics": self.snapshot(),
+        }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, default=str)
+        return path
+
+
+METRICS = MetricsRegistry()  # ✅ سجل واحد للتطبيق كله
@@ -1,112 +1,255 @@
 import serial
 import time
 import atexit
-from threading import Thread, Event, Lock
+import logging
+from threading import Thread, Event
+from sensors.sensor_channel import SensorChannel
+from sensors.simulator import open_serial, is_simulated_port
+from sensors.binary_protocol import BinaryFrameParser
+from sensors.connection import Backoff, discover_port, AUTO_PORT, DISCONNECTED, CONNECTING, CONNECTED, LOST
+from diagnostics.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# ✅ مقاييس تُحدَّث مرة لكل دفعة، لا لكل عينة
+SAMPLES_RECEIVED = METRICS.counter("reader.samples_received")
+SAMPLES_ACCEPTED = METRICS.counter("reader.samples_accepted")
+OUTLIERS_REJECTED = METRICS.counter("reader.outliers_rejected")
+PARSE_ERRORS = METRICS.counter("reader.parse_errors")
+CONNECTION_LOST = METRICS.counter("serial.connection_lost")
+CONNECT_FAILURES = METRICS.counter("serial.connect_failures")
+CHUNK_TIME = METRICS.histogram("reader.chunk_ms")
+
+TEXT_PROTOCOL = "text"
+BINARY_PROTOCOL = "binary"
+CLOCK_RESYNC_SECONDS = 0.5  # تأخر أكبر من هذا يعني إعادة تشغيل الأردوينو أو انقطاعًا: إعادة ربط الساعتين
+
 
 class ArduinoReader:
-    def __init__(self, port='COM3', baudrate=115200):
+    def __init__(self, port=AUTO_PORT, baudrate=115200, buffer_capacity=2 ** 20, channels=1, protocol=TEXT_PROTOCOL,
+                 vid=None, pid=None):
         self.port = port
         self.baudrate = baudrate
         self.ser = None
         self.running = False
-        self.latest_temperature = None
-        self.previous_temperature = None  # ✅ تخزين آخر قيمة معروفة
-        self.lock = Lock()
+        # ✅ port="auto": البحث عن اللوحة بمعرف USB عند كل محاولة اتصال
+        self.vid = vid
+        self.pid = pid
+        self.device = None if port == AUTO_PORT else port  # المنفذ الفعلي المفتوح
+        self.state = DISCONNECTED
+        self.state_listeners = []
+        # ✅ قناة لكل عمود في السطر: "23.41" لحساس واحد أو "23.41,24.02,..." لعدة حساسات على نفس المنفذ
+        self.channels = [SensorChannel(f"{port}:{index}", buffer_capacity) for index in range(channels)]
         self.stop_event = Event()
-        self.hidden_heat_signal = None  # ✅ تخزين الحرارة الكامنة
-        self.threshold = 0.05  # ✅ الكشف عن الارتفاع المفاجئ فقط
+        self.read_timeout = 0.1  # ✅ مهلة القراءة الحاجبة (تسمح بإيقاف الخيط بسرعة)
+        self.max_chunk_size = 65536  # ✅ أقصى حجم يُقرأ دفعة واحدة من المنفذ
+        self.rx_buffer = bytearray()  # ✅ مخزن مؤقت يعاد استخدامه لتجميع الأسطر
+        # ✅ "binary": إطارات ثابتة الطول تُحلل دفعة واحدة بـ NumPy؛ "text" يبقى الوضع الافتراضي
+        self.protocol = protocol
+        self.frame_parser = BinaryFrameParser(channels) if protocol == BINARY_PROTOCOL else None
+        self.clock_offset = None  # الفرق بين الساعة الرتيبة وساعة الأردوينو
+        self.reconnect_requested = False
         atexit.register(self.cleanup)  # إغلاق الاتصال عند إنهاء البرنامج
 
+    def add_state_listener(self, callback):
+        """تسجيل دالة تُستدعى عند تغير حالة الاتصال: callback(reader, state, detail)"""
+        self.state_listeners.append(callback)
+
+    def set_state(self, state, detail=""):
+        self.state = state
+        for callback in self.state_listeners:
+            callback(self, state, detail)
+
     def connect(self):
-        """محاولة الاتصال بمنفذ الأردوينو"""
-        max_retries = 5
-        for attempt in range(max_retries):
-            try:
-                if self.ser and self.ser.is_open:
-                    self.ser.close()
-                self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-                time.sleep(2)
-                self.ser.reset_input_buffer()
-                print(f"✅ Connected to {self.port} at {self.baudrate} baud rate.")
+        """محاولة اتصال واحدة بمنفذ الأردوينو؛ إعادة المحاولة بفواصل متزايدة مسؤولية من يدير القارئ"""
+        self.set_state(CONNECTING, self.port)
+        self.reconnect_requested = False  # ✅ أي اتصال جديد يستخدم المنفذ والسرعة الحاليين
+        try:
+            if self.ser and self.ser.is_open:
+                self.ser.close()
+            if self.port == AUTO_PORT:
+                self.device = discover_port(self.vid, self.pid)
+                if self.device is None:
+                    raise serial.SerialException("no matching USB serial device found")
+            # ✅ "sim:" و "replay:" تفتح حساسًا وهميًا (للاختبار وقياس الأداء بدون عتاد)
+            self.ser = open_serial(self.device, self.baudrate, self.read_timeout, len(self.channels), self.protocol)
+            if not is_simulated_port(self.device):
+                time.sleep(2)  # انتظار إعادة تشغيل الأردوينو بعد فتح المنفذ
+            self.ser.reset_input_buffer()
+        except (serial.SerialException, OSError) as e:
+            CONNECT_FAILURES.inc()
+            logger.warning("❌ Serial Error on %s: %s", self.port, e)
+            return False
+        self.rx_buffer.clear()
+        if self.frame_parser is not None:
+            self.frame_parser.reset()
+            self.clock_offset = None
+        logger.info("✅ Connected to %s at %s baud rate.", self.device, self.baudrate)
+        self.set_state(CONNECTED, self.device)
+        return True
+
+    def reconfigure(self, port=None, baudrate=None):
+        """تغيير المنفذ أو السرعة أثناء القراءة؛ حلقة القراءة تعيد الاتصال بالقيم الجديدة دون إيقاف القارئ"""
+        if port is not None and port != self.port:
+            self.port = port
+            self.device = None if port == AUTO_PORT else port
+        if baudrate is not None:
+            self.baudrate = baudrate
+        self.reconnect_requested = True
+
+    def connect_with_backoff(self):
+        """إعادة محاولة الاتصال بفواصل متزايدة حتى ينجح أو يُطلب الإيقاف"""
+        backoff = Backoff()
+        while not self.stop_event.is_set():
+            if self.connect():
                 return True
-            except serial.SerialException as e:
-                print(f"❌ Serial Error [{attempt+1}/{max_retries}]: {e}")
-                time.sleep(2)
-        print("❌ Failed to connect to Arduino.")
+            delay = backoff.next_delay()
+            self.set_state(LOST, f"retrying in {delay:.0f} s")
+            self.stop_event.wait(delay)
         return False
 
     def start_reading(self):
-        """بدء قراءة البيانات في خيط منفصل"""
-        if not self.connect():
-            return
+        """بدء الاتصال والقراءة في خيط منفصل (لا يحجب المستدعي مهما كانت حالة اللوحة)"""
         self.running = True
         self.stop_event.clear()
-        self.thread = Thread(target=self.read_loop, daemon=True)
+        self.thread = Thread(target=self.run, daemon=True)
         self.thread.start()
 
+    def run(self):
+        if self.connect_with_backoff():
+            self.read_loop()
+
+    @property
+    def buffer(self):
+        """مخزن القناة الأولى (للمكونات التي تعرض حساسًا واحدًا)"""
+        return self.channels[0].buffer
+
+    def add_batch_listener(self, callback):
+        """تسجيل مستقبل دفعات القناة الأولى"""
+        self.channels[0].add_batch_listener(callback)
+
+    def remove_batch_listener(self, callback):
+        """إلغاء تسجيل مستقبل دفعات القناة الأولى"""
+        self.channels[0].remove_batch_listener(callback)
+
     def read_loop(self):
         """قراءة البيانات بشكل مستمر"""
         while self.running and not self.stop_event.is_set():
+            if self.reconnect_requested:
+                self.reconnect_requested = False
+                self.cleanup()
+                self.connect_with_backoff()
+                continue
             try:
-                if self.ser and self.ser.in_waiting > 0:
-                    data = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    if self.is_valid_temperature(data):
-                        temp = round(float(data), 2)
-
-                        if 15 <= temp <= 36:  # ✅ رفض القيم الشاذة
-                            with self.lock:
-                                if self.previous_temperature is not None:
-                                    temp_difference = temp - self.previous_temperature
-
-                                    # ✅ الكشف عن الحرارة الكامنة عند **ارتفاع فقط**
-                                    if temp_difference >= self.threshold:
-                                        self.hidden_heat_signal = temp
-                                        print(f"🔥 Hidden Heat Detected: {temp}°C")
-
-                                # ✅ تحديث القيم
-                                self.previous_temperature = self.latest_temperature
-                                self.latest_temperature = temp
-
-                                print(f"🌡 Updated Temperature: {self.latest_temperature} °C")
-
-                        else:
-                            print(f"⚠ Ignored Outlier: {temp} °C")
-            except serial.SerialException:
-                print("🔌 Serial Error: Lost connection, attempting to reconnect...")
-                self.connect()
-            except ValueError:
-                print("⚠ Invalid numeric conversion")
-            time.sleep(0.02)  # ✅ تحديث كل 20ms (50 قراءة في الثانية)
+                self.read_available()
+            except (serial.SerialException, OSError):
+                CONNECTION_LOST.inc()
+                logger.warning("🔌 Serial Error on %s: Lost connection, attempting to reconnect...", self.port)
+                self.set_state(LOST)
+                self.connect_with_backoff()
         self.cleanup()
 
-    def is_valid_temperature(self, data):
-        """التحقق من صحة البيانات"""
-        try:
-            float(data)
-            return True
-        except ValueError:
-            return False
+    def read_available(self):
+        """قراءة حاجبة ثم معالجة ما وصل"""
+        chunk = self.read_chunk()
+        if chunk:
+            self.handle_chunk(chunk, time.monotonic())
+
+    def read_chunk(self):
+        """قراءة حاجبة: تنتظر وصول بايت واحد على الأقل ثم تفرغ كل ما في مخزن المنفذ"""
+        size = min(max(self.ser.in_waiting, 1), self.max_chunk_size)
+        return self.ser.read(size)
+
+    def handle_chunk(self, chunk, timestamp):
+        """تقسيم البيانات الواردة إلى أسطر كاملة ومعالجتها كدفعة واحدة"""
+        if self.frame_parser is not None:
+            self.handle_frames(chunk, timestamp)
+            return
+        buffer = self.rx_buffer
+        buffer += chunk
+        end = buffer.rfind(b'\n')
+        if end < 0:
+            if len(buffer) > self.max_chunk_size:
+                buffer.clear()  # ✅ بيانات بلا نهاية سطر: تجاهلها بدل أن يكبر المخزن
+            return
+        started = time.perf_counter()
+        lines = buffer[:end].split(b'\n')
+        del buffer[:end + 1]  # ✅ إبقاء السطر غير المكتمل فقط للدفعة التالية
+        self.process_lines(lines, timestamp)
+        CHUNK_TIME.observe((time.perf_counter() - started) * 1000)
+
+    def process_lines(self, lines, timestamp):
+        """تحويل الأسطر إلى قيم حرارة وتحديث كل قناة مرة واحدة لكل دفعة"""
+        batches = [[] for _ in self.channels]
+        single = len(self.channels) == 1
+        received = parse_errors = outliers = 0
+        for line in lines:
+            for batch, field in zip(batches, (line,) if single else line.split(b',')):
+                received += 1
+                try:
+                    temp = round(float(field), 2)  # float يقبل البايتات والمسافات مباشرة دون فك الترميز
+                except ValueError:
+                    parse_errors += 1
+                    continue
+                if 15 <= temp <= 36:  # ✅ رفض القيم الشاذة
+                    batch.append(temp)
+                else:
+                    outliers += 1
+                    logger.debug("⚠ Ignored Outlier: %s °C", temp)
+
+        accepted = 0
+        for channel, batch in zip(self.channels, batches):
+            if batch:
+                accepted += len(batch)
+                channel.push(batch, timestamp)
+
+        SAMPLES_RECEIVED.inc(received)
+        SAMPLES_ACCEPTED.inc(accepted)
+        OUTLIERS_REJECTED.inc(outliers)
+        PARSE_ERRORS.inc(parse_errors)
+        if batches[0] and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🌡 Updated Temperature: %s °C (%d samples)", batches[0][-1], len(batches[0]))
+
+    def handle_frames(self, chunk, timestamp):
+        """تحويل الإطارات الثنائية الكاملة إلى مصفوفات وتحديث كل قناة مرة واحدة لكل دفعة"""
+        started = time.perf_counter()
+        frames = self.frame_parser.feed(chunk)
+        if frames is None:
+            return
+        _, device_times, temperatures = frames
+        # ✅ زمن كل عينة من ساعة الأردوينو؛ أصغر فرق بين الساعتين هو الأقرب لزمن الإرسال الفعلي
+        offset = timestamp - device_times[-1]
+        if self.clock_offset is None or offset < self.clock_offset or offset - self.clock_offset > CLOCK_RESYNC_SECONDS:
+            self.clock_offset = offset
+        timestamps = device_times + self.clock_offset
+        accepted = 0
+        for channel, values in zip(self.channels, temperatures.T):
+            valid = (values >= 15) & (values <= 36)  # ✅ رفض القيم الشاذة
+            if valid.any():
+                accepted += int(valid.sum())
+                channel.push(values[valid], timestamp, timestamps[valid])
+        SAMPLES_RECEIVED.inc(temperatures.size)
+        SAMPLES_ACCEPTED.inc(accepted)
+        OUTLIERS_REJECTED.inc(temperatures.size - accepted)
+        CHUNK_TIME.observe((time.perf_counter() - started) * 1000)
 
     def get_latest_temperature(self):
-        """إرجاع آخر قيمة محسوبة"""
-        with self.lock:
-            return self.latest_temperature
+        """إرجاع آخر قيمة محسوبة للقناة الأولى"""
+        return self.channels[0].get_latest_temperature()
 
-    def get_hidden_heat_signal(self):
-        """إرجاع حرارة الكامنة إن وجدت"""
-        with self.lock:
-            heat_signal = self.hidden_heat_signal
-            self.hidden_heat_signal = None  # ✅ تفريغها بعد القراءة
-            return heat_signal
+    def drain_plateau_events(self):
+        """كل أحداث هضاب الحرارة الكامنة للقناة الأولى منذ آخر استدعاء"""
+        return self.channels[0].drain_plateau_events()
 
     def stop_reading(self):
         """إيقاف القراءة"""
         self.running = False
         self.stop_event.set()
         self.cleanup()
+        self.set_state(DISCONNECTED)
 
     def cleanup(self):
         """إغلاق الاتصال"""
         if self.ser and self.ser.is_open:
             self.ser.close()
-            print("🔌 Serial connection closed safely.")
+            logger.info("🔌 Serial connection closed safely (%s).", self.port)
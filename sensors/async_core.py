@@ -0,0 +1,187 @@
+import os
+import time
+import asyncio
+import serial
+import logging
+from dataclasses import dataclass
+from threading import Thread
+from sensors.arduino_receiver import CONNECTION_LOST
+from sensors.connection import Backoff, LOST
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SampleBatch:
+    channel: str
+    timestamps: object   # np.ndarray
+    values: object       # np.ndarray
+    write_index: int     # مؤشر المخزن الدائري بعد إضافة الدفعة
+    events: tuple = ()   # أحداث الهضاب التي اكتملت مع هذه الدفعة
+
+
+class Subscription:
+    """اشتراك في دفعات القراءة: طابور asyncio خاص بكل مشترك (fan-out)"""
+
+    def __init__(self, core, channels=None, maxsize=0):
+        self.core = core
+        self.channels = None if channels is None else set(channels)
+        self.queue = asyncio.Queue(maxsize)
+
+    def offer(self, batch):
+        if self.channels is None or batch.channel in self.channels:
+            if self.queue.full():
+                self.queue.get_nowait()  # ✅ المشترك البطيء يفقد أقدم دفعة فقط؛ البيانات نفسها باقية في المخزن
+            self.queue.put_nowait(batch)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def drain(self):
+        """كل الدفعات المنتظرة دون انتظار"""
+        batches = []
+        while not self.queue.empty():
+            batches.append(self.queue.get_nowait())
+        return batches
+
+    def close(self):
+        self.core.subscriptions.remove(self)
+
+
+async def coalesce(subscription, interval):
+    """مرحلة في خط المعالجة: تجميع الدفعات المتلاحقة وإصدار دفعة مجمعة لكل قناة كل interval ثانية"""
+    while True:
+        batches = [await subscription.__anext__()] + subscription.drain()
+        latest = {}
+        for batch in batches:
+            previous = latest.get(batch.channel)
+            events = batch.events if previous is None else previous.events + batch.events
+            latest[batch.channel] = SampleBatch(batch.channel, batch.timestamps, batch.values, batch.write_index, events)
+        for batch in latest.values():
+            yield batch
+        await asyncio.sleep(interval)
+
+
+class AsyncAcquisitionCore:
+    """نواة قراءة مبنية على asyncio تعمل في خيط خلفي وتوزع الدفعات على المشتركين"""
+
+    def __init__(self, readers):
+        self.readers = list(readers)
+        self.subscriptions = []
+        self.tasks = []
+        self.loop = None
+        self.stopping = None
+        self.thread = None
+
+    @property
+    def channels(self):
+        return [channel for reader in self.readers for channel in reader.channels]
+
+    def start(self):
+        """تشغيل حلقة asyncio في خيط خلفي"""
+        # ✅ الحلقة تُنشأ هنا حتى يمكن جدولة المشتركين قبل أن يبدأ الخيط
+        self.loop = asyncio.new_event_loop()
+        self.stopping = asyncio.Event()
+        self.thread = Thread(target=self.run, name="acquisition-loop", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.main())
+        finally:
+            self.loop.close()
+
+    def call_soon(self, callback, *args):
+        """تنفيذ دالة داخل حلقة asyncio من أي خيط"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def main(self):
+        for reader in self.readers:
+            for channel in reader.channels:
+                channel.add_batch_listener(lambda timestamps, values, channel=channel: self.publish(channel, timestamps, values))
+            self.tasks.append(asyncio.create_task(self.serve(reader)))
+        await self.stopping.wait()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for reader in self.readers:
+            reader.stop_reading()
+
+    async def serve(self, reader):
+        """خدمة منفذ واحد: الاتصال ثم القراءة عند وصول البيانات، وإعادة الاتصال عند الانقطاع"""
+        backoff = Backoff()
+        while True:
+            # الاتصال يتضمن انتظار إعادة تشغيل الأردوينو؛ يُنفذ خارج الحلقة حتى لا يوقفها
+            if not await self.loop.run_in_executor(None, reader.connect):
+                delay = backoff.next_delay()
+                reader.set_state(LOST, f"retrying in {delay:.0f} s")
+                await asyncio.sleep(delay)
+                continue
+            backoff.reset()
+            reader.running = True
+            try:
+                await self.read_until_lost(reader)
+            except (serial.SerialException, OSError):
+                CONNECTION_LOST.inc()
+                reader.set_state(LOST)
+                logger.warning("🔌 Serial Error on %s: Lost connection, attempting to reconnect...", reader.port)
+
+    async def read_until_lost(self, reader):
+        """القراءة حتى انقطاع المنفذ (استثناء) أو طلب إعادة الاتصال (عودة عادية إلى serve)"""
+        if os.name != "nt" and hasattr(reader.ser, "fileno"):
+            # ✅ POSIX: الحلقة تراقب واصف الملف مباشرة (مثل protocol)، لا خيوط إضافية
+            lost = self.loop.create_future()
+
+            def on_readable():
+                try:
+                    reader.read_available()
+                except (serial.SerialException, OSError) as e:
+                    self.loop.remove_reader(fd)
+                    if not lost.done():
+                        lost.set_exception(e)
+
+            fd = reader.ser.fileno()
+            self.loop.add_reader(fd, on_readable)
+            try:
+                # ✅ فحص طلب إعادة الاتصال (منفذ أو سرعة جديدة) حتى لو لم تصل بيانات
+                while not reader.reconnect_requested:
+                    try:
+                        await asyncio.wait_for(asyncio.shield(lost), reader.read_timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self.loop.remove_reader(fd)
+        else:
+            # ويندوز: القراءة الحاجبة فقط في خيط التنفيذ، والمعالجة والتوزيع داخل الحلقة
+            while not reader.reconnect_requested:
+                chunk = await self.loop.run_in_executor(None, reader.read_chunk)
+                if chunk:
+                    reader.handle_chunk(chunk, time.monotonic())
+
+    def publish(self, channel, timestamps, values):
+        """توزيع دفعة على كل المشتركين (يُستدعى من داخل الحلقة)"""
+        batch = SampleBatch(channel.name, timestamps, values, channel.buffer.write_index,
+                            tuple(channel.drain_plateau_events()))
+        for subscription in self.subscriptions:
+            subscription.offer(batch)
+
+    def subscribe(self, channels=None, maxsize=0):
+        """إنشاء اشتراك جديد (من داخل الحلقة)"""
+        subscription = Subscription(self, channels, maxsize)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def run_pipeline(self, coroutine_factory):
+        """تشغيل مرحلة معالجة غير متزامنة داخل الحلقة من أي خيط: coroutine_factory(core)"""
+        self.call_soon(lambda: self.tasks.append(self.loop.create_task(coroutine_factory(self))))
+
+    def stop(self):
+        """إيقاف الحلقة وإغلاق كل المنافذ"""
+        if self.loop is not None and not self.loop.is_closed():
+            self.call_soon(self.stopping.set)
+        if self.thread is not None:
+            self.thread.join(timeout=2)
@@ -0,0 +1,116 @@
+import numpy as np
+from diagnostics.metrics import METRICS
+
+# إطار ثنائي بطول ثابت من الأردوينو (little-endian):
+#   0xA5 0x5A | seq uint16 | timestamp_us uint32 | temperature int16 × القنوات (°C × 100) | checksum uint8
+# المجموع الاختباري = XOR لكل البايتات بين علامة التزامن والمجموع نفسه.
+SYNC = b"\xA5\x5A"
+SEQUENCE_MODULO = 2 ** 16
+CLOCK_MODULO = 2 ** 32
+
+FRAMES_DROPPED = METRICS.counter("reader.frames_dropped")
+CHECKSUM_ERRORS = METRICS.counter("reader.checksum_errors")
+RESYNCS = METRICS.counter("reader.resyncs")
+
+
+def frame_dtype(channels=1):
+    return np.dtype([("sync", "u1", 2), ("seq", "<u2"), ("timestamp_us", "<u4"),
+                     ("temperature", "<i2", (channels,)), ("checksum", "u1")])
+
+
+def encode_frames(first_sequence, timestamps_us, temperatures, channels=1):
+    """ترميز عينات (°C) كإطارات ثنائية؛ يستخدمه المحاكي ويصف ما يرسله الأردوينو"""
+    temperatures = np.asarray(temperatures, dtype=float).reshape(len(timestamps_us), channels)
+    frames = np.zeros(len(timestamps_us), dtype=frame_dtype(channels))
+    frames["sync"] = np.frombuffer(SYNC, np.uint8)
+    frames["seq"] = (first_sequence + np.arange(len(frames))) % SEQUENCE_MODULO
+    frames["timestamp_us"] = np.asarray(timestamps_us, dtype=np.int64) % CLOCK_MODULO
+    frames["temperature"] = np.round(temperatures * 100)
+    raw = frames.view(np.uint8).reshape(len(frames), -1)
+    frames["checksum"] = np.bitwise_xor.reduce(raw[:, 2:-1], axis=1)
+    return frames.tobytes()
+
+
+class BinaryFrameParser:
+    """تحويل دفعة كاملة من الإطارات إلى مصفوفات دفعة واحدة، مع إعادة التزامن واكتشاف الإطارات المفقودة"""
+
+    def __init__(self, channels=1):
+        self.channels = channels
+        self.dtype = frame_dtype(channels)
+        self.frame_size = self.dtype.itemsize
+        self.buffer = bytearray()
+        self.reset()
+
+    def reset(self):
+        self.buffer.clear()
+        self.last_sequence = None
+        self.last_clock = None     # آخر قيمة خام لساعة الأردوينو (µs، تلتف كل 2^32)
+        self.device_seconds = 0.0  # ساعة الأردوينو بعد فك الالتفاف
+
+    def feed(self, chunk):
+        """إضافة بايتات واردة؛ تُرجع (sequence, device_times, temperatures) للإطارات الكاملة أو None
+
+        device_times: زمن كل إطار بالثواني من ساعة الأردوينو (متزايد دائمًا).
+        temperatures: مصفوفة (عدد الإطارات، القنوات) بالدرجات المئوية.
+        """
+        buffer = self.buffer
+        buffer += chunk
+        parts = []
+        while len(buffer) >= self.frame_size:
+            count = self.valid_prefix()
+            if count:
+                parts.append(self.take(count))
+            elif not self.resync():
+                break
+        if not parts:
+            return None
+        sequence, device_us, temperatures = (np.concatenate(field) for field in zip(*parts))
+        self.count_dropped(sequence)
+        # ✅ فروق ساعة الأردوينو مع مراعاة التفافها كل 2^32 ميكروثانية
+        previous = device_us[0] if self.last_clock is None else self.last_clock
+        steps = np.diff(np.concatenate(([previous], device_us)).astype(np.int64)) % CLOCK_MODULO
+        device_times = self.device_seconds + np.cumsum(steps) / 1e6
+        self.last_clock = int(device_us[-1])
+        self.device_seconds = float(device_times[-1])
+        return sequence, device_times, temperatures / 100.0
+
+    def valid_prefix(self):
+        """عدد الإطارات الصحيحة المتتالية في بداية المخزن"""
+        count = len(self.buffer) // self.frame_size
+        raw = np.frombuffer(self.buffer, np.uint8, count * self.frame_size).reshape(count, self.frame_size)
+        valid = (raw[:, 0] == SYNC[0]) & (raw[:, 1] == SYNC[1])
+        valid &= np.bitwise_xor.reduce(raw[:, 2:-1], axis=1) == raw[:, -1]
+        invalid = np.flatnonzero(~valid)
+        first = int(invalid[0]) if len(invalid) else count
+        if first == 0 and raw[0, 0] == SYNC[0] and raw[0, 1] == SYNC[1]:
+            CHECKSUM_ERRORS.inc()  # علامة تزامن صحيحة لكن البيانات تالفة
+        del raw  # ✅ تحرير العرض قبل تعديل حجم المخزن
+        return first
+
+    def take(self, count):
+        """نسخ حقول أول count إطار ثم حذفها من المخزن"""
+        frames = np.frombuffer(self.buffer, self.dtype, count)
+        fields = (frames["seq"].copy(), frames["timestamp_us"].copy(), frames["temperature"].astype(float))
+        del frames
+        del self.buffer[:count * self.frame_size]
+        return fields
+
+    def resync(self):
+        """تجاهل البايتات حتى علامة التزامن التالية؛ False إن لم توجد بعد"""
+        RESYNCS.inc()
+        start = self.buffer.find(SYNC, 1)
+        if start < 0:
+            del self.buffer[:max(0, len(self.buffer) - 1)]  # قد يكون آخر بايت بداية علامة
+            return False
+        del self.buffer[:start]
+        return True
+
+    def count_dropped(self, sequence):
+        """الإطارات المفقودة من فجوات رقم التسلسل"""
+        expected = sequence[0] if self.last_sequence is None else (self.last_sequence + 1) % SEQUENCE_MODULO
+        gaps = np.diff(sequence.astype(np.int64)) % SEQUENCE_MODULO
+        dropped = int((int(sequence[0]) - int(expected)) % SEQUENCE_MODULO) + int(np.maximum(gaps - 1, 0).sum())
+        self.last_sequence = int(sequence[-1])
+        if dropped:
+            FRAMES_DROPPED.inc(dropped)
+        return dropped
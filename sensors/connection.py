@@ -0,0 +1,52 @@
+import random
+from serial.tools import list_ports
+
+# حالات اتصال القارئ كما تعرضها الواجهة
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+LOST = "lost"
+
+AUTO_PORT = "auto"
+# معرفات USB الشائعة للوحات الأردوينو ونسخها (Arduino, Arduino.org, CH340, FTDI, CP210x)
+KNOWN_VIDS = (0x2341, 0x2A03, 0x1A86, 0x0403, 0x10C4)
+
+
+class Backoff:
+    """فواصل إعادة المحاولة: تتضاعف حتى حد أقصى، مع تذبذب حتى لا تتزامن عدة منافذ"""
+
+    def __init__(self, initial=0.5, maximum=30.0, factor=2.0, jitter=0.2):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.reset()
+
+    def reset(self):
+        self.delay = self.initial
+
+    def next_delay(self):
+        delay = self.delay
+        self.delay = min(self.delay * self.factor, self.maximum)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def parse_usb_id(value):
+    """معرف USB من الإعدادات: رقم أو نص سداسي عشري مثل "2341" أو "0x2341" """
+    if value is None or isinstance(value, int):
+        return value
+    return int(str(value), 16)
+
+
+def discover_port(vid=None, pid=None):
+    """أول منفذ تسلسلي يطابق VID/PID، أو أول لوحة أردوينو معروفة؛ None إن لم يوجد"""
+    vid, pid = parse_usb_id(vid), parse_usb_id(pid)
+    for port in sorted(list_ports.comports(), key=lambda port: port.device):
+        if port.vid is None:
+            continue
+        if vid is not None:
+            if port.vid == vid and (pid is None or port.pid == pid):
+                return port.device
+        elif port.vid in KNOWN_VIDS:
+            return port.device
+    return None
@@ -0,0 +1,204 @@
+import atexit
+import logging
+import multiprocessing
+from threading import Lock
+from sensors.arduino_receiver import ArduinoReader, SAMPLES_ACCEPTED, TEXT_PROTOCOL
+from sensors.sensor_channel import SensorChannel
+from sensors.shared_ring import SharedSampleRing, WAKEUP_SLOT
+from sensors.connection import AUTO_PORT, DISCONNECTED
+from diagnostics.logging_setup import setup_logging
+from diagnostics.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# القراءة من المنفذ في عملية مستقلة لا تشارك الواجهة قفل GIL: توقف الواجهة (رسم، حفظ، تحليل) لا يؤخر
+# تفريغ مخزن المنفذ أبدًا. العينات تُكتب في مخزن دائري في ذاكرة مشتركة، والأنبوب يحمل تنبيهات صغيرة فقط:
+#   ("state", الحالة، التفاصيل)   تغير حالة الاتصال
+#   ("data",)                     عينات جديدة (رسالة واحدة معلقة على الأكثر مهما طال توقف الواجهة)
+# الأزمنة من time.monotonic وهي ساعة النظام نفسها في العمليتين.
+STATE_MESSAGE = "state"
+DATA_MESSAGE = "data"
+STOP_COMMAND = "stop"
+CONFIGURE_COMMAND = "configure"
+MAX_MESSAGES_PER_CHUNK = 256
+STOP_TIMEOUT = 2.0
+
+RING_OVERRUNS = METRICS.counter("reader.ring_overruns")
+
+
+def run_acquisition_process(options, ring_names, capacity, events, commands):
+    """نقطة دخول عملية القراءة: قارئ عادي يكتب في المخازن المشتركة، وأوامر الواجهة من الأنبوب"""
+    setup_logging()
+    rings = [SharedSampleRing(capacity, name) for name in ring_names]
+    reader = ArduinoReader(buffer_capacity=1, **options)
+    # ✅ كشف الهضاب يبقى في عملية الواجهة حتى تصل أحداثه إلى نواة القراءة كما في الوضع العادي
+    reader.channels = [SensorChannel(channel.name, buffer=ring, detect_plateaus=False)
+                       for channel, ring in zip(reader.channels, rings)]
+    send_lock = Lock()
+    wakeup = rings[0].header
+
+    def send(message):
+        with send_lock:
+            try:
+                events.send(message)
+            except (BrokenPipeError, OSError):
+                pass  # الواجهة أُغلقت؛ أمر الإيقاف أو نهاية الأنبوب ستنهي العملية
+
+    def notify(timestamps, values):
+        # ✅ تنبيه واحد حتى تقرأ الواجهة: الكاتب لا ينتظر الأنبوب أبدًا حتى لو توقفت الواجهة طويلًا
+        if not wakeup[WAKEUP_SLOT]:
+            wakeup[WAKEUP_SLOT] = 1
+            send((DATA_MESSAGE,))
+
+    reader.add_state_listener(lambda _, state, detail: send((STATE_MESSAGE, state, detail)))
+    for channel in reader.channels:
+        channel.add_batch_listener(notify)
+    reader.start_reading()
+    try:
+        while True:
+            try:
+                command, arguments = commands.recv()
+            except (EOFError, OSError):
+                break  # ✅ الواجهة انتهت دون أمر إيقاف: لا تبقى عملية يتيمة تحجز المنفذ
+            if command == STOP_COMMAND:
+                break
+            if command == CONFIGURE_COMMAND:
+                reader.reconfigure(**arguments)
+    finally:
+        # ✅ انتظار خروج خيط القراءة أولًا حتى لا يُغلق المنفذ أثناء قراءة جارية
+        reader.running = False
+        reader.stop_event.set()
+        reader.thread.join(timeout=STOP_TIMEOUT)
+        reader.stop_reading()
+        for ring in rings:
+            ring.memory.close()
+
+
+class ProcessReader(ArduinoReader):
+    """نفس واجهة ArduinoReader للواجهة ونواة القراءة، والقراءة الفعلية في عملية مستقلة
+
+    ser هنا طرف استقبال أنبوب التنبيهات: واصف ملف يمكن مراقبته بـ add_reader أو selector،
+    وانقطاعه (توقف العملية) يُعامل كانقطاع المنفذ فيعيد المدير الاتصال بعملية جديدة.
+    """
+
+    def __init__(self, port=AUTO_PORT, baudrate=115200, buffer_capacity=2 ** 20, channels=1, protocol=TEXT_PROTOCOL,
+                 vid=None, pid=None):
+        super().__init__(port, baudrate, 1, channels, protocol, vid, pid)
+        self.frame_parser = None  # ✅ التحليل يتم في عملية القراءة
+        self.capacity = buffer_capacity
+        self.rings = [SharedSampleRing(buffer_capacity, readonly=True) for _ in range(channels)]
+        self.channels = [SensorChannel(f"{port}:{index}", buffer=ring) for index, ring in enumerate(self.rings)]
+        self.read_indices = [0] * channels
+        self.process = None
+        self.commands = None
+        atexit.register(self.release)
+
+    def options(self):
+        return {"port": self.port, "baudrate": self.baudrate, "channels": len(self.channels),
+                "protocol": self.protocol, "vid": self.vid, "pid": self.pid}
+
+    def connect(self):
+        """تشغيل عملية القراءة؛ هي من تتصل بالمنفذ وتعيد المحاولة وتبلغ عن حالتها"""
+        self.terminate_process()
+        # ✅ spawn وليس fork: نسخ عملية فيها خيوط Qt وقفل GIL محجوز غير آمن
+        context = multiprocessing.get_context("spawn")
+        events, events_sender = context.Pipe(duplex=False)
+        commands_receiver, self.commands = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=run_acquisition_process, name=f"acquisition-{self.port}", daemon=True,
+            args=(self.options(), [ring.name for ring in self.rings], self.capacity, events_sender, commands_receiver))
+        self.process.start()
+        # ✅ إغلاق نسخ الواجهة من طرفي العملية حتى تظهر نهاية الأنبوب فور توقفها
+        events_sender.close()
+        commands_receiver.close()
+        self.ser = events
+        logger.info("🧩 Acquisition process started for %s (pid %s).", self.port, self.process.pid)
+        return True
+
+    def reconfigure(self, port=None, baudrate=None):
+        """تمرير المنفذ أو السرعة الجديدة إلى عملية القراءة دون إعادة تشغيلها"""
+        if port is not None:
+            self.port = port
+        if baudrate is not None:
+            self.baudrate = baudrate
+        self.send_command(CONFIGURE_COMMAND, {"port": port, "baudrate": baudrate})
+
+    def send_command(self, command, arguments=None):
+        if self.commands is not None:
+            try:
+                self.commands.send((command, arguments))
+            except (BrokenPipeError, OSError):
+                pass  # العملية توقفت؛ إعادة الاتصال ستبدأ غيرها بالإعدادات الحالية
+
+    def read_chunk(self):
+        """انتظار تنبيه (حتى مهلة القراءة) ثم تفريغ كل الرسائل المنتظرة"""
+        try:
+            if not self.ser.poll(self.read_timeout):
+                return []
+            messages = [self.ser.recv()]
+            while len(messages) < MAX_MESSAGES_PER_CHUNK and self.ser.poll():
+                messages.append(self.ser.recv())
+        except EOFError:
+            raise OSError("acquisition process exited")
+        return messages
+
+    def handle_chunk(self, messages, timestamp):
+        """تطبيق رسائل الحالة ثم تمرير كل العينات الجديدة من المخازن المشتركة إلى القنوات"""
+        for message in messages:
+            if message[0] == STATE_MESSAGE:
+                self.set_state(message[1], message[2])
+        self.pump()
+
+    def pump(self):
+        # ✅ مسح علم التنبيه قبل القراءة: أي كتابة بعده ترسل تنبيهًا جديدًا فلا تضيع عينة بين الخطوتين
+        self.rings[0].header[WAKEUP_SLOT] = 0
+        accepted = 0
+        for index, (channel, ring) in enumerate(zip(self.channels, self.rings)):
+            start = self.read_indices[index]
+            oldest = ring.oldest_index()
+            if start < oldest:
+                # الواجهة تأخرت أكثر من سعة المخزن كاملة؛ العينات الأقدم كُتب فوقها
+                RING_OVERRUNS.inc(oldest - start)
+                logger.warning("⚠ %s: %d samples overwritten before the UI read them.", channel.name, oldest - start)
+                start = oldest
+            times, values, end = ring.since(start)
+            self.read_indices[index] = end
+            if len(values):
+                accepted += len(values)
+                # ✅ نسخة خاصة: المستقبلون قد يحتفظون بالدفعة بعد أن يكتب القارئ فوق موضعها
+                channel.dispatch(times.copy(), values.copy())
+        SAMPLES_ACCEPTED.inc(accepted)
+
+    def terminate_process(self):
+        """إيقاف عملية القراءة الحالية (بأمر الإيقاف، ثم بالقوة إن لم تستجب)"""
+        if self.process is None:
+            return
+        self.send_command(STOP_COMMAND)
+        self.process.join(STOP_TIMEOUT)
+        if self.process.is_alive():
+            logger.warning("⚠ Acquisition process for %s did not stop; terminating.", self.port)
+            self.process.terminate()
+            self.process.join(STOP_TIMEOUT)
+        self.process = None
+        if self.commands is not None:
+            self.commands.close()
+            self.commands = None
+        self.cleanup()
+
+    def stop_reading(self):
+        """إيقاف القراءة وعملية القراءة"""
+        self.running = False
+        self.stop_event.set()
+        self.terminate_process()
+        self.set_state(DISCONNECTED)
+
+    def cleanup(self):
+        """إغلاق أنبوب التنبيهات"""
+        if self.ser is not None and not self.ser.closed:
+            self.ser.close()
+
+    def release(self):
+        """حذف المخازن المشتركة عند إنهاء البرنامج"""
+        self.terminate_process()
+        for ring in self.rings:
+            ring.release()
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class SampleRingBuffer:
+    """مخزن دائري ثابت السعة للقراءات (الزمن الرتيب، القيمة) بكاتب واحد ودون أقفال"""
+
+    def __init__(self, capacity=2 ** 20):
+        self.capacity = capacity
+        # ✅ كل عينة تُكتب مرتين (i و i + capacity) حتى تكون أي نافذة بطول السعة متصلة في الذاكرة
+        self.times = np.zeros(2 * capacity, dtype=np.float64)
+        self.values = np.zeros(2 * capacity, dtype=np.float64)
+        self.write_index = 0  # ✅ عدد العينات المكتوبة منذ البداية، يُنشر بعد اكتمال الكتابة
+
+    def __len__(self):
+        return min(self.write_index, self.capacity)
+
+    def append(self, timestamps, values):
+        """إضافة دفعة من العينات (يُستدعى من خيط القراءة فقط)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        count = len(values)
+        if count == 0:
+            return
+        if count > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            values = values[-self.capacity:]
+            skipped = count - self.capacity
+            count = self.capacity
+        else:
+            skipped = 0
+
+        start = (self.write_index + skipped) % self.capacity
+        head = min(count, self.capacity - start)
+        for offset in (0, self.capacity):
+            self.times[offset + start:offset + start + head] = timestamps[:head]
+            self.values[offset + start:offset + start + head] = values[:head]
+            self.times[offset:offset + count - head] = timestamps[head:]
+            self.values[offset:offset + count - head] = values[head:]
+
+        # ✅ نشر المؤشر بعد كتابة البيانات: القارئ لا يرى عينة غير مكتملة
+        self.write_index += skipped + count
+
+    def oldest_index(self):
+        """أقدم مؤشر ما زال محفوظًا في المخزن"""
+        return max(0, self.write_index - self.capacity)
+
+    def view(self, start, end):
+        """عرض بدون نسخ للعينات بين المؤشرين [start, end) كمصفوفات للقراءة فقط"""
+        start = max(start, end - self.capacity, 0)
+        if end <= start:
+            return self.times[:0], self.values[:0]
+        position = start % self.capacity
+        times = self.times[position:position + end - start]
+        values = self.values[position:position + end - start]
+        times.flags.writeable = False
+        values.flags.writeable = False
+        return times, values
+
+    def since(self, index):
+        """إرجاع (الأزمنة، القيم، المؤشر التالي) لكل ما كُتب منذ المؤشر index"""
+        end = self.write_index
+        times, values = self.view(index, end)
+        return times, values, end
+
+    def latest(self):
+        """إرجاع آخر عينة (الزمن، القيمة) أو None إن كان المخزن فارغًا"""
+        index = self.write_index
+        if index == 0:
+            return None
+        position = (index - 1) % self.capacity
+        return self.times[position], self.values[position]
@@ -0,0 +1,60 @@
+import numpy as np
+from sensors.sample_buffer import SampleRingBuffer
+from algorithms.plateau_detector import PlateauDetector
+from diagnostics.metrics import METRICS
+
+
+class SensorChannel:
+    """قناة حساس واحدة: مخزن عينات وكاشف هضاب ومستقبلو دفعات خاصة بها"""
+
+    def __init__(self, name, buffer_capacity=2 ** 20, buffer=None, detect_plateaus=True):
+        self.name = name
+        # ✅ مخزن خارجي اختياري (مثل SharedSampleRing حين تتم القراءة في عملية مستقلة)
+        self.buffer = SampleRingBuffer(buffer_capacity) if buffer is None else buffer
+        self.plateau_detector = PlateauDetector() if detect_plateaus else None  # ✅ كشف الحرارة الكامنة أثناء القراءة
+        # ✅ نسخ عند الكتابة: كل تسجيل أو إلغاء ينشئ tuple جديدًا، فخيط القراءة يمر على لقطة ثابتة دون قفل
+        self.batch_listeners = ()
+        self.last_chunk_time = None
+        # نسبة امتلاء المخزن تُحسب فقط عند قراءة المقاييس
+        METRICS.gauge(f"buffer.fill.{name}", lambda: round(len(self.buffer) / self.buffer.capacity, 4))
+
+    def add_batch_listener(self, callback):
+        """تسجيل دالة تُستدعى مع كل دفعة مقبولة: callback(timestamps, temperatures)"""
+        self.batch_listeners = self.batch_listeners + (callback,)
+
+    def remove_batch_listener(self, callback):
+        """إلغاء تسجيل مستقبل الدفعات"""
+        listeners = list(self.batch_listeners)
+        if callback in listeners:
+            listeners.remove(callback)
+            self.batch_listeners = tuple(listeners)
+
+    def push(self, batch, timestamp, timestamps=None):
+        """إضافة دفعة من القيم المقبولة وصلت في اللحظة timestamp (مع أزمنة كل عينة إن كانت معروفة)"""
+        previous = self.last_chunk_time
+        self.last_chunk_time = timestamp
+        if timestamps is None:
+            # ✅ توزيع أزمنة العينات بالتساوي بين وصول الدفعة السابقة والحالية
+            if previous is not None and 0 < timestamp - previous < 1.0:
+                timestamps = np.linspace(previous, timestamp, len(batch) + 1)[1:]
+            else:
+                timestamps = np.full(len(batch), timestamp)
+        values = np.array(batch)
+        self.buffer.append(timestamps, values)
+        self.dispatch(timestamps, values)
+
+    def dispatch(self, timestamps, values):
+        """تمرير دفعة موجودة في المخزن إلى كاشف الهضاب والمستقبلين"""
+        if self.plateau_detector is not None:
+            self.plateau_detector.update_batch(timestamps, values)
+        for callback in self.batch_listeners:
+            callback(timestamps, values)
+
+    def get_latest_temperature(self):
+        """إرجاع آخر قيمة محسوبة"""
+        sample = self.buffer.latest()
+        return None if sample is None else float(sample[1])
+
+    def drain_plateau_events(self):
+        """كل أحداث بداية/نهاية هضاب الحرارة الكامنة منذ آخر استدعاء"""
+        return self.plateau_detector.drain_events() if self.plateau_detector is not None else []
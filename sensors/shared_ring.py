@@ -0,0 +1,49 @@
+import numpy as np
+from multiprocessing import shared_memory
+from sensors.sample_buffer import SampleRingBuffer
+
+HEADER_SLOTS = 8   # int64: مؤشر الكتابة، علم التنبيه، محجوز (64 بايت قبل العينات)
+WRITE_INDEX_SLOT = 0
+WAKEUP_SLOT = 1
+
+
+class SharedSampleRing(SampleRingBuffer):
+    """نفس واجهة SampleRingBuffer في ذاكرة مشتركة بين العمليات: عملية القراءة تكتب والواجهة تقرأ فقط
+
+    name=None ينشئ ذاكرة جديدة (المالك يحذفها عند release)، وإلا يرتبط بذاكرة موجودة بنفس الاسم.
+    """
+
+    def __init__(self, capacity=2 ** 20, name=None, readonly=False):
+        size = HEADER_SLOTS * 8 + 2 * 2 * capacity * 8
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.capacity = capacity
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=self.memory.buf)
+        self.times = np.ndarray((2 * capacity,), dtype=np.float64, buffer=self.memory.buf, offset=HEADER_SLOTS * 8)
+        self.values = np.ndarray((2 * capacity,), dtype=np.float64, buffer=self.memory.buf,
+                                 offset=HEADER_SLOTS * 8 + 2 * capacity * 8)
+        if readonly:
+            # ✅ الواجهة تربط المخزن للقراءة فقط: أي كتابة خاطئة ترفع خطأ بدل إفساد بيانات عملية القراءة
+            self.times.flags.writeable = False
+            self.values.flags.writeable = False
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def write_index(self):
+        return int(self.header[WRITE_INDEX_SLOT])
+
+    @write_index.setter
+    def write_index(self, value):
+        self.header[WRITE_INDEX_SLOT] = value
+
+    def release(self):
+        """حذف الذاكرة المشتركة (المالك فقط)؛ العروض المفتوحة تبقى صالحة حتى تُحرر"""
+        if self.owner:
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                pass
+            self.owner = False
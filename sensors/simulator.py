@@ -0,0 +1,234 @@
+import os
+import abc
+import time
+import serial
+import numpy as np
+from dataclasses import dataclass
+from threading import Thread, Event
+from urllib.parse import parse_qsl
+from storage.run_file import RunFile, RUN_EXTENSION
+from sensors.binary_protocol import encode_frames
+
+# منافذ وهمية تُستخدم بدل المنفذ الحقيقي (مثل "COM3") عند عدم توفر الأردوينو:
+#   sim:rate=2000&noise=0.05          منحنى تبريد صناعي
+#   replay:results/2025-01-30/result_00-13-11.run?rate=1000&speed=10
+SIMULATED_SCHEMES = ("sim", "replay")
+
+
+@dataclass(frozen=True)
+class LatentBump:
+    time: float          # ثوانٍ منذ بداية التشغيلة
+    height: float = 0.8  # °C
+    width: float = 8.0   # ثوانٍ (الانحراف المعياري للنتوء)
+
+
+class SensorSource(abc.ABC):
+    """مصدر عينات بدون عتاد: منحنى أساسي + نتوءات حرارة كامنة + ضجيج، بأي معدل عينات"""
+
+    def __init__(self, rate=10.0, noise=0.05, bumps=(), channels=1, seed=None, protocol="text"):
+        self.rate = float(rate)
+        self.protocol = protocol
+        self.noise = noise
+        self.bumps = tuple(bumps)
+        self.channels = channels
+        self.random = np.random.default_rng(seed)
+        self.position = 0  # رقم العينة التالية
+
+    @abc.abstractmethod
+    def baseline(self, times):
+        """الحرارة بدون نتوءات أو ضجيج عند الأزمنة المعطاة"""
+
+    def next_samples(self, count):
+        """العينات التالية بشكل مصفوفة (count, channels)"""
+        times = (self.position + np.arange(count)) / self.rate
+        self.position += count
+        values = self.baseline(times)
+        for bump in self.bumps:
+            values = values + bump.height * np.exp(-0.5 * ((times - bump.time) / bump.width) ** 2)
+        # ✅ كل قناة نفس المنحنى مع ضجيج مستقل، كما لو كانت حساسات متجاورة
+        values = np.repeat(values[:, None], self.channels, axis=1)
+        if self.noise:
+            values += self.random.normal(0.0, self.noise, values.shape)
+        return values
+
+    def encode(self, count):
+        """العينات التالية بتنسيق الأردوينو (نصي أو إطارات ثنائية)"""
+        first = self.position
+        values = self.next_samples(count)
+        if self.protocol == "binary":
+            return self.format_frames(first, values)
+        return self.format_lines(values)
+
+    def format_frames(self, first, values):
+        """إطار ثنائي لكل عينة، بساعة ميكروثانية ورقم تسلسل مثل الأردوينو"""
+        timestamps_us = np.round((first + np.arange(len(values))) / self.rate * 1e6)
+        return encode_frames(first, timestamps_us, values, self.channels)
+
+    def format_lines(self, values):
+        """سطر لكل عينة، والقنوات مفصولة بفواصل"""
+        if self.channels == 1:
+            text = "\n".join(map("{:.2f}".format, values[:, 0].tolist()))
+        else:
+            text = "\n".join(",".join(map("{:.2f}".format, row)) for row in values.tolist())
+        return (text + "\n").encode("ascii")
+
+
+class SyntheticCurve(SensorSource):
+    """منحنى تبريد تقليدي للتمبرة: اقتراب أسي من حرارة الغرفة مع نتوء تبلور"""
+
+    def __init__(self, start_temperature=32.0, end_temperature=18.0, time_constant=240.0, bumps=None, **kwargs):
+        if bumps is None:
+            bumps = (LatentBump(time=120.0),)
+        super().__init__(bumps=bumps, **kwargs)
+        self.start_temperature = start_temperature
+        self.end_temperature = end_temperature
+        self.time_constant = time_constant
+
+    def baseline(self, times):
+        span = self.start_temperature - self.end_temperature
+        return self.end_temperature + span * np.exp(-times / self.time_constant)
+
+
+class ReplaySource(SensorSource):
+    """إعادة تشغيل تشغيلة مسجلة (.run أو CSV) بأي معدل وسرعة، وتكرارها عند انتهائها"""
+
+    def __init__(self, path, speed=1.0, noise=0.0, bumps=(), **kwargs):
+        super().__init__(noise=noise, bumps=bumps, **kwargs)
+        if path.endswith(RUN_EXTENSION):
+            run = RunFile(path)
+            times, temperatures = np.array(run.times), np.array(run.temperatures, dtype=float)
+        else:
+            table = np.loadtxt(path, delimiter=",", skiprows=1, usecols=(0, 1), ndmin=2)
+            times, temperatures = table[:, 0], table[:, 1]
+        if len(times) < 2:
+            raise ValueError(f"Not enough samples to replay: {path}")
+        self.times = times - times[0]
+        self.temperatures = temperatures
+        self.speed = speed
+
+    def baseline(self, times):
+        recorded = (times * self.speed) % self.times[-1]
+        return np.interp(recorded, self.times, self.temperatures)
+
+
+class SimulatedSerial:
+    """بديل داخل العملية لـ serial.Serial يقرأ من مصدر عينات بدل المنفذ"""
+
+    def __init__(self, source, timeout=0.1, realtime=True, chunk_samples=256):
+        self.source = source
+        self.timeout = timeout
+        self.realtime = realtime          # False: أسرع ما يمكن (لقياس الإنتاجية)
+        self.chunk_samples = chunk_samples
+        self.pending = bytearray()
+        self.is_open = True
+        self.opened_at = time.monotonic()
+
+    def due_samples(self):
+        """عدد العينات التي كان يجب أن يرسلها الحساس حتى الآن"""
+        if not self.realtime:
+            return self.chunk_samples if not self.pending else 0
+        return int((time.monotonic() - self.opened_at) * self.source.rate) - self.source.position
+
+    def fill(self):
+        count = self.due_samples()
+        if count > 0:
+            self.pending += self.source.encode(count)
+
+    @property
+    def in_waiting(self):
+        self.fill()
+        return len(self.pending)
+
+    def read(self, size=1):
+        if not self.is_open:
+            raise OSError("Simulated port is closed")
+        self.fill()
+        deadline = time.monotonic() + (self.timeout or 0)
+        while not self.pending and time.monotonic() < deadline:
+            # ✅ انتظار العينة التالية فقط، لا انتظار نشط
+            next_sample = self.opened_at + (self.source.position + 1) / self.source.rate
+            time.sleep(max(0.0, min(next_sample, deadline) - time.monotonic()))
+            self.fill()
+        chunk = bytes(self.pending[:size])
+        del self.pending[:size]
+        return chunk
+
+    def reset_input_buffer(self):
+        self.fill()
+        self.pending.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+class PtyBridge:
+    """يكتب عينات المصدر في pty حقيقي حتى يمكن فتحه بـ serial.Serial (POSIX فقط)"""
+
+    def __init__(self, source, interval=0.005):
+        import pty
+        self.source = source
+        self.interval = interval
+        self.master, self.slave = pty.openpty()
+        self.port = os.ttyname(self.slave)
+        self.stop_event = Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = Thread(target=self.write_loop, name="pty-simulator", daemon=True)
+        self.thread.start()
+        return self.port
+
+    def write_loop(self):
+        started = time.monotonic()
+        while not self.stop_event.wait(self.interval):
+            count = int((time.monotonic() - started) * self.source.rate) - self.source.position
+            if count > 0:
+                os.write(self.master, self.source.encode(count))
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def is_simulated_port(port):
+    return port.split(":", 1)[0] in SIMULATED_SCHEMES
+
+
+def parse_port(port):
+    """تفكيك اسم منفذ وهمي: (النوع، المسار، المعاملات)"""
+    scheme, _, rest = port.partition(":")
+    path, _, query = rest.partition("?") if scheme == "replay" else ("", "", rest.lstrip("?"))
+    options = {}
+    for key, value in parse_qsl(query):
+        options[key] = value.lower() != "false" if key == "realtime" else float(value)
+    return scheme, path, options
+
+
+def open_serial(port, baudrate=115200, timeout=0.1, channels=1, protocol="text"):
+    """فتح منفذ حقيقي، أو منفذ وهمي إن بدأ الاسم بـ sim: أو replay: (بنفس بروتوكول القارئ)"""
+    if not is_simulated_port(port):
+        return serial.Serial(port, baudrate, timeout=timeout)
+    scheme, path, options = parse_port(port)
+    realtime = options.pop("realtime", True)
+    if "seed" in options:
+        options["seed"] = int(options["seed"])
+    if scheme == "sim":
+        source = SyntheticCurve(channels=channels, protocol=protocol, **options)
+    else:
+        source = ReplaySource(path, channels=channels, protocol=protocol, **options)
+    return SimulatedSerial(source, timeout=timeout, realtime=realtime)
+
+
+if __name__ == "__main__":
+    # مثال: python -m sensors.simulator 1000  ثم تشغيل الواجهة على المنفذ المطبوع
+    import sys
+    bridge = PtyBridge(SyntheticCurve(rate=float(sys.argv[1]) if len(sys.argv) > 1 else 10.0))
+    print(f"Simulated sensor on: {bridge.start()}  (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        bridge.stop()
@@ -0,0 +1,255 @@
+import os
+import json
+import atexit
+import typing
+import logging
+import dataclasses
+from dataclasses import dataclass, field
+from threading import Lock, Timer
+from sensors.connection import AUTO_PORT
+
+logger = logging.getLogger(__name__)
+
+# كل إعدادات التطبيق في ملف واحد، محفوظة في الذاكرة بعد أول قراءة. التعديل يُبلغ المستمعين فورًا،
+# والكتابة إلى القرص تتأخر SAVE_DELAY ثانية بعد آخر تعديل وتتم بملف مؤقت ثم إعادة تسمية ذرية.
+CONFIG_FILE = "config.json"
+LEGACY_SETTINGS_FILE = "settings.json"  # ملف نافذة الإعدادات القديم: يُدمج مرة واحدة ثم لا يُكتب
+SAVE_DELAY = 0.5
+DEFAULT_RESULTS_ROOT = os.path.join(os.path.expanduser("~"), "Documents", "choco-master", "results")
+AUTO_BUFFER_SECONDS = 24 * 3600  # buffer_capacity = 0: سعة تكفي يومًا كاملًا بمعدل العينات الاسمي
+MAX_AUTO_CAPACITY = 2 ** 22
+
+
+@dataclass(frozen=True)
+class SensorConfig:
+    port: str = AUTO_PORT           # "COM3"، "/dev/ttyACM0"، "auto" (بحث بمعرف USB)، "sim:..."، "replay:..."
+    baudrate: int = 115200
+    channels: int = 1
+    protocol: str = "text"          # "text" أو "binary"
+    vid: typing.Optional[int] = None
+    pid: typing.Optional[int] = None
+    isolated: bool = False          # القراءة في عملية مستقلة (ProcessReader)
+    sample_rate: float = 10.0       # عينات في الثانية يرسلها الأردوينو (اسمي)
+    buffer_capacity: int = 2 ** 20  # عينات لكل قناة في المخزن الدائري؛ 0 = حسب sample_rate
+
+    def buffer_samples(self):
+        """سعة المخزن الفعلية (قوة 2 عند الحساب التلقائي)"""
+        if self.buffer_capacity > 0:
+            return self.buffer_capacity
+        needed = max(int(self.sample_rate * AUTO_BUFFER_SECONDS), 1024)
+        return min(1 << (needed - 1).bit_length(), MAX_AUTO_CAPACITY)
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    start_temperature: int = 30     # °C
+    duration: int = 5               # دقائق
+    recipe: str = ""
+    frame_rate: int = 20
+    results_root: str = DEFAULT_RESULTS_ROOT
+    sensors: tuple = field(default_factory=lambda: (SensorConfig(),))
+
+
+# حقول الحساس التي تُطبق دون إعادة تشغيل القارئ (reconfigure)؛ البقية تتطلب إعادة تشغيل التطبيق
+LIVE_SENSOR_FIELDS = ("port", "baudrate")
+
+
+def convert(kind, value):
+    """تحويل قيمة من JSON إلى نوع الحقل المعلن"""
+    arguments = [argument for argument in typing.get_args(kind) if argument is not type(None)]
+    if arguments:  # Optional[...]
+        if value is None:
+            return None
+        kind = arguments[0]
+    if kind is bool:
+        return value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "yes", "on")
+    if kind is int and isinstance(value, str):
+        return int(value, 0)  # ✅ يقبل "0x2341" لمعرفات USB
+    if kind is str and isinstance(value, str) and value.startswith("~"):
+        return os.path.expanduser(value)
+    return kind(value)
+
+
+def build(cls, data, strict=True):
+    """إنشاء إعدادات من قاموس مع تحويل الأنواع؛ strict=False يتجاهل القيم الخاطئة (ملف معدل يدويًا)"""
+    fields = {item.name: item for item in dataclasses.fields(cls)}
+    values = {}
+    for name, value in data.items():
+        if name not in fields:
+            if strict:
+                raise KeyError(f"Unknown setting: {name}")
+            logger.warning("⚠ Ignoring unknown setting '%s'", name)
+            continue
+        try:
+            if name == "sensors":
+                values[name] = tuple(sensor if isinstance(sensor, SensorConfig) else build(SensorConfig, sensor, strict)
+                                     for sensor in value)
+            else:
+                values[name] = convert(fields[name].type, value)
+        except (TypeError, ValueError) as e:
+            if strict:
+                raise ValueError(f"Invalid value for {name}: {value!r}") from e
+            logger.warning("⚠ Invalid value for '%s' (%r), using default", name, value)
+    return cls(**values)
+
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.warning("⚠ Ignoring unreadable settings file %s: %s", path, e)
+        return {}
+
+
+class ConfigService:
+    """مصدر الإعدادات الوحيد: ذاكرة مؤقتة، إشعارات بالتغيير، وكتابة ذرية مؤجلة
+
+    config لقطة غير قابلة للتعديل (آمنة للمشاركة بين الخيوط)؛ كل تعديل ينشئ لقطة جديدة.
+    """
+
+    def __init__(self, path=CONFIG_FILE, legacy_path=LEGACY_SETTINGS_FILE, save_delay=SAVE_DELAY):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.save_delay = save_delay
+        self.listeners = []
+        self.lock = Lock()
+        self.save_lock = Lock()
+        self.timer = None
+        self.dirty = False
+        self.cached = None  # ✅ يُقرأ من القرص عند أول استخدام فقط
+        self.staged = None  # تعديلات محفوظة لم تُطبق بعد (نافذة الإعدادات قبل Apply)؛ تُطبق عند التشغيل التالي
+        atexit.register(self.flush)
+
+    @property
+    def config(self):
+        if self.cached is None:
+            with self.lock:
+                if self.cached is None:
+                    self.cached = self.load()
+        return self.cached
+
+    @property
+    def saved_config(self):
+        """الإعدادات كما تُحفظ على القرص: المطبقة مع أي تعديلات لم تُطبق بعد"""
+        return self.staged or self.config
+
+    def load(self):
+        data = read_json(self.path)
+        legacy = read_json(self.legacy_path) if self.legacy_path else {}
+        missing = {name: value for name, value in legacy.items() if name not in data}
+        config = build(AppConfig, dict(missing, **data), strict=False)
+        if missing:
+            logger.info("🔄 Merged %s from %s into %s", ", ".join(sorted(missing)), self.legacy_path, self.path)
+            self.schedule_save()
+        return config
+
+    def add_listener(self, callback):
+        """تسجيل دالة تُستدعى بعد كل تعديل: callback(config, changed) حيث changed أسماء الحقول المتغيرة"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def update(self, **changes):
+        """تعديل حقول التطبيق (تُحول لأنواعها المعلنة)؛ يعيد أسماء الحقول التي تغيرت فعلًا"""
+        return self.commit(build(AppConfig, changes), changes.keys())
+
+    def update_sensor(self, index=0, **changes):
+        """تعديل حقول حساس واحد"""
+        return self.update(sensors=self.replace_sensor(index, changes))
+
+    def apply(self, settings, sensor=0):
+        """تطبيق قيم نافذة الإعدادات دفعة واحدة: حقول الحساس (مثل port و baudrate) تخص الحساس sensor"""
+        return self.update(**self.settings_changes(settings, sensor, self.config))
+
+    def stage(self, settings, sensor=0):
+        """حفظ قيم نافذة الإعدادات (مؤجلًا) دون تطبيقها ودون إبلاغ المستمعين؛ apply يطبقها لاحقًا"""
+        self.config  # ✅ تحميل الملف أولًا إن لم يُقرأ بعد
+        with self.lock:
+            base = self.staged or self.cached
+            changes = self.settings_changes(settings, sensor, base)
+            updated = build(AppConfig, changes)
+            changed = {name for name in changes if getattr(updated, name) != getattr(base, name)}
+            if not changed:
+                return changed
+            staged = dataclasses.replace(base, **{name: getattr(updated, name) for name in changed})
+            self.staged = None if staged == self.cached else staged
+        self.schedule_save()
+        return changed
+
+    def settings_changes(self, settings, sensor, base):
+        sensor_fields = {item.name for item in dataclasses.fields(SensorConfig)}
+        changes = {name: value for name, value in settings.items() if name not in sensor_fields}
+        sensor_changes = {name: value for name, value in settings.items() if name in sensor_fields}
+        if sensor_changes:
+            changes["sensors"] = self.replace_sensor(sensor, sensor_changes, base)
+        return changes
+
+    def replace_sensor(self, index, changes, base=None):
+        updated = build(SensorConfig, changes)
+        sensors = list((base or self.config).sensors)
+        sensors[index] = dataclasses.replace(sensors[index], **{name: getattr(updated, name) for name in changes})
+        return tuple(sensors)
+
+    def commit(self, updated, names):
+        self.config  # ✅ تحميل الملف أولًا إن لم يُقرأ بعد
+        with self.lock:
+            current = self.cached
+            changed = {name for name in names if getattr(updated, name) != getattr(current, name)}
+            if not changed:
+                return changed
+            config = self.cached = dataclasses.replace(current, **{name: getattr(updated, name) for name in changed})
+            if self.staged is not None:
+                # ✅ التعديلات غير المطبقة تبقى محفوظة فوق ما طُبق للتو
+                staged = dataclasses.replace(self.staged, **{name: getattr(config, name) for name in changed})
+                self.staged = None if staged == config else staged
+        self.schedule_save()
+        for callback in list(self.listeners):
+            callback(config, changed)
+        return changed
+
+    def schedule_save(self):
+        """تأجيل الكتابة: تعديلات متتالية (مثل تصفح قائمة) تنتج كتابة واحدة"""
+        with self.save_lock:
+            self.dirty = True
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = Timer(self.save_delay, self.save)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def save(self):
+        """كتابة ذرية: ملف مؤقت ثم إعادة تسمية، فلا يُقرأ ملف نصف مكتوب بعد انقطاع الكهرباء"""
+        with self.save_lock:
+            if not self.dirty or self.cached is None:
+                return
+            self.dirty = False
+            data = dataclasses.asdict(self.staged or self.cached)
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as handle:
+                    json.dump(data, handle, indent=2)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.warning("⚠ Error saving settings to %s: %s", self.path, e)
+                return
+        logger.debug("💾 Settings saved to %s", self.path)
+
+    def flush(self):
+        """كتابة أي تعديل مؤجل فورًا (عند الإغلاق)"""
+        with self.save_lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        self.save()
+
+
+# ✅ نسخة مشتركة لكل التطبيق (مثل METRICS)؛ الملف لا يُقرأ حتى أول استخدام
+CONFIG = ConfigService()
@@ -0,0 +1,47 @@
+import os
+import re
+from storage.run_file import RunFile, write_run, RUN_EXTENSION
+from algorithms.profile_matching import GoldenProfile, DEFAULT_TOLERANCE
+
+PROFILES_FOLDER = "profiles"
+
+
+def profile_filename(recipe):
+    """اسم ملف آمن لأي اسم وصفة"""
+    return re.sub(r"[^\w\-]+", "_", recipe.strip()).strip("_").lower() + RUN_EXTENSION
+
+
+class ProfileStore:
+    """الملفات المرجعية (golden) لكل وصفة، محفوظة بنفس تنسيق ملف التشغيلة داخل مجلد النتائج"""
+
+    def __init__(self, results_folder):
+        self.folder = os.path.join(results_folder, PROFILES_FOLDER)
+
+    def path(self, recipe):
+        return os.path.join(self.folder, profile_filename(recipe))
+
+    def recipes(self):
+        """أسماء الوصفات التي لها ملف مرجعي"""
+        if not os.path.isdir(self.folder):
+            return []
+        names = []
+        for filename in sorted(os.listdir(self.folder)):
+            if filename.endswith(RUN_EXTENSION):
+                names.append(RunFile(os.path.join(self.folder, filename)).metadata.get("recipe", filename[:-4]))
+        return names
+
+    def load(self, recipe):
+        """الملف المرجعي للوصفة، أو None إن لم يُحفظ بعد"""
+        path = self.path(recipe)
+        if not os.path.exists(path):
+            return None
+        run = RunFile(path)
+        return GoldenProfile(run.metadata.get("recipe", recipe), run.times.copy(), run.temperatures.copy(),
+                             run.metadata.get("tolerance", DEFAULT_TOLERANCE))
+
+    def save(self, recipe, times, temperatures, tolerance=DEFAULT_TOLERANCE, source=None):
+        """اعتماد تشغيلة كملف مرجعي للوصفة (يستبدل السابق بشكل ذري)"""
+        os.makedirs(self.folder, exist_ok=True)
+        times = times - times[0]
+        write_run(self.path(recipe), times, temperatures, {"recipe": recipe, "tolerance": tolerance, "source": source})
+        return GoldenProfile(recipe, times, temperatures, tolerance)
@@ -0,0 +1,195 @@
+import os
+import json
+import sqlite3
+import datetime
+from contextlib import closing
+from storage.run_file import RunFile, RUN_EXTENSION
+from algorithms.data_analysis import analyze_curve
+
+CATALOG_FILE = "catalog.sqlite3"
+DAY_FORMATS = ("%Y-%m-%d", "%d.%m.%Y")  # ✅ المجلدات القديمة تستخدم التنسيق الثاني
+IMPORT_VERSION = 1  # PRAGMA user_version بعد فهرسة النتائج القديمة؛ أقل منه = لم تكتمل الفهرسة بعد
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    day TEXT NOT NULL,
+    start_temperature REAL,
+    process_duration REAL,
+    temper_index REAL,
+    sample_count INTEGER,
+    duration REAL,
+    min_temperature REAL,
+    max_temperature REAL,
+    mean_temperature REAL,
+    image_path TEXT,
+    run_path TEXT,
+    recovered INTEGER DEFAULT 0,
+    analysis TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_day ON runs (day);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_temper_index ON runs (temper_index);
+"""
+
+COLUMNS = ("run_id", "started_at", "day", "start_temperature", "process_duration", "temper_index",
+           "sample_count", "duration", "min_temperature", "max_temperature", "mean_temperature",
+           "image_path", "run_path", "recovered", "analysis")
+
+
+def summarize_run(analysis):
+    """الأعمدة الملخصة في الفهرس من نتيجة التحليل (قاموس TemperingAnalysis)"""
+    summary = {key: analysis[key] for key in ("sample_count", "duration", "min_temperature",
+                                               "max_temperature", "mean_temperature", "temper_index")}
+    summary["analysis"] = json.dumps(analysis)
+    return summary
+
+
+def parse_day(folder_name):
+    """تحويل اسم مجلد اليوم إلى تاريخ، أو None إن لم يكن مجلد نتائج"""
+    for day_format in DAY_FORMATS:
+        try:
+            return datetime.datetime.strptime(folder_name, day_format).date()
+        except ValueError:
+            pass
+    return None
+
+
+class RunCatalog:
+    """فهرس SQLite دائم للتشغيلات المحفوظة داخل مجلد النتائج"""
+
+    def __init__(self, results_folder):
+        self.results_folder = results_folder
+        self.path = os.path.join(results_folder, CATALOG_FILE)
+        os.makedirs(results_folder, exist_ok=True)
+        with closing(self.connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+            # ✅ ترقية فهرس أنشأه إصدار أقدم: إضافة الأعمدة الناقصة
+            existing = {row[1] for row in connection.execute("PRAGMA table_info(runs)")}
+            for column in COLUMNS:
+                if column not in existing:
+                    connection.execute(f"ALTER TABLE runs ADD COLUMN {column}")
+
+    def connect(self):
+        """اتصال جديد لكل عملية حتى يمكن استخدام الفهرس من أي خيط"""
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def add_run(self, record):
+        """إضافة تشغيلة أو تحديثها"""
+        row = {column: record.get(column) for column in COLUMNS}
+        row["recovered"] = int(bool(row["recovered"]))
+        placeholders = ", ".join(f":{column}" for column in COLUMNS)
+        with closing(self.connect()) as connection, connection:
+            connection.execute(f"INSERT OR REPLACE INTO runs ({', '.join(COLUMNS)}) VALUES ({placeholders})", row)
+
+    def add_saved_run(self, image_path, run_path, metadata, times, temperatures):
+        """تسجيل تشغيلة حُفظت للتو من بياناتها الوصفية وعيناتها"""
+        started_at = datetime.datetime.fromisoformat(metadata["started_at"])
+        analysis = metadata.get("analysis")
+        if analysis is None:
+            try:
+                analysis = analyze_curve(times, temperatures).to_dict()
+            except ValueError:
+                pass  # تشغيلة قصيرة جدًا: تُفهرس بدون تحليل
+        record = dict(metadata, sample_count=len(temperatures))
+        if analysis is not None:
+            record.update(summarize_run(analysis))
+        record.update(
+            run_id=self.run_id(image_path),
+            started_at=started_at.isoformat(timespec="seconds"),
+            day=os.path.basename(os.path.dirname(image_path)),
+            image_path=image_path,
+            run_path=run_path,
+        )
+        self.add_run(record)
+
+    def run_id(self, image_path):
+        """معرف التشغيلة: مسار الصورة النسبي بدون امتداد"""
+        relative = os.path.relpath(os.path.abspath(image_path), os.path.abspath(self.results_folder))
+        return os.path.splitext(relative)[0].replace(os.sep, "/")
+
+    def needs_import(self):
+        """هل لم تُفهرس النتائج القديمة بعد؟ (فهرس غير فارغ قد يحتوي فقط على تشغيلات حُفظت بعد إنشائه)"""
+        with closing(self.connect()) as connection:
+            return connection.execute("PRAGMA user_version").fetchone()[0] < IMPORT_VERSION
+
+    def days(self):
+        """أسماء مجلدات الأيام التي تحتوي على نتائج، بالترتيب"""
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT day, MIN(started_at) FROM runs GROUP BY day ORDER BY MIN(started_at)")
+            return [row[0] for row in rows]
+
+    def runs(self, day=None, date_from=None, date_to=None, min_index=None, max_index=None):
+        """التشغيلات المطابقة للمرشحات (التواريخ من نوع date، الحدود شاملة)"""
+        conditions, parameters = [], []
+        if day is not None:
+            conditions.append("day = ?")
+            parameters.append(day)
+        if date_from is not None:
+            conditions.append("started_at >= ?")
+            parameters.append(date_from.isoformat())
+        if date_to is not None:
+            conditions.append("started_at < ?")
+            parameters.append((date_to + datetime.timedelta(days=1)).isoformat())
+        if min_index is not None:
+            conditions.append("temper_index >= ?")
+            parameters.append(min_index)
+        if max_index is not None:
+            conditions.append("temper_index <= ?")
+            parameters.append(max_index)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with closing(self.connect()) as connection:
+            rows = connection.execute(f"SELECT * FROM runs {where} ORDER BY started_at", parameters)
+            return [dict(row) for row in rows]
+
+    def recent_runs(self, limit):
+        """آخر التشغيلات التي لها بيانات خام محفوظة، الأحدث أولًا"""
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT * FROM runs WHERE run_path IS NOT NULL ORDER BY started_at DESC LIMIT ?",
+                                      (limit,))
+            return [dict(row) for row in rows]
+
+    def import_existing(self):
+        """فهرسة النتائج الموجودة على القرص قبل وجود الفهرس، ثم تسجيل اكتمالها حتى لا تتكرر"""
+        known = {row["run_id"] for row in self.runs()}
+        imported = 0
+        for folder in sorted(os.listdir(self.results_folder)):
+            day = parse_day(folder)
+            folder_path = os.path.join(self.results_folder, folder)
+            if day is None or not os.path.isdir(folder_path):
+                continue
+            for filename in sorted(os.listdir(folder_path)):
+                if not filename.endswith(".png"):
+                    continue
+                image_path = os.path.join(folder_path, filename)
+                if self.run_id(image_path) in known:
+                    continue
+                self.import_image(day, image_path)
+                imported += 1
+        # ✅ العلامة بعد اكتمال الفهرسة فقط: انقطاعها في المنتصف يستأنفها في المرة التالية
+        with closing(self.connect()) as connection, connection:
+            connection.execute(f"PRAGMA user_version = {IMPORT_VERSION}")
+        return imported
+
+    def import_image(self, day, image_path):
+        """فهرسة صورة نتيجة قديمة مع ملف .run المرافق إن وجد"""
+        run_path = os.path.splitext(image_path)[0] + RUN_EXTENSION
+        if os.path.exists(run_path):
+            run = RunFile(run_path)
+            self.add_saved_run(image_path, run_path, run.metadata, run.times, run.temperatures)
+            return
+
+        try:
+            clock = datetime.datetime.strptime(os.path.basename(image_path)[len("result_"):][:8], "%H-%M-%S").time()
+        except ValueError:
+            clock = datetime.time()
+        self.add_run({
+            "run_id": self.run_id(image_path),
+            "started_at": datetime.datetime.combine(day, clock).isoformat(timespec="seconds"),
+            "day": os.path.basename(os.path.dirname(image_path)),
+            "image_path": image_path,
+        })
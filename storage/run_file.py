@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import struct
+import numpy as np
+
+# تنسيق ملف التشغيلة (.run):
+#   ترويسة ثابتة: MAGIC (8 بايت) | الإصدار uint16 | محجوز uint16 | طول JSON uint32
+#   ثم بيانات التشغيلة بصيغة JSON، ثم حشو حتى حد 64 بايت
+#   ثم سجلات العينات المتتالية (time float64, temperature float32)
+#   ثم أقسام الهرم (اختيارية): لكل مستوى تقليل سجلات (time float64, min, max, mean float32)
+#   بالترتيب المذكور في metadata["pyramid"]؛ القارئ القديم يتجاهلها لأن sample_count يحد العينات.
+# العينات تُقرأ مباشرة عبر np.memmap دون تحليل نصي.
+MAGIC = b"CHOCORUN"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+ALIGNMENT = 64
+SAMPLE_DTYPE = np.dtype([("time", "<f8"), ("temperature", "<f4")])
+PYRAMID_DTYPE = np.dtype([("time", "<f8"), ("min", "<f4"), ("max", "<f4"), ("mean", "<f4")])
+PYRAMID_FACTOR = 4        # كل مستوى يجمع 4 نقاط من المستوى الأدق
+PYRAMID_MIN_POINTS = 64   # لا حاجة لمستويات أخشن من هذا
+RUN_EXTENSION = ".run"
+CSV_COLUMNS = ("Time (s)", "Temperature (°C)")
+
+
+def data_offset(metadata_size):
+    """موضع أول عينة بعد الترويسة والبيانات الوصفية"""
+    size = HEADER.size + metadata_size
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_header(metadata):
+    """ترميز الترويسة مع الحشو حتى بداية العينات"""
+    payload = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+    header = HEADER.pack(MAGIC, VERSION, 0, len(payload)) + payload
+    return header.ljust(data_offset(len(payload)), b"\0")
+
+
+def read_header(handle):
+    """قراءة البيانات الوصفية وموضع العينات من ملف مفتوح"""
+    magic, version, _, size = HEADER.unpack(handle.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a Choco-Master run file")
+    if version > VERSION:
+        raise ValueError(f"Unsupported run file version: {version}")
+    metadata = json.loads(handle.read(size).decode("utf-8"))
+    return metadata, data_offset(size)
+
+
+def pack_samples(times, temperatures):
+    """تحويل مصفوفتي الزمن والحرارة إلى سجلات العينات"""
+    samples = np.empty(len(times), dtype=SAMPLE_DTYPE)
+    samples["time"] = times
+    samples["temperature"] = temperatures
+    return samples
+
+
+def decimate(times, temperatures, factor):
+    """مستوى هرم واحد: أدنى وأعلى ومتوسط حرارة كل factor عينة متتالية، وزمن منتصف المجموعة"""
+    starts = np.arange(0, len(temperatures), factor)
+    counts = np.diff(np.append(starts, len(temperatures)))
+    level = np.empty(len(starts), dtype=PYRAMID_DTYPE)
+    level["time"] = np.add.reduceat(times, starts) / counts
+    level["min"] = np.minimum.reduceat(temperatures, starts)
+    level["max"] = np.maximum.reduceat(temperatures, starts)
+    level["mean"] = np.add.reduceat(temperatures.astype(np.float64), starts) / counts
+    return level
+
+
+def build_pyramid(samples):
+    """مستويات التقليل (factor، السجلات) من الأدق إلى الأخشن"""
+    levels, factor = [], PYRAMID_FACTOR
+    while len(samples) // factor >= PYRAMID_MIN_POINTS:
+        levels.append((factor, decimate(samples["time"], samples["temperature"], factor)))
+        factor *= PYRAMID_FACTOR
+    return levels
+
+
+def write_run(path, times, temperatures, metadata):
+    """كتابة تشغيلة كاملة في ملف واحد بشكل ذري (ملف مؤقت ثم إعادة تسمية)"""
+    samples = pack_samples(times, temperatures)
+    # ✅ مستويات min/max/mean محسوبة مرة واحدة عند الحفظ: العرض يقرأ المستوى المناسب لعرض الشاشة فقط
+    pyramid = build_pyramid(samples)
+    metadata = dict(metadata, sample_count=len(samples),
+                    pyramid=[[factor, len(level)] for factor, level in pyramid])
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(encode_header(metadata))
+        handle.write(samples.tobytes())
+        for _, level in pyramid:
+            handle.write(level.tobytes())
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+    return path
+
+
+class RunFile:
+    """فتح ملف تشغيلة للقراءة مع ربط العينات بالذاكرة"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self.metadata, self.offset = read_header(handle)
+            handle.seek(0, os.SEEK_END)
+            file_size = handle.tell()
+
+        # العدد المسجل في البيانات الوصفية، أو ما يتسع له الملف إن لم يُسجل
+        available = max(0, file_size - self.offset) // SAMPLE_DTYPE.itemsize
+        count = min(self.metadata.get("sample_count", available), available)
+        if count:
+            self.samples = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r", offset=self.offset, shape=(count,))
+        else:
+            self.samples = np.empty(0, dtype=SAMPLE_DTYPE)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def times(self):
+        return self.samples["time"]
+
+    @property
+    def temperatures(self):
+        return self.samples["temperature"]
+
+    def level(self, factor):
+        """مستوى هرم محفوظ (ربط بالذاكرة)، أو None إن لم يُحفظ"""
+        offset = self.offset + len(self.samples) * SAMPLE_DTYPE.itemsize
+        for level_factor, count in self.metadata.get("pyramid", ()):
+            if level_factor == factor:
+                return np.memmap(self.path, dtype=PYRAMID_DTYPE, mode="r", offset=offset, shape=(count,))
+            offset += count * PYRAMID_DTYPE.itemsize
+        return None
+
+    def envelope(self, points):
+        """(الزمن، الأدنى، الأعلى، المتوسط) بأقل دقة لا تقل عن points نقطة (عرض الرسم بالبكسل)
+
+        يُقرأ المستوى المحفوظ المناسب فقط؛ الملفات القديمة بدون هرم تُقلَّل عند القراءة.
+        """
+        samples, points = self.samples, max(points, 1)
+        saved = [factor for factor, count in self.metadata.get("pyramid", ()) if count >= points]
+        if saved:
+            level = self.level(max(saved))
+        else:
+            factor = PYRAMID_FACTOR
+            while len(samples) // (factor * PYRAMID_FACTOR) >= points:
+                factor *= PYRAMID_FACTOR
+            if len(samples) // factor < points:
+                return samples["time"], samples["temperature"], samples["temperature"], samples["temperature"]
+            level = decimate(samples["time"], samples["temperature"], factor)
+        return level["time"], level["min"], level["max"], level["mean"]
+
+
+def export_csv(run_path, csv_path):
+    """تصدير ملف التشغيلة إلى CSV بالأعمدة التي يتوقعها DataAnalysis"""
+    run = RunFile(run_path)
+    table = np.column_stack((run.times, run.temperatures))
+    np.savetxt(csv_path, table, delimiter=",", fmt=("%.3f", "%.2f"),
+               header=",".join(CSV_COLUMNS), comments="", encoding="utf-8")
+    return csv_path
+
+
+if __name__ == "__main__":
+    # مثال: python -m storage.run_file results/2025-01-30/result_00-13-11.run exported_data.csv
+    if len(sys.argv) != 3:
+        print("Usage: python -m storage.run_file <run_file> <csv_file>")
+        sys.exit(1)
+    print(f"[SUCCESS] Exported to: {export_csv(sys.argv[1], sys.argv[2])}")
@@ -0,0 +1,81 @@
+import os
+import glob
+import time
+import queue
+from threading import Thread
+from storage.run_file import RunFile, encode_header, pack_samples
+
+JOURNAL_EXTENSION = ".journal"
+
+
+class RunJournal:
+    """سجل كتابة مسبقة للتشغيلة الجارية: العينات تُلحق بالقرص فور وصولها"""
+
+    def __init__(self, path, metadata, run_start_time, fsync_interval=1.0):
+        self.path = path
+        self.run_start_time = run_start_time
+        self.fsync_interval = fsync_interval
+        self.queue = queue.SimpleQueue()
+        self.sample_count = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # ✅ نفس تنسيق ملف .run بدون sample_count: العدد يُستنتج من حجم الملف عند الاسترجاع
+        self.handle = open(path, "wb")
+        self.handle.write(encode_header(metadata))
+        self.sync()
+
+        self.thread = Thread(target=self.write_loop, name="run-journal", daemon=True)
+        self.thread.start()
+
+    def append(self, timestamps, temperatures):
+        """يُستدعى من خيط القراءة: وضع الدفعة في الطابور فقط دون أي عملية قرص"""
+        self.queue.put((timestamps, temperatures))
+
+    def write_loop(self):
+        """كتابة الدفعات بالتتابع مع fsync دوري"""
+        last_sync = time.monotonic()
+        while True:
+            try:
+                batch = self.queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                batch = False
+            if batch is None:
+                break
+            if batch:
+                timestamps, temperatures = batch
+                self.handle.write(pack_samples(timestamps - self.run_start_time, temperatures).tobytes())
+                self.sample_count += len(temperatures)
+            if time.monotonic() - last_sync >= self.fsync_interval:
+                self.sync()
+                last_sync = time.monotonic()
+        self.sync()
+
+    def sync(self):
+        """دفع البيانات المخزنة إلى القرص فعليًا"""
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+
+    def close(self):
+        """إنهاء الكتابة بعد تفريغ الطابور"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if not self.handle.closed:
+            self.handle.close()
+
+    def discard(self):
+        """حذف السجل بعد حفظ التشغيلة النهائية بنجاح"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def find_unfinished_journals(journal_folder):
+    """السجلات المتبقية من تشغيلات لم تكتمل (انقطاع كهرباء أو تعطل)"""
+    return sorted(glob.glob(os.path.join(journal_folder, "*" + JOURNAL_EXTENSION)))
+
+
+def load_journal(path):
+    """قراءة سجل غير مكتمل: (الأزمنة، القيم، البيانات الوصفية)؛ السجل الأخير الناقص يُتجاهل"""
+    run = RunFile(path)
+    return run.times.copy(), run.temperatures.copy(), run.metadata
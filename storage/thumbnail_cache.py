@@ -0,0 +1,57 @@
+import os
+import hashlib
+from collections import OrderedDict
+from threading import Lock, get_ident
+
+THUMBNAIL_SIZE = (200, 200)
+
+
+class LRUCache:
+    """ذاكرة مؤقتة محدودة الحجم تحذف الأقدم استخدامًا"""
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+
+
+class ThumbnailCache:
+    """صور مصغرة على القرص مفتاحها مسار الصورة ووقت تعديلها"""
+
+    def __init__(self, cache_folder, size=THUMBNAIL_SIZE):
+        self.cache_folder = cache_folder
+        self.size = size
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def thumbnail_path(self, image_path):
+        """مسار الصورة المصغرة؛ يتغير تلقائيًا إذا عُدلت الصورة الأصلية"""
+        stat = os.stat(image_path)
+        key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{self.size[0]}x{self.size[1]}"
+        return os.path.join(self.cache_folder, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def ensure(self, image_path):
+        """إرجاع مسار الصورة المصغرة وإنشاؤها مرة واحدة عند الحاجة (آمن من أي خيط)"""
+        path = self.thumbnail_path(image_path)
+        if not os.path.exists(path):
+            from PIL import Image  # ✅ Pillow يُحمّل عند أول صورة مصغرة فقط
+            with Image.open(image_path) as image:
+                image.draft("RGB", self.size)  # ✅ فك ترميز مصغر مباشرة للصيغ التي تدعمه
+                image.thumbnail(self.size, Image.Resampling.LANCZOS)
+                temp_path = f"{path}.{get_ident()}.tmp"
+                image.save(temp_path, format="PNG")
+            os.replace(temp_path, path)
+        return path
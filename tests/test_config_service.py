@@ -0,0 +1,45 @@
+import json
+from storage.config_service import ConfigService
+
+
+def make_service(tmp_path):
+    return ConfigService(str(tmp_path / "config.json"), legacy_path=None, save_delay=60)
+
+
+def test_stage_saves_without_applying(tmp_path):
+    service = make_service(tmp_path)
+    notified = []
+    service.add_listener(lambda config, changed: notified.append(changed))
+
+    assert service.stage({"port": "/dev/ttyUSB1", "baudrate": 9600, "duration": 7}) == {"sensors", "duration"}
+
+    assert notified == []
+    assert service.config.sensors[0].port == "auto" and service.config.duration == 5
+    assert service.saved_config.sensors[0].port == "/dev/ttyUSB1"
+    service.flush()
+    saved = json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))
+    assert saved["duration"] == 7 and saved["sensors"][0]["baudrate"] == 9600
+
+
+def test_apply_after_stage_notifies_once(tmp_path):
+    service = make_service(tmp_path)
+    notified = []
+    service.add_listener(lambda config, changed: notified.append(changed))
+    settings = {"port": "/dev/ttyUSB1", "baudrate": 9600, "duration": 7}
+    service.stage(dict(settings, baudrate=19200))
+    service.stage(settings)
+
+    assert service.apply(settings) == {"sensors", "duration"}
+    assert notified == [{"sensors", "duration"}]
+    assert service.staged is None
+    assert service.config.sensors[0].baudrate == 9600
+
+
+def test_staged_changes_survive_other_updates(tmp_path):
+    service = make_service(tmp_path)
+    service.stage({"duration": 9})
+    service.update(frame_rate=30)
+    assert service.config.duration == 5 and service.config.frame_rate == 30
+    assert service.saved_config.duration == 9 and service.saved_config.frame_rate == 30
+    service.stage({"duration": 5})
+    assert service.staged is None
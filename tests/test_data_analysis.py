@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sensors.simulator import SensorSource, SyntheticCurve
+from algorithms.data_analysis import analyze_curve
+
+RATE = 10.0
+
+
+class HeldCurve(SensorSource):
+    """تبريد خطي بمعدل 2 °C/min مع هضبة عند 25 °C بين 150 و 350 ثانية"""
+
+    def baseline(self, times):
+        return np.where(times < 150, 30 - times / 30, np.where(times < 350, 25.0, 25 - (times - 350) / 30))
+
+
+def record(source, minutes):
+    count = int(minutes * 60 * RATE)
+    return np.arange(count) / RATE, source.next_samples(count)[:, 0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("noise", [0.0, 0.05, 0.1])
+def test_curve_without_crystallization(seed, noise):
+    analysis = analyze_curve(*record(SyntheticCurve(rate=RATE, bumps=(), noise=noise, seed=seed), 20))
+    assert analysis.temper_index == 0.0
+    assert analysis.inflection_time is None
+    assert analysis.plateaus == ()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_crystallization_bump_raises_temper_index(seed):
+    analysis = analyze_curve(*record(SyntheticCurve(rate=RATE, seed=seed), 20))
+    assert analysis.temper_index >= 3.0
+    assert 80 < analysis.inflection_time < 120
+    assert len(analysis.plateaus) == 1
+    plateau = analysis.plateaus[0]
+    assert plateau.start_time <= analysis.inflection_time < plateau.end_time
+    assert plateau.end_time > 115  # يشمل قمة التبلور عند 120 ثانية
+
+
+def test_temper_index_does_not_depend_on_run_length():
+    for bumps in (None, ()):
+        short = analyze_curve(*record(SyntheticCurve(rate=RATE, bumps=bumps, seed=1), 3))
+        long = analyze_curve(*record(SyntheticCurve(rate=RATE, bumps=bumps, seed=1), 20))
+        assert short.temper_index == long.temper_index
+        assert short.inflection_time == long.inflection_time
+
+
+def test_held_temperature_is_one_plateau():
+    analysis = analyze_curve(*record(HeldCurve(rate=RATE, noise=0.02, seed=2), 10))
+    assert analysis.temper_index == pytest.approx(5.0, abs=0.2)
+    assert analysis.inflection_time == pytest.approx(150, abs=5)
+    assert len(analysis.plateaus) == 1
+    plateau = analysis.plateaus[0]
+    assert plateau.temperature == pytest.approx(25.0, abs=0.1)
+    assert plateau.duration > 150
@@ -0,0 +1,57 @@
+import os
+import glob
+import time
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtWidgets import QApplication
+from sensors.arduino_receiver import ArduinoReader
+from sensors.async_core import AsyncAcquisitionCore
+from storage.run_file import RunFile, RUN_EXTENSION
+from storage.run_journal import JOURNAL_EXTENSION
+from ui.acquisition_bridge import AcquisitionBridge
+from ui.graph_widget import GraphWidget
+
+BUFFER_CAPACITY = 256
+BATCH = 50
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def record_run(app, results_folder, batches):
+    reader = ArduinoReader(port="test", buffer_capacity=BUFFER_CAPACITY)
+    core = AsyncAcquisitionCore([reader])
+    core.start()
+    graph = GraphWidget(reader, AcquisitionBridge(core), results_folder=str(results_folder))
+    graph.start_graph()
+    started = time.monotonic()
+    for index in range(batches):
+        values = 30 - 0.001 * np.arange(index * BATCH, (index + 1) * BATCH)
+        timestamps = started + np.arange(index * BATCH, (index + 1) * BATCH) / 1000
+        reader.channels[0].push(values, timestamps[-1], timestamps)
+        graph.update_plot()
+    graph.stop_graph()
+    graph.renderer.shutdown(wait=True)
+    graph.process_timer.stop()
+    core.stop()
+    return glob.glob(os.path.join(str(results_folder), "*", "*" + RUN_EXTENSION))
+
+
+def test_run_longer_than_buffer_is_saved_completely(app, tmp_path):
+    batches = 20  # 1000 عينة في مخزن سعته 256: المخزن يلتف عدة مرات أثناء التشغيلة
+    runs = record_run(app, tmp_path, batches)
+    assert len(runs) == 1
+    run = RunFile(runs[0])
+    assert len(run.temperatures) == batches * BATCH
+    assert run.temperatures[0] == pytest.approx(30.0)
+    assert np.all(np.diff(run.times) > 0)
+    assert not glob.glob(os.path.join(str(tmp_path), ".journal", "*" + JOURNAL_EXTENSION))
+
+
+def test_run_within_buffer_is_saved_from_buffer(app, tmp_path):
+    runs = record_run(app, tmp_path, 3)
+    assert len(RunFile(runs[0]).temperatures) == 3 * BATCH
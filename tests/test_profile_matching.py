@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from algorithms.profile_matching import GoldenProfile, StreamingProfileMatcher, PROFILE_STEP
+
+START = 1000.0  # الزمن الرتيب عند بداية التشغيلة
+
+
+def cooling(times):
+    return 32 - times / 30
+
+
+def feed(matcher, first, last, rate=10.0, batch=5):
+    """عينات تتبع الملف المرجعي تمامًا من first حتى last ثانية بعد البداية"""
+    times = np.arange(first, last, 1 / rate)
+    events = []
+    matcher.add_listener(events.append)
+    for start in range(0, len(times), batch):
+        chunk = times[start:start + batch]
+        matcher.update_batch(START + chunk, cooling(chunk))
+    return events
+
+
+@pytest.fixture
+def matcher():
+    times = np.arange(0, 300, 0.1)
+    matcher = StreamingProfileMatcher(GoldenProfile("test", times, cooling(times), tolerance=0.5))
+    matcher.reset(START)
+    return matcher
+
+
+def test_aligned_run_has_no_lag(matcher):
+    assert feed(matcher, 0, 120) == []
+    assert abs(matcher.lag) <= PROFILE_STEP
+    assert matcher.bin_index == pytest.approx(120 / PROFILE_STEP, abs=2)
+
+
+@pytest.mark.parametrize("delay", [3 * PROFILE_STEP, 10.0])
+def test_first_sample_after_several_steps(matcher, delay):
+    # أول عينة تصل بعد عدة فترات من reset (اتصال متأخر): الفترات الأولى لا تُسقط من DTW
+    events = feed(matcher, delay, 120)
+    assert events == []
+    assert abs(matcher.lag) <= PROFILE_STEP
+    assert abs(matcher.deviation) < 0.05
+    assert matcher.bin_index == pytest.approx(120 / PROFILE_STEP, abs=2)
@@ -0,0 +1,12 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from algorithms.report_rendering import unique_path
+
+
+def test_unique_path_reserves_each_name_once(tmp_path):
+    path = str(tmp_path / "result_12-00-00.png")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = list(executor.map(lambda _: unique_path(path), range(32)))
+    assert len(set(paths)) == len(paths)
+    assert path in paths and str(tmp_path / "result_12-00-00_31.png") in paths
+    assert all(os.path.exists(reserved) for reserved in paths)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from scipy.signal import savgol_filter
+from algorithms.smoothing import StreamingSavgol
+
+WINDOW = 11
+ORDER = 3
+
+
+def batch_sizes(random, total):
+    """أحجام دفعات عشوائية: دفعات من عينة واحدة، ودفعات تقطع النافذة، ودفعات أطول منها"""
+    sizes = []
+    while sum(sizes) < total:
+        sizes.append(int(random.choice([1, 1, 2, 3, WINDOW // 2, WINDOW - 1, WINDOW + 1, random.integers(1, 60)])))
+    return sizes
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_streaming_matches_savgol_filter(seed):
+    random = np.random.default_rng(seed)
+    values = np.cumsum(random.normal(0, 0.1, 2000)) + 30
+    smoother = StreamingSavgol(WINDOW, ORDER, capacity=64)  # ✅ سعة صغيرة: يشمل مسار توسيع المخزن
+    size = 0
+    for batch in batch_sizes(random, len(values)):
+        size = min(size + batch, len(values))
+        output = smoother.update(values[:size])
+        if size >= WINDOW:
+            assert_allclose(output, savgol_filter(values[:size], WINDOW, ORDER), rtol=0, atol=1e-9)
+        else:
+            assert_allclose(output, values[:size])
+    assert_allclose(smoother.update(values), savgol_filter(values, WINDOW, ORDER), rtol=0, atol=1e-9)
+
+
+def test_reset_starts_a_new_series():
+    random = np.random.default_rng(1)
+    first, second = random.normal(30, 1, 300), random.normal(20, 1, 150)
+    smoother = StreamingSavgol(WINDOW, ORDER)
+    smoother.update(first)
+    smoother.reset()
+    for size in range(1, len(second) + 1, 7):
+        smoother.update(second[:size])
+    assert_allclose(smoother.update(second), savgol_filter(second, WINDOW, ORDER), rtol=0, atol=1e-9)
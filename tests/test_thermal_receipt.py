@@ -0,0 +1,42 @@
+import struct
+import numpy as np
+from sensors.simulator import SyntheticCurve
+from algorithms.thermal_receipt import (FilePrinter, render_receipt_bitmap, ESC_INIT, ESC_FEED, GS_RASTER, GS_CUT,
+                                        PRINTER_DOTS, FEED_LINES, BAND_ROWS)
+
+
+def parse_escpos(data):
+    """فك أوامر GS v 0 من ملف الطابعة: (مصفوفة النقاط، عرض كل شريحة بالبايت، ارتفاعات الشرائح)"""
+    assert data.startswith(ESC_INIT)
+    position = len(ESC_INIT)
+    bands, widths, heights = [], [], []
+    while data.startswith(GS_RASTER, position):
+        width_bytes, height = struct.unpack_from("<HH", data, position + len(GS_RASTER))
+        position += len(GS_RASTER) + 4
+        size = width_bytes * height
+        packed = np.frombuffer(data, dtype=np.uint8, count=size, offset=position).reshape(height, width_bytes)
+        bands.append(np.unpackbits(packed, axis=1).astype(bool))
+        widths.append(width_bytes)
+        heights.append(height)
+        position += size
+    assert data[position:] == ESC_FEED + bytes([FEED_LINES]) + GS_CUT
+    return np.vstack(bands), widths, heights
+
+
+def test_printed_raster_matches_rendered_bitmap(tmp_path):
+    times = np.arange(3000) / 10
+    temperatures = SyntheticCurve(seed=1).next_samples(3000)[:, 0]
+    dots = render_receipt_bitmap(times, temperatures, 5.0, subtitle="2025-01-30 00:13")
+    path = tmp_path / "receipt.bin"
+
+    written = FilePrinter(str(path)).print_raster(dots)
+
+    data = path.read_bytes()
+    assert written == len(data)
+    raster, widths, heights = parse_escpos(data)
+    assert set(widths) == {PRINTER_DOTS // 8}
+    assert sum(heights) == dots.shape[0]
+    assert len(heights) > 1 and max(heights) <= BAND_ROWS  # التقرير أطول من شريحة واحدة
+    assert dots.shape[1] == PRINTER_DOTS
+    np.testing.assert_array_equal(raster, dots)
+    assert dots.any() and not dots.all()
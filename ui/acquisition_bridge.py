@@ -0,0 +1,32 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from sensors.async_core import coalesce
+
+
+class AcquisitionBridge(QObject):
+    """جسر بين نواة القراءة (asyncio) وحلقة Qt: الواجهة تُبلغ بالإشارات بدل الاستطلاع بالمؤقتات"""
+    samples_received = pyqtSignal(str, int)    # اسم القناة، مؤشر الكتابة في مخزنها
+    plateau_events = pyqtSignal(str, list)     # اسم القناة، أحداث PlateauEvent
+    connection_changed = pyqtSignal(str, str, str)  # المنفذ، الحالة، تفاصيل (المنفذ الفعلي أو موعد المحاولة التالية)
+
+    def __init__(self, core, max_rate=60):
+        super().__init__()
+        self.core = core
+        self.interval = 1 / max_rate  # ✅ أقصى عدد إشعارات في الثانية لكل قناة مهما كان معدل العينات
+        for reader in core.readers:
+            reader.add_state_listener(self.on_state_changed)
+        core.run_pipeline(self.forward)
+
+    def on_state_changed(self, reader, state, detail):
+        """تُستدعى من خيط الاتصال؛ الإشارة تنقل الحالة إلى خيط الواجهة"""
+        self.connection_changed.emit(reader.port, state, detail)
+
+    async def forward(self, core):
+        """تعمل داخل حلقة القراءة؛ الإشارات تُنقل تلقائيًا إلى خيط الواجهة (QueuedConnection)"""
+        subscription = core.subscribe()
+        try:
+            async for batch in coalesce(subscription, self.interval):
+                if batch.events:
+                    self.plateau_events.emit(batch.channel, list(batch.events))
+                self.samples_received.emit(batch.channel, batch.write_index)
+        finally:
+            subscription.close()
@@ -1,7 +1,5 @@
 from PyQt6.QtWidgets import QPushButton, QVBoxLayout, QWidget
 from PyQt6.QtCore import pyqtSignal
-from ui.settings_ui import SettingsUI
-from ui.print_ui import PrintUI
 
 class ControlButtons(QWidget):
     # إشارات لزر Start/Stop والإعدادات للتفاعل مع الواجهة الرئيسية
@@ -51,5 +49,6 @@ class ControlButtons(QWidget):
         self.running = not self.running
 
     def open_history(self):
+        from ui.print_ui import PrintUI  # ✅ نافذة السجل تُحمّل عند فتحها فقط (بدء أسرع)
         self.history_window = PrintUI(self)
         self.history_window.show()
@@ -0,0 +1,71 @@
+import os
+import datetime
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel
+from PyQt6.QtCore import QTimer
+from diagnostics.metrics import METRICS
+
+
+def format_metric(value):
+    """عرض قيمة مقياس في خلية واحدة"""
+    if isinstance(value, dict):
+        if not value.get("count"):
+            return "—"
+        return (f"n={value['count']}  mean={value['mean']:.3f}  p50≤{value['p50']}  "
+                f"p95≤{value['p95']}  p99≤{value['p99']}  max={value['max']:.3f}")
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+class DebugPanel(QWidget):
+    """نافذة المقاييس الحية (F12): عدادات القراءة، امتلاء المخزن، أزمنة الرسم والحفظ"""
+
+    def __init__(self, dump_folder, refresh_ms=1000):
+        super().__init__()
+        self.setWindowTitle("Choco Master - Metrics")
+        self.resize(760, 420)
+        self.dump_folder = dump_folder
+
+        layout = QVBoxLayout()
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Metric", "Value"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.dump_button = QPushButton("Dump to file")
+        self.dump_button.clicked.connect(self.dump_metrics)
+        buttons.addWidget(self.dump_button)
+        self.status_label = QLabel("")
+        buttons.addWidget(self.status_label, 1)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        # ✅ اللوحة وحدها تستطلع المقاييس، وفقط أثناء ظهورها
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.refresh)
+        self.refresh_ms = refresh_ms
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start(self.refresh_ms)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snapshot = METRICS.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (name, value) in enumerate(snapshot.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.setItem(row, 1, QTableWidgetItem(format_metric(value)))
+        self.table.resizeColumnToContents(0)
+
+    def dump_metrics(self):
+        os.makedirs(self.dump_folder, exist_ok=True)
+        name = f"metrics_{datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        path = METRICS.dump(os.path.join(self.dump_folder, name))
+        self.status_label.setText(f"Saved: {path}")
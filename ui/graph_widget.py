@@ -1,25 +1,139 @@
 import os
+import time
+import logging
 import datetime
 import numpy as np
 import pyqtgraph as pg
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt6.QtCore import QTimer, pyqtSignal, Qt
-import matplotlib.pyplot as plt
-import pandas as pd
-from scipy.signal import find_peaks, savgol_filter
+from algorithms.smoothing import StreamingSavgol
+from algorithms.data_analysis import analyze_curve
+from algorithms.plateau_detector import PLATEAU_START
+from algorithms.profile_matching import StreamingProfileMatcher, DEVIATION_START
+from algorithms.report_rendering import ResultRenderer, render_temperature_curve, unique_path
+from storage.run_file import RunFile, write_run, RUN_EXTENSION
+from storage.run_journal import RunJournal, JOURNAL_EXTENSION, find_unfinished_journals, load_journal
+from storage.run_catalog import RunCatalog
+from storage.profile_store import ProfileStore
+from storage.thumbnail_cache import ThumbnailCache
+from storage.config_service import CONFIG
+from diagnostics.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+FRAME_TIME = METRICS.histogram("plot.frame_ms")
+PLOT_LATENCY = METRICS.histogram("plot.latency_ms")  # من وصول الدفعة إلى القارئ حتى رسمها
+SAVE_DURATION = METRICS.histogram("save.duration_ms")
+DEVIATION_ALERTS = METRICS.counter("profile.deviation_alerts")
+
+PROFILE_STYLE = "font-size: 16px; padding: 4px; border-radius: 6px; color: white; background-color: {};"
+
+REFERENCE_RUNS = 50                # عدد التشغيلات السابقة في النطاق المرجعي
+REFERENCE_PERCENTILES = (10, 90)   # حدود النطاق (تتجاهل التشغيلات الشاذة)
+MIN_REFERENCE_POINTS = 200
+
+
+def save_run_results(run_path, image_path, times, temperatures, metadata, journal=None, catalog=None,
+                     thumbnails=None):
+    """حفظ بيانات التشغيلة الخام ثم صورة المنحنى ثم تسجيلها في الفهرس (تُنفذ في خيط الرسم)"""
+    started = time.perf_counter()
+    try:
+        # ✅ التحليل يُحسب مرة واحدة ويُحفظ مع التشغيلة حتى لا يُعاد حسابه في التقارير والفهرس
+        metadata = dict(metadata, analysis=analyze_curve(times, temperatures).to_dict())
+    except ValueError as e:
+        logger.warning("⚠ Run not analyzed: %s", e)
+    write_run(run_path, times, temperatures, metadata)
+    if journal is not None:
+        journal.discard()  # ✅ الملف النهائي محفوظ، لم نعد بحاجة إلى السجل
+    render_temperature_curve(image_path, times, temperatures)
+    if thumbnails is not None:
+        thumbnails.ensure(image_path)  # ✅ الصورة المصغرة جاهزة قبل فتح شاشة السجل
+    if catalog is not None:
+        catalog.add_saved_run(image_path, run_path, metadata, times, temperatures)
+    SAVE_DURATION.observe((time.perf_counter() - started) * 1000)
+    return image_path
+
+
+def save_journal_results(run_path, image_path, metadata, journal, catalog=None, thumbnails=None):
+    """حفظ التشغيلة من سجلها بدل المخزن الدائري (حين تكون التشغيلة أطول من سعة المخزن)"""
+    journal.close()  # ✅ تفريغ كل الدفعات المنتظرة إلى القرص قبل القراءة
+    times, temperatures, _ = load_journal(journal.path)
+    return save_run_results(run_path, image_path, times, temperatures, metadata, journal, catalog, thumbnails)
+
+
+def recover_journals(journal_paths, results_folder, catalog=None, thumbnails=None):
+    """تحويل سجلات التشغيلات غير المكتملة إلى ملفات نتائج عادية"""
+    recovered = []
+    for journal_path in journal_paths:
+        try:
+            times, temperatures, metadata = load_journal(journal_path)
+        except (OSError, ValueError) as e:
+            logger.warning("⚠ Skipping unreadable journal %s: %s", journal_path, e)
+            continue
+        if len(times) == 0:
+            os.remove(journal_path)
+            continue
+
+        started_at = datetime.datetime.fromisoformat(metadata["started_at"])
+        folder = os.path.join(results_folder, started_at.strftime("%Y-%m-%d"))
+        os.makedirs(folder, exist_ok=True)
+        image_path = unique_path(os.path.join(folder, f"result_{started_at.strftime('%H-%M-%S')}.png"))
+        run_path = os.path.splitext(image_path)[0] + RUN_EXTENSION
+        metadata = dict(metadata, image=os.path.basename(image_path), recovered=True)
+
+        save_run_results(run_path, image_path, times, temperatures, metadata, catalog=catalog, thumbnails=thumbnails)
+        os.remove(journal_path)
+        logger.info("♻ Recovered unfinished run (%d samples) to: %s", len(times), run_path)
+        recovered.append(image_path)
+    return recovered
+
+
+def load_reference_band(catalog, points, limit=REFERENCE_RUNS):
+    """نطاق مرجعي من آخر التشغيلات: نسب مئوية لمتوسطات منحنياتها عند كل نقطة زمنية
+
+    كل تشغيلة تُقرأ من مستوى الهرم المناسب لعرض الرسم فقط، فتكلفة 50 تشغيلة قريبة من تكلفة منحنى واحد.
+    """
+    curves = []
+    for run in catalog.recent_runs(limit):
+        try:
+            times, _, _, means = RunFile(run["run_path"]).envelope(points)
+        except (OSError, ValueError):
+            continue  # ملف محذوف أو تالف
+        if len(times) >= 2:
+            curves.append((times, means))
+    if not curves:
+        return None
+    grid = np.linspace(0, max(times[-1] for times, _ in curves), points)
+    stacked = np.vstack([np.interp(grid, times, means, left=np.nan, right=np.nan) for times, means in curves])
+    covered = np.isfinite(stacked).any(axis=0)
+    low, high = np.nanpercentile(stacked[:, covered], REFERENCE_PERCENTILES, axis=0)
+    return grid[covered], low, high, len(curves)
+
 
 class GraphWidget(QWidget):
     process_completed = pyqtSignal()
+    results_saved = pyqtSignal(str)  # ✅ مسار الصورة عند انتهاء الحفظ في الخلفية
+    results_failed = pyqtSignal(str)
+    reference_loaded = pyqtSignal(object)  # ✅ النطاق المرجعي محسوبًا في الخلفية
+    deviation_alert = pyqtSignal(object)   # DeviationEvent فور خروج التشغيلة عن سماحية الملف المرجعي أو عودتها
 
-    def __init__(self, arduino_reader, start_temperature=30, process_duration=3):
+    def __init__(self, arduino_reader, bridge, start_temperature=30, process_duration=3, frame_rate=20,
+                 results_folder=None):
         super().__init__()
 
         layout = QVBoxLayout()
+        # ✅ الانحراف عن الملف المرجعي للوصفة (يظهر فقط عند اختيار وصفة لها ملف مرجعي)
+        self.profile_label = QLabel("")
+        self.profile_label.setVisible(False)
+        layout.addWidget(self.profile_label)
         self.graph_widget = pg.PlotWidget()
         self.graph_widget.setBackground("#1A1A1A")
         self.graph_widget.setTitle("Temperature vs Time", color="w", size="18pt")
         self.graph_widget.setLabel("left", "Temperature (\u00b0C)", color="white", size="14pt")
         self.graph_widget.setLabel("bottom", "Time (s)", color="white", size="14pt")
+        # ✅ رسم آلاف النقاط بسلاسة: تقليل العينات حسب عرض الشاشة ورسم الجزء الظاهر فقط
+        self.graph_widget.setDownsampling(auto=True, mode="peak")
+        self.graph_widget.setClipToView(True)
 
         layout.addWidget(self.graph_widget)
         self.setLayout(layout)
@@ -27,126 +141,359 @@ class GraphWidget(QWidget):
         self.start_temperature = start_temperature
         self.process_duration = process_duration * 60
         self.max_time = self.process_duration
+        self.frame_rate = frame_rate
 
-        self.temperature_data = []
-        self.time_data = []
+        # ✅ عروض لعينات التشغيلة الحالية (الأزمنة بالثواني منذ بداية التشغيلة)
+        self.temperature_data = np.empty(0)
+        self.time_data = np.empty(0)
 
-        self.data_points = 0
         self.running = False
         self.process_started = False
 
         self.arduino_reader = arduino_reader
-        self.curve = self.graph_widget.plot(pen=pg.mkPen(color="c", width=2))
+        self.buffer = arduino_reader.buffer
+        self.run_start_index = 0   # أول عينة في التشغيلة (لا يتغير حتى نهايتها)
+        self.plot_start_index = 0  # أول عينة مرسومة (تتقدم إذا تجاوزت التشغيلة سعة المخزن)
+        self.run_start_time = 0.0
+        self.run_started_at = None
+        self.smoother = StreamingSavgol(11, 3, capacity=self.buffer.capacity)
+        # ✅ مصفوفة أزمنة محجوزة مسبقًا تُملأ تدريجيًا بدل إنشاء مصفوفة جديدة في كل إطار
+        self.plot_times = np.empty(self.buffer.capacity)
+        self.plotted_count = 0
+        self.y_range = None
+        self.curve = self.graph_widget.plot(pen=pg.mkPen(color="c", width=2), skipFiniteCheck=True)
 
         self.start_temp_line = pg.InfiniteLine(pos=self.start_temperature, angle=0,
                                                pen=pg.mkPen('r', width=2, style=Qt.PenStyle.DashLine))
         self.graph_widget.addItem(self.start_temp_line)
 
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_plot)
+        # ✅ الملف المرجعي (golden) للوصفة المختارة بدل خط حرارة البداية وحده
+        self.profile_curve = self.graph_widget.plot(pen=pg.mkPen("#FFD700", width=1.5, style=Qt.PenStyle.DashLine))
+        self.profile = None
+        self.matcher = None
+        self.deviation_alert.connect(self.on_deviation_alert)
+
+        # ✅ نطاق مرجعي من آخر التشغيلات خلف المنحنى الحي
+        self.reference_low = pg.PlotDataItem(pen=None)
+        self.reference_high = pg.PlotDataItem(pen=None)
+        self.reference_band = pg.FillBetweenItem(self.reference_low, self.reference_high, brush=pg.mkBrush(0, 255, 255, 40))
+        self.reference_band.setZValue(-10)
+        self.graph_widget.addItem(self.reference_band)
+        self.reference_loaded.connect(self.show_reference_band)
+        self.results_saved.connect(self.refresh_reference_band)  # ✅ التشغيلة الجديدة تدخل في النطاق المرجعي
+
+        # ✅ علامات بداية ونهاية هضاب الحرارة الكامنة بدل تعديل نقاط المنحنى
+        self.plateau_markers = pg.ScatterPlotItem(size=12, pen=pg.mkPen("w"))
+        self.graph_widget.addItem(self.plateau_markers)
+
+        # ✅ الرسم يُحدَّث عند وصول عينات جديدة فقط، وبحد أقصى frame_rate إطارًا في الثانية
+        self.channel_name = arduino_reader.channels[0].name
+        self.bridge = bridge
+        self.bridge.samples_received.connect(self.on_samples_received)
+        self.bridge.plateau_events.connect(self.on_plateau_events)
+        self.last_frame_time = 0.0
+        self.frame_timer = QTimer()
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.update_plot)
+        # انتهاء مدة العملية لا يعتمد على وصول البيانات
+        self.process_timer = QTimer()
+        self.process_timer.setSingleShot(True)
+        self.process_timer.timeout.connect(self.finish_process)
+
+        self.renderer = ResultRenderer()
+        self.journal = None
+        self.recipe = None
+        self.open_results_folder(results_folder or CONFIG.config.results_root)
+        self.refresh_reference_band()
+
+    def open_results_folder(self, results_folder):
+        self.results_folder = results_folder
+        self.journal_folder = os.path.join(self.results_folder, ".journal")
+        self.catalog = RunCatalog(self.results_folder)
+        self.thumbnails = ThumbnailCache(os.path.join(self.results_folder, ".thumbnails"))
+        self.profiles = ProfileStore(self.results_folder)
+
+    def set_results_folder(self, results_folder):
+        """تغيير مجلد النتائج أثناء التشغيل: التشغيلة الجارية تُحفظ في المجلد الجديد عند انتهائها"""
+        if os.path.abspath(results_folder) == os.path.abspath(self.results_folder):
+            return
+        self.open_results_folder(results_folder)
+        self.set_recipe(self.recipe)  # ✅ الملف المرجعي من مجلد الوصفات الجديد
+        self.refresh_reference_band()
+        self.recover_unfinished_runs()
+        logger.info("📌 Results folder changed to: %s", results_folder)
+
+    def set_recipe(self, recipe):
+        """اختيار الوصفة: تحميل ملفها المرجعي ورسمه (لا شيء إن لم يُحفظ لها ملف بعد)"""
+        self.recipe = recipe
+        self.profile = self.profiles.load(recipe) if recipe else None
+        if self.profile is None:
+            self.profile_curve.setData([], [])
+            self.profile_label.setVisible(False)
+            return
+        self.profile_curve.setData(self.profile.times, self.profile.temperatures)
+        self.profile_label.setVisible(True)
+        self.show_profile_status(alerting=False)
+        logger.info("📌 Golden profile loaded for recipe '%s' (±%.1f\u00b0C)", recipe, self.profile.tolerance)
+
+    def start_profile_matching(self):
+        """مطابقة تدريجية مع الملف المرجعي في خيط القراءة؛ التنبيه يصل فور العينة المخالفة"""
+        if self.profile is None:
+            return
+        self.matcher = StreamingProfileMatcher(self.profile)
+        self.matcher.reset(self.run_start_time)
+        self.matcher.add_listener(self.deviation_alert.emit)
+        self.show_profile_status(alerting=False)
+        self.arduino_reader.add_batch_listener(self.matcher.update_batch)
+
+    def stop_profile_matching(self):
+        if self.matcher is not None:
+            self.arduino_reader.remove_batch_listener(self.matcher.update_batch)
+
+    def on_deviation_alert(self, event):
+        alerting = event.kind == DEVIATION_START
+        self.show_profile_status(alerting)
+        if alerting:
+            DEVIATION_ALERTS.inc()
+            logger.warning("🚨 Batch left the golden profile: %+.2f\u00b0C (expected %.2f\u00b0C, lag %.0f s)",
+                           event.deviation, event.expected, event.lag)
+        else:
+            logger.info("✅ Batch back within the golden profile tolerance")
+
+    def show_profile_status(self, alerting=None):
+        """نص الانحراف الحالي؛ اللون يتغير فقط عند تغير حالة التنبيه"""
+        matcher = self.matcher if self.running else None
+        text = f"Profile: {self.profile.recipe}  (±{self.profile.tolerance:.1f} °C)"
+        if matcher is not None:
+            text += f"   Δ {matcher.deviation:+.2f} °C   lag {matcher.lag:+.0f} s"
+        self.profile_label.setText(text)
+        if alerting is not None:
+            self.profile_label.setStyleSheet(PROFILE_STYLE.format("#B22222" if alerting else "#2E4E3F"))
+
+    def refresh_reference_band(self, *_):
+        """إعادة حساب النطاق المرجعي في الخلفية بدقة عرض الرسم الحالي"""
+        points = max(self.graph_widget.width(), MIN_REFERENCE_POINTS)
+        self.renderer.submit(load_reference_band, self.catalog, points, callback=self.on_reference_band)
+
+    def on_reference_band(self, future):
+        """تُستدعى من خيط الرسم"""
+        try:
+            self.reference_loaded.emit(future.result())
+        except Exception:
+            logger.exception("⚠ Could not load the reference band")
+
+    def show_reference_band(self, band):
+        if band is None:
+            return
+        times, low, high, count = band
+        self.reference_low.setData(times, low)
+        self.reference_high.setData(times, high)
+        logger.info("📈 Reference band from the last %d runs", count)
 
     def start_graph(self):
         if not self.running:
-            self.temperature_data.clear()
-            self.time_data.clear()
-            self.data_points = 0
+            self.temperature_data = np.empty(0)
+            self.time_data = np.empty(0)
+            self.run_start_index = self.plot_start_index = self.buffer.write_index
+            self.run_start_time = time.monotonic()
+            self.run_started_at = datetime.datetime.now()
+            self.reset_plot_data()
+            self.plateau_markers.clear()
+            self.open_journal()
+            self.start_profile_matching()
             self.running = True
             self.process_started = True
             self.max_time = self.process_duration
             self.graph_widget.setXRange(0, self.max_time, padding=0)
-            self.timer.start(4000)  # ✅ تحديث كل 4 ثوانٍ
-            print(f"✅ Graph started (Duration: {self.process_duration} sec).", flush=True)
+            self.process_timer.start(round(self.process_duration * 1000))
+            logger.info("✅ Graph started (Duration: %s sec, %s fps).", self.process_duration, self.frame_rate)
 
     def stop_graph(self):
         if not self.running:
             return
 
         self.running = False
-        self.timer.stop()
-        print("🛑 Stopping graph and saving results...", flush=True)
+        self.frame_timer.stop()
+        self.process_timer.stop()
+        self.arduino_reader.remove_batch_listener(self.journal.append)
+        self.stop_profile_matching()
+        logger.info("🛑 Stopping graph and saving results...")
         self.save_results()
-        print("✅ Graph stopped and results saved.", flush=True)
-
-    def update_plot(self):
-        if self.running:
-            try:
-                temperature = self.arduino_reader.get_latest_temperature()
-                hidden_heat = self.arduino_reader.get_hidden_heat_signal()
-
-                if temperature is None or not (15 <= temperature <= 36):
-                    print(f"⚠ Ignoring invalid temperature: {temperature}", flush=True)
-                    return
-
-                self.data_points += 4  # ✅ تحديث كل 4 ثوانٍ
-                current_time = self.data_points / 10
-                self.time_data.append(current_time)
-                self.temperature_data.append(temperature)
+        logger.info("✅ Graph stopped, results are being saved in the background.")
+
+    def run_metadata(self):
+        """البيانات الوصفية المحفوظة مع التشغيلة"""
+        return {
+            "started_at": self.run_started_at.isoformat(timespec="seconds"),
+            "start_temperature": self.start_temperature,
+            "process_duration": self.process_duration,
+        }
+
+    def open_journal(self):
+        """بدء سجل الكتابة المسبقة: كل دفعة من القارئ تُلحق بالقرص فور وصولها"""
+        name = f"run_{self.run_started_at.strftime('%Y-%m-%d_%H-%M-%S')}{JOURNAL_EXTENSION}"
+        self.journal = RunJournal(os.path.join(self.journal_folder, name), self.run_metadata(), self.run_start_time)
+        self.arduino_reader.add_batch_listener(self.journal.append)
+
+    def recover_unfinished_runs(self):
+        """استرجاع التشغيلات التي انقطعت بسبب تعطل أو انقطاع كهرباء (في الخلفية)"""
+        journals = find_unfinished_journals(self.journal_folder)
+        if journals:
+            logger.info("♻ Found %d unfinished run(s), recovering...", len(journals))
+            self.renderer.submit(recover_journals, journals, self.results_folder, self.catalog, self.thumbnails)
+
+    def on_samples_received(self, channel, write_index):
+        """جدولة إطار رسم عند وصول عينات جديدة دون تجاوز معدل الإطارات"""
+        if not self.running or channel != self.channel_name or self.frame_timer.isActive():
+            return
+        wait = self.last_frame_time + self.frame_interval() / 1000 - time.monotonic()
+        self.frame_timer.start(max(0, round(wait * 1000)))
 
-                if len(self.temperature_data) > 10:
-                    smoothed_temp = savgol_filter(self.temperature_data, 11, 3).tolist()
-                else:
-                    smoothed_temp = self.temperature_data
+    def on_plateau_events(self, channel, events):
+        if self.running and channel == self.channel_name:
+            self.show_plateau_events(events)
 
-                if hidden_heat is not None and 20 <= hidden_heat <= 26:
-                    print(f"🔥 Hidden heat peak detected: {hidden_heat}\u00b0C", flush=True)
-                    smoothed_temp[-1] = hidden_heat + 0.2  # ✅ إضافة قمة واضحة بدلًا من شد الخط
+    def finish_process(self):
+        """انتهاء مدة العملية"""
+        if self.running:
+            self.stop_graph()
+            self.process_completed.emit()
 
-                self.curve.setData(self.time_data, smoothed_temp)
-                min_temp = min(smoothed_temp) - 0.5
-                max_temp = max(smoothed_temp) + 0.5
-                self.graph_widget.setYRange(min_temp, max_temp, padding=0)
+    def frame_interval(self):
+        """الفاصل بين إطارات الرسم بالميلي ثانية"""
+        return max(1, round(1000 / self.frame_rate))
 
-                if self.process_started and (self.data_points / 10 >= self.process_duration):
-                    self.stop_graph()
-                    self.process_completed.emit()
+    def reset_plot_data(self):
+        """تفريغ بيانات الرسم المحجوزة لبدء سلسلة جديدة"""
+        self.smoother.reset()
+        self.plotted_count = 0
+        self.y_range = None
 
-            except Exception as e:
-                print(f"⚠ Error in update_plot: {e}", flush=True)
+    def update_plot(self):
+        if self.running:
+            self.last_frame_time = time.monotonic()
+            started = time.perf_counter()
+            try:
+                # ✅ إذا تجاوزت التشغيلة سعة المخزن تبدأ السلسلة من أقدم عينة محفوظة
+                if self.buffer.oldest_index() > self.plot_start_index:
+                    self.plot_start_index = self.buffer.oldest_index()
+                    self.reset_plot_data()
+
+                # ✅ كل العينات منذ بداية التشغيلة (القيم الشاذة مرفوضة مسبقًا في القارئ)
+                times, temperatures, _ = self.buffer.since(self.plot_start_index)
+                count = len(temperatures)
+
+                if count > self.plotted_count:
+                    # ✅ الزمن الحقيقي لكل عينة: تحويل العينات الجديدة فقط
+                    np.subtract(times[self.plotted_count:], self.run_start_time,
+                                out=self.plot_times[self.plotted_count:count])
+                    self.time_data = self.plot_times[:count]
+                    self.temperature_data = temperatures
+
+                    # ✅ تنعيم تدريجي: يُعاد حساب الذيل المتأثر بالعينات الجديدة فقط
+                    smoothed_temp = self.smoother.update(self.temperature_data)
+
+                    self.curve.setData(self.time_data, smoothed_temp)
+                    self.update_y_range(smoothed_temp, self.plotted_count)
+                    self.plotted_count = count
+                    if self.matcher is not None:
+                        self.show_profile_status()
+                    PLOT_LATENCY.observe((time.monotonic() - times[-1]) * 1000)
+
+            except Exception:
+                logger.exception("⚠ Error in update_plot")
+            FRAME_TIME.observe((time.perf_counter() - started) * 1000)
+
+    def show_plateau_events(self, events):
+        """رسم أحداث الحرارة الكامنة التي وقعت أثناء التشغيلة الحالية"""
+        for event in events:
+            if event.timestamp < self.run_start_time:
+                continue
+            started = event.kind == PLATEAU_START
+            self.plateau_markers.addPoints(
+                [event.timestamp - self.run_start_time], [event.temperature],
+                symbol="t1" if started else "t", brush=pg.mkBrush("#FF4500" if started else "#FFD700"))
+            if started:
+                logger.info("🔥 Latent heat plateau started at %.2f\u00b0C", event.temperature)
+            else:
+                logger.info("🔥 Latent heat plateau ended after %.0f s", event.duration)
+
+    def update_y_range(self, smoothed_temp, previous_count):
+        """توسيع مدى المحور العمودي بناءً على الجزء المحدث فقط من المنحنى"""
+        tail = smoothed_temp[max(0, previous_count - self.smoother.window_length):]
+        low, high = tail.min() - 0.5, tail.max() + 0.5
+        if self.y_range is not None:
+            low, high = min(low, self.y_range[0]), max(high, self.y_range[1])
+        if self.y_range != (low, high):
+            self.y_range = (low, high)
+            self.graph_widget.setYRange(low, high, padding=0)
 
     def save_results(self):
-        if not self.time_data or not self.temperature_data:
-            print("⚠ No data to save. Skipping file creation.", flush=True)
+        # ✅ أخذ العينات الأخيرة التي وصلت بعد آخر تحديث للرسم
+        wrapped = self.buffer.oldest_index() > self.run_start_index
+        times, temperatures, _ = self.buffer.since(self.run_start_index)
+        self.time_data = times - self.run_start_time
+        self.temperature_data = temperatures
+
+        if not wrapped and len(self.temperature_data) == 0:
+            logger.warning("⚠ No data to save. Skipping file creation.")
+            self.journal.discard()
             return
 
         today_folder = self.get_today_folder()
         os.makedirs(today_folder, exist_ok=True)
 
         image_path = os.path.join(today_folder, f"result_{datetime.datetime.now().strftime('%H-%M-%S')}.png")
-        image_path = os.path.abspath(image_path)
+        image_path = unique_path(os.path.abspath(image_path))
 
-        print(f"📁 Saving image at: {image_path}", flush=True)
+        run_path = os.path.splitext(image_path)[0] + RUN_EXTENSION
+        metadata = dict(self.run_metadata(), image=os.path.basename(image_path))
 
-        try:
-            plt.figure(figsize=(6, 4), dpi=300)
-            plt.plot(self.time_data, self.temperature_data, label="Temperature Curve", color="black", linewidth=1.5)
-            plt.xlabel("Time (s)")
-            plt.ylabel("Temperature (\u00b0C)")
-            plt.title("Temperature Curve")
-            plt.grid(True, linestyle="--", linewidth=0.5)
-            plt.legend()
+        logger.info("📁 Saving run data at: %s", run_path)
 
-            plt.savefig(image_path, bbox_inches='tight')
-            plt.close()
+        if wrapped:
+            # ✅ المخزن كتب فوق بداية التشغيلة: السجل وحده يحتوي التشغيلة كاملة، فالحفظ منه
+            logger.info("📼 Run exceeded the sample buffer, saving it from the journal.")
+            self.renderer.submit(save_journal_results, run_path, image_path, metadata,
+                                 self.journal, self.catalog, self.thumbnails, callback=self.on_results_rendered)
+            return
 
-            print(f"📷 Image saved successfully at: {image_path}", flush=True)
+        # ✅ نسخ البيانات ثم الحفظ والرسم في الخلفية حتى لا تتجمد الواجهة
+        self.renderer.submit(save_run_results, run_path, image_path,
+                             np.array(self.time_data), np.array(self.temperature_data), metadata,
+                             self.journal, self.catalog, self.thumbnails, callback=self.on_results_rendered)
 
+    def on_results_rendered(self, future):
+        """تُستدعى من خيط الرسم؛ الإشارات تنقل النتيجة إلى خيط الواجهة"""
+        try:
+            image_path = future.result()
         except Exception as e:
-            print(f"❌ Error saving image: {e}", flush=True)
+            logger.error("❌ Error saving image: %s", e)
+            self.results_failed.emit(str(e))
+            return
+        logger.info("📷 Image saved successfully at: %s", image_path)
+        self.results_saved.emit(image_path)
 
     def get_today_folder(self):
-        base_path = r"C:/Users/32465/Documents/arkak project/choco-master/results"
         today = datetime.date.today().strftime("%Y-%m-%d")
-        full_path = os.path.join(base_path, today)
-        print(f"📂 Ensuring folder exists: {full_path}", flush=True)
+        full_path = os.path.join(self.results_folder, today)
+        logger.debug("📂 Ensuring folder exists: %s", full_path)
         return full_path
 
     def update_start_temperature(self, new_temp):
         self.start_temperature = new_temp
         self.start_temp_line.setValue(new_temp)
-        print(f"📌 Start temperature updated to: {new_temp}\u00b0C", flush=True)
+        logger.info("📌 Start temperature updated to: %s\u00b0C", new_temp)
 
     def update_process_duration(self, new_duration):
         self.process_duration = new_duration * 60
         self.max_time = self.process_duration
         self.graph_widget.setXRange(0, self.max_time, padding=0)
-        print(f"📌 Process duration updated to: {new_duration} minutes", flush=True)
+        if self.running:
+            remaining = self.process_duration - (time.monotonic() - self.run_start_time)
+            self.process_timer.start(max(0, round(remaining * 1000)))
+        logger.info("📌 Process duration updated to: %s minutes", new_duration)
+
+    def update_frame_rate(self, frame_rate):
+        self.frame_rate = frame_rate
+        logger.info("📌 Frame rate updated to: %s fps", frame_rate)
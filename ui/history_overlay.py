@@ -0,0 +1,36 @@
+import os
+import pyqtgraph as pg
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from storage.run_file import RunFile
+
+MAX_OVERLAY_RUNS = 50
+
+
+class HistoryOverlay(QWidget):
+    """منحنيات عدة تشغيلات محفوظة فوق بعضها؛ كل تشغيلة تُقرأ بدقة عرض الرسم فقط (مستوى الهرم المناسب)"""
+
+    def __init__(self, runs, width=900, height=500):
+        super().__init__()
+        self.setWindowTitle("Choco Master - Run Overlay")
+        self.resize(width, height)
+
+        layout = QVBoxLayout()
+        self.plot = pg.PlotWidget()
+        self.plot.setBackground("#1A1A1A")
+        self.plot.setLabel("left", "Temperature (°C)", color="white")
+        self.plot.setLabel("bottom", "Time (s)", color="white")
+        self.plot.addLegend(offset=(-10, 10))
+        layout.addWidget(self.plot)
+        self.setLayout(layout)
+
+        runs = [run for run in runs if run.get("run_path") and os.path.exists(run["run_path"])][-MAX_OVERLAY_RUNS:]
+        for number, run in enumerate(runs):
+            times, low, high, mean = RunFile(run["run_path"]).envelope(width)
+            color = pg.intColor(number, hues=max(len(runs), 1), alpha=200)
+            self.plot.plot(times, mean, pen=pg.mkPen(color, width=1.5),
+                           name=f"{run['started_at']}  TI {run.get('temper_index') or '—'}")
+            if len(runs) == 1:
+                # ✅ تشغيلة واحدة: عرض غلاف الأدنى/الأعلى حتى لا تختفي القمم الصغيرة
+                band = pg.FillBetweenItem(self.plot.plot(times, low, pen=None), self.plot.plot(times, high, pen=None),
+                                          brush=pg.mkBrush(0, 255, 255, 60))
+                self.plot.addItem(band)
@@ -1,25 +1,29 @@
+import time
+START_TIME = time.monotonic()  # ✅ بداية تشغيل التطبيق لقياس زمن ظهور أول إطار
+
 import sys
-import json
+import logging
+import dataclasses
+import importlib
+from threading import Thread
 from PyQt6.QtWidgets import QApplication, QGridLayout, QWidget, QVBoxLayout, QSizePolicy, QMessageBox
 from ui.sensor_widget import SensorWidget
 from ui.graph_widget import GraphWidget
 from ui.control_buttons import ControlButtons
-from ui.settings_ui import SettingsUI  # استيراد نافذة الإعدادات
 from sensors.arduino_receiver import ArduinoReader  # استيراد قارئ البيانات
-from PyQt6.QtGui import QPalette, QLinearGradient, QColor, QBrush
+from sensors.async_core import AsyncAcquisitionCore
+from sensors.isolated_acquisition import ProcessReader
+from storage.config_service import CONFIG, LIVE_SENSOR_FIELDS
+from ui.acquisition_bridge import AcquisitionBridge
+from diagnostics.logging_setup import setup_logging
+from diagnostics.metrics import METRICS
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QPalette, QLinearGradient, QColor, QBrush, QKeySequence, QShortcut
 
-# تحميل إعدادات المستخدم من ملف JSON
-def load_settings():
-    try:
-        with open("config.json", "r") as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"start_temperature": 30, "duration": 5}  # القيم الافتراضية
+logger = logging.getLogger(__name__)
 
-# حفظ إعدادات المستخدم إلى ملف JSON
-def save_settings(settings):
-    with open("config.json", "w") as file:
-        json.dump(settings, file)
+# ✅ مكتبات ثقيلة لا تلزم لأول إطار (التقارير، التحليل، الصور المصغرة)؛ تُحمّل في الخلفية بعد ظهور النافذة
+PREWARM_MODULES = ("matplotlib.figure", "matplotlib.backends.backend_agg", "scipy.signal", "pandas", "PIL.Image")
 
 class ChocoMasterUI(QWidget):
     def __init__(self):
@@ -29,19 +33,30 @@ class ChocoMasterUI(QWidget):
 
         self.setup_background()
 
-        # إنشاء كائن قارئ الأردوينو كمصدر بيانات مركزي
-        self.arduino_reader = ArduinoReader(port='COM3', baudrate=115200)
-        self.arduino_reader.start_reading()  # بدء استقبال البيانات عند تشغيل التطبيق
-
-        # تحميل إعدادات المستخدم
-        self.settings_data = load_settings()
+        # تحميل إعدادات المستخدم (خدمة الإعدادات المشتركة؛ التعديلات تصل عبر on_config_changed)
+        self.config = CONFIG
+        config = self.config.config
+
+        # ✅ قارئ لكل منفذ (وقد يحمل المنفذ عدة قنوات)، وكلها تُخدم معًا من حلقة asyncio واحدة
+        # port="auto" يبحث عن اللوحة بمعرف USB (vid/pid اختياريان في الإعدادات)
+        # "isolated": true يقرأ المنفذ في عملية مستقلة فلا يفقد أي عينة مهما توقفت الواجهة
+        self.acquisition = AsyncAcquisitionCore(
+            (ProcessReader if sensor.isolated else ArduinoReader)(
+                port=sensor.port, baudrate=sensor.baudrate, buffer_capacity=sensor.buffer_samples(),
+                channels=sensor.channels, protocol=sensor.protocol, vid=sensor.vid, pid=sensor.pid)
+            for sensor in config.sensors
+        )
+        self.sensor_configs = config.sensors  # آخر إعدادات قراءة طُبقت (أو أُبلغ أنها تنتظر إعادة التشغيل)
+        self.acquisition.start()  # بدء استقبال البيانات عند تشغيل التطبيق (الاتصال في الخلفية)
+        self.arduino_reader = self.acquisition.readers[0]  # الحساس المعروض في الواجهة
+        self.bridge = AcquisitionBridge(self.acquisition)  # ✅ إشعارات البيانات الجديدة للواجهة
 
         # التخطيط الرئيسي
         main_layout = QGridLayout()
         left_layout = QVBoxLayout()
 
         # تمرير كائن القارئ إلى مستشعر الحرارة
-        self.sensor_widget = SensorWidget(self.arduino_reader)
+        self.sensor_widget = SensorWidget(self.arduino_reader, self.bridge)
         left_layout.addWidget(self.sensor_widget)
 
         # إضافة الأزرار وربطها بالأحداث
@@ -56,10 +71,16 @@ class ChocoMasterUI(QWidget):
         # تمرير كائن القارئ والإعدادات إلى الرسم البياني
         self.graph_widget = GraphWidget(
             self.arduino_reader,
-            start_temperature=self.settings_data["start_temperature"],
-            process_duration=self.settings_data["duration"]
+            self.bridge,
+            start_temperature=config.start_temperature,
+            process_duration=config.duration,
+            frame_rate=config.frame_rate,
+            results_folder=config.results_root
         )
         self.graph_widget.process_completed.connect(self.handle_process_completion)
+        self.graph_widget.results_saved.connect(self.handle_results_saved)
+        self.graph_widget.set_recipe(config.recipe)  # ✅ الملف المرجعي للوصفة الحالية
+        self.graph_widget.recover_unfinished_runs()  # ✅ استرجاع تشغيلات انقطعت في جلسة سابقة
         main_layout.addWidget(self.graph_widget, 0, 1)
 
         # ضبط حجم العناصر لتكون قابلة للتغيير
@@ -68,6 +89,27 @@ class ChocoMasterUI(QWidget):
 
         self.setLayout(main_layout)
 
+        # ✅ لوحة المقاييس الحية للتشخيص على جهاز الإنتاج
+        self.debug_panel = None
+        QShortcut(QKeySequence("F12"), self).activated.connect(self.open_debug_panel)
+
+        self.config.add_listener(self.on_config_changed)
+
+    def open_debug_panel(self):
+        """فتح لوحة المقاييس (F12)"""
+        if self.debug_panel is None:
+            from ui.debug_panel import DebugPanel
+            self.debug_panel = DebugPanel(self.graph_widget.results_folder)
+        self.debug_panel.show()
+        self.debug_panel.raise_()
+
+    def report_first_frame(self):
+        """تسجيل زمن ظهور أول إطار ثم تحميل المكتبات الثقيلة في الخلفية"""
+        elapsed = time.monotonic() - START_TIME
+        METRICS.gauge("startup.first_frame_s", lambda: elapsed)
+        logger.info("🚀 First frame after %.2f s", elapsed)
+        Thread(target=prewarm, name="prewarm", daemon=True).start()
+
     def setup_background(self):
         """إعداد خلفية النافذة بتدرج لوني جميل"""
         palette = QPalette()
@@ -82,51 +124,75 @@ class ChocoMasterUI(QWidget):
         """بدء الرسم البياني عند الضغط على زر Start"""
         if not self.graph_widget.running:
             # تحديث القيم قبل بدء الرسم
-            self.graph_widget.update_start_temperature(self.settings_data["start_temperature"])
-            self.graph_widget.update_process_duration(self.settings_data["duration"])
+            config = self.config.config
+            self.graph_widget.update_start_temperature(config.start_temperature)
+            self.graph_widget.update_process_duration(config.duration)
             self.graph_widget.start_graph()
             self.buttons_widget.start_button.setText("Stop")
             self.buttons_widget.start_button.setStyleSheet("background-color: red; color: white;")
-            print(f"✅ Graph started with Start Temp: {self.settings_data['start_temperature']}°C, Duration: {self.settings_data['duration']} min.")
+            logger.info("✅ Graph started with Start Temp: %s°C, Duration: %s min.", config.start_temperature, config.duration)
         else:
-            print("⚠ Graph is already running!")
+            logger.warning("⚠ Graph is already running!")
 
     def stop_graph(self):
         """إيقاف الرسم البياني عند الضغط على زر Stop"""
         self.graph_widget.stop_graph()
         self.buttons_widget.start_button.setText("Start")
         self.buttons_widget.start_button.setStyleSheet("background-color: green; color: white;")
-        print("🛑 Graph stopped.")
+        logger.info("🛑 Graph stopped.")
 
     def handle_process_completion(self):
         """معالجة انتهاء العملية وتحديث الزر"""
         self.buttons_widget.start_button.setText("Start")
         self.buttons_widget.start_button.setStyleSheet("background-color: green; color: white;")
-        print("✅ Process completed. Ready to start again.")
+        logger.info("✅ Process completed. Ready to start again.")
+
+    def handle_results_saved(self, image_path):
+        """إشعار بانتهاء حفظ النتائج في الخلفية"""
+        logger.info("✅ Results ready: %s", image_path)
 
     def open_settings(self):
         """فتح نافذة الإعدادات عند الضغط على زر Settings"""
         if hasattr(self, 'settings_window') and self.settings_window is not None:
             self.settings_window.close()
+        from ui.settings_ui import SettingsUI  # استيراد نافذة الإعدادات عند الحاجة فقط
         self.settings_window = SettingsUI(self)
         self.settings_window.settings_applied.connect(self.apply_settings)
         self.settings_window.show()
 
     def apply_settings(self, settings):
-        """تطبيق القيم المختارة من نافذة الإعدادات"""
-        self.settings_data.update(settings)
-        save_settings(self.settings_data)
-
-        # تحديث القيم في الرسم البياني أثناء تشغيله
-        if self.graph_widget.running:
-            print("🔄 Restarting graph with new settings...")
-            self.stop_graph()
-            self.start_graph()
-        else:
-            self.graph_widget.update_start_temperature(settings["start_temperature"])
-            self.graph_widget.update_process_duration(settings["duration"])
-
-        print(f"✅ Settings Applied: Start Temp = {self.settings_data['start_temperature']}°C, Duration = {self.settings_data['duration']} min")
+        """تطبيق القيم المختارة من نافذة الإعدادات (التغييرات تصل إلى الرسم والقارئ عبر on_config_changed)"""
+        self.config.apply(settings)
+        config = self.config.config
+        logger.info("✅ Settings Applied: Start Temp = %s°C, Duration = %s min", config.start_temperature, config.duration)
+
+    def on_config_changed(self, config, changed):
+        """تطبيق الإعدادات الجديدة فورًا دون إيقاف التشغيلة الجارية"""
+        if "start_temperature" in changed:
+            self.graph_widget.update_start_temperature(config.start_temperature)
+        if "duration" in changed:
+            self.graph_widget.update_process_duration(config.duration)
+        if "frame_rate" in changed:
+            self.graph_widget.update_frame_rate(config.frame_rate)
+        if "recipe" in changed:
+            self.graph_widget.set_recipe(config.recipe)
+        if "results_root" in changed:
+            self.graph_widget.set_results_folder(config.results_root)
+        if "sensors" in changed:
+            self.apply_sensor_configs(config.sensors)
+
+    def apply_sensor_configs(self, sensors):
+        """المنفذ والسرعة تُطبق على القارئ مباشرة (إعادة اتصال فقط)؛ بقية حقول القراءة بعد إعادة التشغيل"""
+        for reader, old, new in zip(self.acquisition.readers, self.sensor_configs, sensors):
+            live = {name: getattr(new, name) for name in LIVE_SENSOR_FIELDS if getattr(old, name) != getattr(new, name)}
+            if live:
+                logger.info("🔄 Reconnecting %s with %s", reader.port, live)
+                reader.reconfigure(**live)
+            if dataclasses.replace(old, **{name: getattr(new, name) for name in LIVE_SENSOR_FIELDS}) != new:
+                logger.warning("⚠ Sensor settings for %s change on the next start of the application.", new.port)
+        if len(sensors) != len(self.sensor_configs):
+            logger.warning("⚠ Added or removed sensors take effect on the next start of the application.")
+        self.sensor_configs = tuple(sensors)
 
     def closeEvent(self, event):
         """ضمان إيقاف العمليات عند إغلاق التطبيق"""
@@ -136,16 +202,27 @@ class ChocoMasterUI(QWidget):
                                      QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.arduino_reader.stop_reading()  # إيقاف استقبال البيانات عند الإغلاق
+            self.acquisition.stop()  # إيقاف استقبال البيانات عند الإغلاق
             self.graph_widget.stop_graph()
-            save_settings(self.settings_data)  # حفظ آخر الإعدادات قبل الإغلاق
-            print("🛑 Application closed cleanly.")
+            self.graph_widget.renderer.shutdown(wait=True)  # ✅ انتظار انتهاء حفظ آخر النتائج
+            self.config.flush()  # ✅ كتابة أي تعديل مؤجل قبل الإغلاق
+            logger.info("🛑 Application closed cleanly.")
             event.accept()
         else:
             event.ignore()
 
+def prewarm():
+    """استيراد المكتبات الثقيلة مسبقًا حتى لا يتأخر أول حفظ للنتائج أو فتح للسجل"""
+    for name in PREWARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as error:
+            logger.warning("⚠ Prewarm failed for %s: %s", name, error)
+
 if __name__ == "__main__":
+    setup_logging()
     app = QApplication(sys.argv)
     window = ChocoMasterUI()
     window.show()
+    QTimer.singleShot(0, window.report_first_frame)  # ✅ يُنفذ بعد رسم النافذة لأول مرة
     sys.exit(app.exec())
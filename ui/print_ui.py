@@ -1,13 +1,54 @@
 import sys
 import os
-from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QGridLayout, QFrame, QScrollArea, QHBoxLayout, QListWidget, QListWidgetItem
+import logging
+import datetime
+from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QListWidget, QListView, QDateEdit, QDoubleSpinBox, QInputDialog
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QDate, QSize, QObject, QRunnable, QThreadPool, pyqtSignal
+from storage.run_catalog import RunCatalog
+from storage.thumbnail_cache import ThumbnailCache
+from storage.run_file import RunFile
+from storage.profile_store import ProfileStore
+from algorithms.thermal_receipt import FilePrinter, render_receipt_bitmap
+from storage.config_service import CONFIG
+from ui.run_list_model import RunListModel
+
+logger = logging.getLogger(__name__)
+
+# الطابعة الحرارية تستقبل أوامر ESC/POS الخام: جهاز USB على لينكس أو طابعة مشتركة على ويندوز
+PRINTER_PATH = r"\\localhost\receipt" if os.name == "nt" else "/dev/usb/lp0"
+
+
+class CatalogImportSignals(QObject):
+    finished = pyqtSignal(int)
+
+
+class CatalogImporter(QRunnable):
+    """Index results saved before the catalog existed (reads and analyzes every old run, so not on the UI thread)"""
+
+    def __init__(self, catalog, signals):
+        super().__init__()
+        self.catalog = catalog
+        self.signals = signals
+
+    def run(self):
+        try:
+            imported = self.catalog.import_existing()
+        except Exception:
+            logger.exception("⚠ Importing existing results failed")
+            imported = 0
+        self.signals.finished.emit(imported)
+
 
 class PrintUI(QWidget):
-    def __init__(self, main_window):
+    def __init__(self, main_window, results_folder=None, printer=None):
         super().__init__()
         self.main_window = main_window
+        results_folder = results_folder or CONFIG.config.results_root
+        self.results_folder = results_folder
+        self.printer = printer or FilePrinter(PRINTER_PATH)
+        self.catalog = RunCatalog(results_folder)
+        self.profiles = ProfileStore(results_folder)
         self.setWindowTitle("Print Results")
         self.setGeometry(100, 100, 1024, 600)
         self.setStyleSheet("background-color: #0F2027; color: white; font-family: Arial;")
@@ -20,6 +61,29 @@ class PrintUI(QWidget):
         self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.title_label)
 
+        # Filters by date range and temper index
+        filter_layout = QHBoxLayout()
+        today = QDate.currentDate()
+        self.date_from = QDateEdit(today.addMonths(-1))
+        self.date_to = QDateEdit(today)
+        self.min_index = QDoubleSpinBox()
+        self.max_index = QDoubleSpinBox()
+        for spin_box, value in ((self.min_index, 0), (self.max_index, 100)):
+            spin_box.setRange(0, 100)
+            spin_box.setDecimals(2)
+            spin_box.setValue(value)
+        self.filter_button = QPushButton("Filter")
+        self.filter_button.clicked.connect(self.apply_filter)
+        for label, widget in (("From", self.date_from), ("To", self.date_to),
+                              ("Temper Index", self.min_index), ("-", self.max_index)):
+            filter_layout.addWidget(QLabel(label))
+            filter_layout.addWidget(widget)
+        filter_layout.addWidget(self.filter_button)
+        for date_edit in (self.date_from, self.date_to):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+        layout.addLayout(filter_layout)
+
         # Horizontal layout for folder selection and image display
         content_layout = QHBoxLayout()
         layout.addLayout(content_layout)
@@ -30,17 +94,46 @@ class PrintUI(QWidget):
         self.folder_list.itemClicked.connect(self.load_images)
         content_layout.addWidget(self.folder_list)
 
-        # Image grid
-        self.image_grid = QGridLayout()
-        self.image_container = QWidget()
-        self.image_container.setLayout(self.image_grid)
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setWidget(self.image_container)
-        content_layout.addWidget(self.scroll_area)
+        # Image grid: a virtualized icon view, thumbnails are loaded in the background for visible rows only
+        self.thumbnail_cache = ThumbnailCache(os.path.join(results_folder, ".thumbnails"))
+        self.run_model = RunListModel(self.thumbnail_cache, self)
+        self.image_view = QListView()
+        self.image_view.setViewMode(QListView.ViewMode.IconMode)
+        self.image_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.image_view.setMovement(QListView.Movement.Static)
+        self.image_view.setUniformItemSizes(True)
+        self.image_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.image_view.setIconSize(QSize(*self.thumbnail_cache.size))
+        self.image_view.setGridSize(QSize(self.thumbnail_cache.size[0] + 20, self.thumbnail_cache.size[1] + 40))
+        self.image_view.setModel(self.run_model)
+        self.image_view.clicked.connect(self.open_run)
+        content_layout.addWidget(self.image_view)
 
         # Load folders
-        self.load_folders("C:/Users/32465/Documents/arkak project/choco-master/results/")
+        self.load_folders()
+
+        # Print the selected run on the receipt printer
+        self.print_button = QPushButton("Print")
+        self.print_button.setStyleSheet(
+            "font-size: 32px; font-weight: bold; padding: 20px; border-radius: 15px; background-color: #1E1E1E; color: #00FFFF; border: 2px solid #00FFFF; min-width: 200px;"
+        )
+        self.print_button.clicked.connect(self.print_selected)
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.status_label)
+        # Overlay the curves of the runs currently listed
+        self.overlay_button = QPushButton("Overlay")
+        self.overlay_button.setStyleSheet(self.print_button.styleSheet())
+        self.overlay_button.clicked.connect(self.open_overlay)
+        actions_layout = QHBoxLayout()
+        actions_layout.addWidget(self.print_button)
+        actions_layout.addWidget(self.overlay_button)
+        # Use the selected run as the reference curve of a recipe
+        self.golden_button = QPushButton("Save as Golden")
+        self.golden_button.setStyleSheet(self.print_button.styleSheet())
+        self.golden_button.clicked.connect(self.save_golden_profile)
+        actions_layout.addWidget(self.golden_button)
+        layout.addLayout(actions_layout)
 
         # Back Button
         self.back_button = QPushButton("Back")
@@ -52,32 +145,81 @@ class PrintUI(QWidget):
 
         self.setLayout(layout)
 
-    def load_folders(self, directory):
-        if not os.path.exists(directory):
-            return
-        for folder in sorted(os.listdir(directory)):
-            folder_path = os.path.join(directory, folder)
-            if os.path.isdir(folder_path):
-                self.folder_list.addItem(folder)
+        # Index results saved before the catalog existed, once, in the background
+        self.import_signals = CatalogImportSignals(self)
+        self.import_signals.finished.connect(self.on_import_finished)
+        if self.catalog.needs_import():
+            self.status_label.setText("Indexing existing results...")
+            QThreadPool.globalInstance().start(CatalogImporter(self.catalog, self.import_signals))
+
+    def on_import_finished(self, imported):
+        self.status_label.setText(f"Indexed {imported} existing results" if imported else "")
+        if imported:
+            self.load_folders()
+
+    def load_folders(self):
+        self.folder_list.clear()
+        for day in self.catalog.days():
+            self.folder_list.addItem(day)
 
     def load_images(self, item):
-        folder_name = item.text()
-        directory = f"C:/Users/32465/Documents/arkak project/choco-master/results/{folder_name}"
-        for i in reversed(range(self.image_grid.count())):
-            self.image_grid.itemAt(i).widget().setParent(None)
-        row, col = 0, 0
-        for filename in sorted(os.listdir(directory)):
-            if filename.endswith(".png"):
-                image_path = os.path.join(directory, filename)
-                pixmap = QPixmap(image_path).scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                image_label = QLabel()
-                image_label.setPixmap(pixmap)
-                image_label.mousePressEvent = lambda event, path=image_path: self.display_full_image(path)
-                self.image_grid.addWidget(image_label, row, col)
-                col += 1
-                if col > 3:
-                    col = 0
-                    row += 1
+        self.show_runs(self.catalog.runs(day=item.text()))
+
+    def apply_filter(self):
+        runs = self.catalog.runs(
+            date_from=self.date_from.date().toPyDate(),
+            date_to=self.date_to.date().toPyDate(),
+            min_index=self.min_index.value() if self.min_index.value() > 0 else None,
+            max_index=self.max_index.value() if self.max_index.value() < 100 else None,
+        )
+        self.show_runs(runs)
+
+    def show_runs(self, runs):
+        self.run_model.set_runs([run for run in runs if run["image_path"] and os.path.exists(run["image_path"])])
+
+    def open_run(self, index):
+        self.display_full_image(index.data(Qt.ItemDataRole.UserRole)["image_path"])
+
+    def open_overlay(self):
+        from ui.history_overlay import HistoryOverlay  # pyqtgraph is only needed once the overlay is opened
+        self.overlay_window = HistoryOverlay(self.run_model.runs)
+        self.overlay_window.show()
+
+    def save_golden_profile(self):
+        index = self.image_view.currentIndex()
+        if not index.isValid():
+            self.status_label.setText("Select a run to use as the golden profile")
+            return
+        run = index.data(Qt.ItemDataRole.UserRole)
+        if not run["run_path"] or not os.path.exists(run["run_path"]):
+            self.status_label.setText("Raw data for this run is not available")
+            return
+        recipe, accepted = QInputDialog.getItem(self, "Golden Profile", "Recipe:", self.profiles.recipes(), 0, True)
+        if not accepted or not recipe.strip():
+            return
+        data = RunFile(run["run_path"])
+        self.profiles.save(recipe.strip(), data.times, data.temperatures, source=run["run_id"])
+        self.status_label.setText(f"Saved as golden profile for '{recipe.strip()}'")
+
+    def print_selected(self):
+        index = self.image_view.currentIndex()
+        if not index.isValid():
+            self.status_label.setText("Select a run to print")
+            return
+        run = index.data(Qt.ItemDataRole.UserRole)
+        try:
+            self.status_label.setText(f"Printed ({self.print_run(run)} bytes)")
+        except (OSError, ValueError) as e:
+            self.status_label.setText(f"Print failed: {e}")
+
+    def print_run(self, run):
+        """Render the run straight to printer dots (no matplotlib) and send it as ESC/POS raster data"""
+        if not run["run_path"] or not os.path.exists(run["run_path"]):
+            raise ValueError("Raw data for this run is not available")
+        data = RunFile(run["run_path"])
+        started_at = datetime.datetime.fromisoformat(run["started_at"]).strftime("%Y-%m-%d %H:%M")
+        dots = render_receipt_bitmap(data.times, data.temperatures, run["temper_index"], subtitle=started_at)
+        return self.printer.print_raster(dots)
 
     def display_full_image(self, image_path):
         self.full_image_window = QWidget()
@@ -0,0 +1,91 @@
+import logging
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap, QColor
+from storage.thumbnail_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class ThumbnailLoader(QRunnable):
+    """تحميل صورة مصغرة في الخلفية (QImage آمن خارج خيط الواجهة بعكس QPixmap)"""
+
+    def __init__(self, cache, image_path, signals):
+        super().__init__()
+        self.cache = cache
+        self.image_path = image_path
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = QImage(self.cache.ensure(self.image_path))
+        except OSError as e:
+            logger.warning("⚠ Thumbnail failed for %s: %s", self.image_path, e)
+            image = QImage()
+        self.signals.loaded.emit(self.image_path, image)
+
+
+class RunListModel(QAbstractListModel):
+    """نموذج قائمة التشغيلات: الصور المصغرة تُحمّل فقط للعناصر الظاهرة"""
+
+    def __init__(self, thumbnail_cache, parent=None, memory_items=256):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.pixmaps = LRUCache(memory_items)
+        self.pending = set()
+        self.runs = []
+        self.rows_by_path = {}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self.on_thumbnail_loaded)
+
+        size = thumbnail_cache.size
+        self.placeholder = QPixmap(QSize(*size))
+        self.placeholder.fill(QColor("#1E1E1E"))
+
+    def set_runs(self, runs):
+        self.beginResetModel()
+        self.runs = [run for run in runs if run["image_path"]]
+        self.rows_by_path = {run["image_path"]: row for row, run in enumerate(self.runs)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.runs)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        run = self.runs[index.row()]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.thumbnail(run["image_path"])
+        if role == Qt.ItemDataRole.DisplayRole:
+            return run["started_at"].replace("T", " ")
+        if role == Qt.ItemDataRole.ToolTipRole and run["temper_index"] is not None:
+            return f"Temper Index: {run['temper_index']}"
+        if role == Qt.ItemDataRole.UserRole:
+            return run
+        return None
+
+    def thumbnail(self, image_path):
+        """الصورة من الذاكرة إن وجدت، وإلا جدولة تحميلها وإرجاع صورة مؤقتة"""
+        pixmap = self.pixmaps.get(image_path)
+        if pixmap is not None:
+            return pixmap
+        if image_path not in self.pending:
+            self.pending.add(image_path)
+            self.pool.start(ThumbnailLoader(self.thumbnail_cache, image_path, self.signals))
+        return self.placeholder
+
+    def on_thumbnail_loaded(self, image_path, image):
+        self.pending.discard(image_path)
+        if image.isNull():
+            return
+        self.pixmaps.put(image_path, QPixmap.fromImage(image))
+        row = self.rows_by_path.get(image_path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
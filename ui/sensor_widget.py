@@ -1,8 +1,14 @@
 from PyQt6.QtWidgets import QLabel, QVBoxLayout, QWidget
-from PyQt6.QtCore import QTimer
+from sensors.connection import CONNECTING, CONNECTED, LOST
+
+CONNECTION_TEXT = {
+    CONNECTING: ("🟡 Connecting…", "#FFD700"),
+    CONNECTED: ("🟢 Connected", "#00FF7F"),
+    LOST: ("🔴 Sensor not connected", "#FF6347"),
+}
 
 class SensorWidget(QWidget):
-    def __init__(self, arduino_reader):
+    def __init__(self, arduino_reader, bridge):
         super().__init__()
         self.setStyleSheet("background-color: #333; border: 2px solid #00FFFF; border-radius: 10px; padding: 15px;")
 
@@ -15,24 +21,44 @@ class SensorWidget(QWidget):
         self.sensor_value.setStyleSheet("font-size: 36px; font-weight: bold; color: #FF4500;")
         layout.addWidget(self.sensor_value)
 
+        # ✅ حالة الاتصال بالحساس (الواجهة تعمل حتى لو لم تكن اللوحة موصولة)
+        self.connection_label = QLabel("")
+        self.connection_label.setStyleSheet("font-size: 14px; border: none; padding: 0px;")
+        layout.addWidget(self.connection_label)
+
         self.setLayout(layout)
 
         self.arduino_reader = arduino_reader
+        self.buffer = arduino_reader.buffer  # ✅ القراءة مباشرة من المخزن الدائري المشترك
+        self.channel_name = arduino_reader.channels[0].name
+
+        # ✅ التحديث عند وصول بيانات جديدة فقط (إشعار من نواة القراءة) بدل مؤقت كل 100ms
+        self.bridge = bridge
+        self.bridge.samples_received.connect(self.on_samples_received)
+        self.bridge.connection_changed.connect(self.on_connection_changed)
+        self.on_connection_changed(arduino_reader.port, arduino_reader.state, "")
+
+    def on_samples_received(self, channel, write_index):
+        if channel == self.channel_name:
+            self.update_sensor_value()
 
-        # تحديث القيم 10 مرات في الثانية (كل 100ms)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_sensor_value)
-        self.timer.start(100)  # تحديث كل 100 ميلي ثانية
+    def on_connection_changed(self, port, state, detail):
+        if port != self.arduino_reader.port:
+            return
+        text, color = CONNECTION_TEXT.get(state, ("⚪ Disconnected", "#AAAAAA"))
+        self.connection_label.setText(f"{text} ({detail})" if detail else text)
+        self.connection_label.setStyleSheet(f"font-size: 14px; border: none; padding: 0px; color: {color};")
 
     def update_sensor_value(self):
         """تحديث قيمة الحساس"""
-        temperature = self.arduino_reader.get_latest_temperature()
-        if temperature is not None:
-            self.sensor_value.setText(f"{temperature:.2f} °C")
+        sample = self.buffer.latest()
+        if sample is not None:
+            self.sensor_value.setText(f"{sample[1]:.2f} °C")
         else:
             self.sensor_value.setText("No Data")
 
     def closeEvent(self, event):
-        """إيقاف المؤقت عند إغلاق النافذة"""
-        self.timer.stop()
+        """إلغاء الاشتراك في الإشعارات عند إغلاق النافذة"""
+        self.bridge.samples_received.disconnect(self.on_samples_received)
+        self.bridge.connection_changed.disconnect(self.on_connection_changed)
         event.accept()
@@ -1,9 +1,14 @@
 import sys
-import json
+import logging
 from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QGridLayout, QComboBox
 from PyQt6.QtCore import Qt, pyqtSignal
+from serial.tools import list_ports
+from storage.config_service import CONFIG
+from sensors.connection import AUTO_PORT
 
-SETTINGS_FILE = "settings.json"
+logger = logging.getLogger(__name__)
+
+BAUD_RATES = (9600, 19200, 38400, 57600, 115200, 230400, 250000, 500000, 1000000)
 
 class SettingsUI(QWidget):
     settings_applied = pyqtSignal(dict)  # إشارة لإرسال القيم المختارة
@@ -40,6 +45,28 @@ class SettingsUI(QWidget):
         settings_layout.addWidget(self.time_label, 1, 0)
         settings_layout.addWidget(self.time_combo, 1, 1)
 
+        # Recipe: selects the golden profile the live curve is compared to
+        self.recipe_label = QLabel("Recipe")
+        self.recipe_combo = QComboBox()
+        self.recipe_combo.setEditable(True)
+        self.recipe_combo.addItems([""] + self.known_recipes())
+        settings_layout.addWidget(self.recipe_label, 2, 0)
+        settings_layout.addWidget(self.recipe_combo, 2, 1)
+
+        # Serial port of the first sensor: applied to the running reader without restarting it
+        self.port_label = QLabel("Port")
+        self.port_combo = QComboBox()
+        self.port_combo.setEditable(True)
+        self.port_combo.addItems([AUTO_PORT] + sorted(port.device for port in list_ports.comports()))
+        settings_layout.addWidget(self.port_label, 3, 0)
+        settings_layout.addWidget(self.port_combo, 3, 1)
+
+        self.baud_label = QLabel("Baud Rate")
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItems([str(rate) for rate in BAUD_RATES])
+        settings_layout.addWidget(self.baud_label, 4, 0)
+        settings_layout.addWidget(self.baud_combo, 4, 1)
+
         layout.addLayout(settings_layout)
 
         # Apply Button
@@ -51,53 +78,51 @@ class SettingsUI(QWidget):
         # Load saved settings
         self.load_settings()
 
-        # حفظ تلقائي عند التغيير في القيم
-        self.temp_combo.currentIndexChanged.connect(self.auto_save_settings)
-        self.time_combo.currentIndexChanged.connect(self.auto_save_settings)
+        # حفظ تلقائي عند التغيير (مؤجل ومجمع في خدمة الإعدادات)؛ التطبيق على التشغيلة والقارئ بزر Apply فقط
+        for combo in (self.temp_combo, self.time_combo, self.recipe_combo, self.port_combo, self.baud_combo):
+            combo.currentIndexChanged.connect(self.auto_save_settings)
 
         self.setLayout(layout)
 
+    def known_recipes(self):
+        """الوصفات التي لها ملف مرجعي محفوظ"""
+        graph_widget = getattr(self.main_window, "graph_widget", None)
+        return graph_widget.profiles.recipes() if graph_widget is not None else []
+
     def get_settings(self):
         """إرجاع القيم المختارة من الإعدادات"""
         return {
             "start_temperature": int(self.temp_combo.currentText().split()[0]),
-            "duration": int(self.time_combo.currentText().split()[0])
+            "duration": int(self.time_combo.currentText().split()[0]),
+            "recipe": self.recipe_combo.currentText().strip(),
+            "port": self.port_combo.currentText().strip() or AUTO_PORT,
+            "baudrate": int(self.baud_combo.currentText())
         }
 
     def apply_settings(self):
-        """حفظ القيم المختارة وإرسالها إلى الواجهة الرئيسية"""
+        """تطبيق القيم المختارة وإرسالها إلى الواجهة الرئيسية"""
         settings = self.get_settings()
         self.settings_applied.emit(settings)
-        self.save_settings(settings)
-        print(f"✅ Settings applied: {settings}")
+        logger.info("✅ Settings applied: %s", settings)
         self.close()
 
     def auto_save_settings(self):
-        """حفظ الإعدادات تلقائيًا عند التغيير"""
-        settings = self.get_settings()
-        self.save_settings(settings)
-        print(f"💾 Auto-saved settings: {settings}")
-
-    def save_settings(self, settings):
-        """حفظ القيم إلى ملف JSON"""
-        try:
-            with open(SETTINGS_FILE, 'w') as file:
-                json.dump(settings, file)
-        except Exception as e:
-            print(f"⚠ Error saving settings: {e}")
+        """حفظ الإعدادات تلقائيًا عند التغيير دون تطبيقها (تغيير المنفذ لا يعيد الاتصال مع كل اختيار)"""
+        changed = CONFIG.stage(self.get_settings())
+        if changed:
+            logger.info("💾 Auto-saved settings: %s", ", ".join(sorted(changed)))
 
     def load_settings(self):
-        """تحميل القيم من ملف JSON عند بدء التشغيل"""
-        try:
-            with open(SETTINGS_FILE, 'r') as file:
-                settings = json.load(file)
-                self.temp_combo.setCurrentText(f"{settings['start_temperature']} °C")
-                self.time_combo.setCurrentText(f"{settings['duration']} min")
-                print(f"🔄 Loaded settings: {settings}")
-        except (FileNotFoundError, json.JSONDecodeError):
-            print("⚠ No valid settings found, using defaults.")
-            default_settings = {"start_temperature": 30, "duration": 5}
-            self.save_settings(default_settings)  # حفظ القيم الافتراضية
+        """عرض القيم الحالية من خدمة الإعدادات"""
+        config = CONFIG.saved_config  # ✅ تشمل ما حُفظ ولم يُطبق بعد
+        sensor = config.sensors[0]
+        self.temp_combo.setCurrentText(f"{config.start_temperature} °C")
+        self.time_combo.setCurrentText(f"{config.duration} min")
+        self.recipe_combo.setCurrentText(config.recipe)
+        self.port_combo.setCurrentText(sensor.port)
+        if self.baud_combo.findText(str(sensor.baudrate)) < 0:
+            self.baud_combo.addItem(str(sensor.baudrate))
+        self.baud_combo.setCurrentText(str(sensor.baudrate))
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)